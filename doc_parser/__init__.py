@@ -5,9 +5,27 @@
 DocParser - Модульный парсер документации для AI-обработки.
 """
 
-from doc_parser.core.parser import DocumentationParser
-from doc_parser.core.profiles import detect_site_profile
+import importlib
+
 from doc_parser.config import VERSION
 
 __version__ = VERSION
 __all__ = ['DocumentationParser', 'detect_site_profile']
+
+# Имя -> модуль. Модули импортируются при первом обращении к имени, поэтому
+# импорт подмодуля (doc_parser.config, doc_parser.interface.app и т.д.)
+# не загружает парсер вместе с aiohttp и BeautifulSoup
+_LAZY_EXPORTS = {
+    'DocumentationParser': 'doc_parser.core.parser',
+    'detect_site_profile': 'doc_parser.core.profiles',
+}
+
+
+def __getattr__(name):
+    """Импортирует экспортируемое имя при первом обращении."""
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
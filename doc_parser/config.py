@@ -11,11 +11,18 @@ DEFAULT_CONFIG = {
     'delay': 0.5,                 # Задержка между запросами (секунды)
     'timeout': 30,                # Таймаут запроса (секунды)
     'retries': 3,                 # Количество повторных попыток
+    'concurrency': 16,            # Количество одновременно обрабатываемых URL
+    'parse_processes': 0,         # Процессов для разбора HTML (0 - пул потоков)
+    'per_host': 8,                # Максимум одновременных запросов к одному хосту
+    'queue_maxsize': 10000,       # Максимальная длина очереди URL
+    'max_html_bytes': 10 * 1024 * 1024,  # Страницы больше этого размера пропускаются
+    'resume': False,              # Продолжить прерванный обход (visited.sqlite в output_dir)
     'user_agent': 'DocParser/1.0',  # User-Agent для запросов
     'include_patterns': [],       # Шаблоны URL для включения
     'exclude_patterns': [],       # Шаблоны URL для исключения
     'follow_links': True,         # Следовать ли по ссылкам
     'save_assets': False,         # Сохранять ли ассеты (изображения и т.д.)
+    'zip_compresslevel': 1,       # Уровень сжатия ZIP (1 - быстрее, 9 - компактнее)
     'output_format': 'markdown',  # Формат вывода по умолчанию
     'output_dir': 'output',       # Директория для результатов
     'log_level': 'INFO',          # Уровень логирования
@@ -27,8 +34,10 @@ REQUIREMENTS = [
     'beautifulsoup4',
     'tenacity',
     'lxml',
+    'selectolax',
+    'orjson',
     'fastapi',
-    'uvicorn',
+    'uvicorn[standard]',
     'pyyaml',
     'rich',
     'tqdm',
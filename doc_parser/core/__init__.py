@@ -6,14 +6,17 @@
 """
 
 from doc_parser.core.parser import DocumentationParser
-from doc_parser.core.profiles import SiteProfile, registry, detect_site_profile
+from doc_parser.core.profiles import SiteProfile, ProfileCache, registry, detect_site_profile
 from doc_parser.core.extraction import ContentExtractor, ContentProcessor
+from doc_parser.core.checkpoint import CrawlCheckpoint
 
 __all__ = [
     'DocumentationParser',
     'SiteProfile',
+    'ProfileCache',
     'registry',
     'detect_site_profile',
     'ContentExtractor',
-    'ContentProcessor'
+    'ContentProcessor',
+    'CrawlCheckpoint'
 ]
@@ -6,18 +6,110 @@
 """
 
 import os
+import re
+import time
+import tempfile
 import asyncio
 import aiohttp
 from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser, LexborNode
 from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
 import logging
+from collections import deque
 from dataclasses import dataclass
-from urllib.parse import urljoin
 
 from doc_parser.config import DEFAULT_CONFIG
-from doc_parser.utils.helpers import normalize_url, is_valid_url, is_same_domain, matches_pattern
-from doc_parser.core.profiles import detect_site_profile
+from doc_parser.utils.helpers import (
+    normalize_url, resolve_links, PatternMatcher, read_limited, decode_body, is_html_content_type, json_dumps_bytes, json_loads
+)
+from doc_parser.core.profiles import ProfileCache
+
+# Теги, разбираемые при обработке контента для RAG
+_TEXT_TAGS = frozenset(('p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'))
+_CODE_TAGS = frozenset(('pre', 'code'))
+_LIST_TAGS = frozenset(('ul', 'ol'))
+
+# Разделители для рекурсивного разбиения текста, от крупных к мелким
+_CHUNK_SEPARATORS = ('\n\n', '\n', '. ', ' ')
+
+_WORD_BOUNDARY_RE = re.compile(r'\s+')
+
+# Уровни заголовков, формирующие иерархию чанков
+_HEADING_LEVELS = {'h1': 1, 'h2': 2, 'h3': 3, 'h4': 4, 'h5': 5, 'h6': 6}
+
+
+def _split_spans(text: str, start: int, end: int, limit: int,
+                 separators: Sequence[str]) -> List[Tuple[int, int]]:
+    """
+    Делит text[start:end] на последовательные части не длиннее limit.
+    
+    Берется самый крупный разделитель, встречающийся в отрезке; части, которые
+    все еще длиннее limit, делятся рекурсивно следующими разделителями.
+    """
+    if end - start <= limit:
+        return [(start, end)]
+    
+    for i, sep in enumerate(separators):
+        if text.find(sep, start, end) != -1:
+            break
+    else:
+        # Разделителей не осталось - режем по длине
+        return [(pos, min(pos + limit, end)) for pos in range(start, end, limit)]
+    
+    rest = separators[i + 1:]
+    pieces = []
+    pos = start
+    while pos < end:
+        idx = text.find(sep, pos, end)
+        piece_end = end if idx == -1 else idx + len(sep)
+        pieces.extend(_split_spans(text, pos, piece_end, limit, rest))
+        pos = piece_end
+    return pieces
+
+
+def _recursive_chunk(text: str, size: int, overlap: int = 0,
+                     separators: Sequence[str] = _CHUNK_SEPARATORS) -> List[Tuple[int, int]]:
+    """
+    Рекурсивное разбиение текста на чанки с перекрытием.
+    
+    Args:
+        text: Исходный текст
+        size: Максимальная длина чанка в символах
+        overlap: Сколько символов конца предыдущего чанка повторять в начале следующего
+        separators: Разделители от крупных к мелким
+        
+    Returns:
+        List[Tuple[int, int]]: Границы чанков (start, end) в исходном тексте
+    """
+    overlap = overlap if 0 < overlap < size else 0
+    limit = size - overlap
+    
+    # Склеиваем соседние части, пока помещаются в limit
+    spans = []
+    for piece_start, piece_end in _split_spans(text, 0, len(text), limit, separators):
+        if spans and piece_end - spans[-1][0] <= limit:
+            spans[-1] = (spans[-1][0], piece_end)
+        else:
+            spans.append((piece_start, piece_end))
+    
+    chunks = []
+    for start, end in spans:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start == end:
+            continue
+        
+        if overlap and chunks:
+            # Перекрытие начинается с границы слова
+            match = _WORD_BOUNDARY_RE.search(text, max(start - overlap, chunks[-1][0] + 1), start)
+            if match:
+                start = match.end()
+        chunks.append((start, end))
+    return chunks
+
 
 @dataclass
 class ParsingStats:
@@ -29,6 +121,120 @@ class ParsingStats:
     start_time: float = 0
     end_time: float = 0
 
+class SpillDeque:
+    """
+    Очередь (FIFO) отложенных URL: не больше max_items в памяти, остальные
+    во временном файле.
+    
+    Как только часть URL ушла в файл, новые тоже пишутся туда, пока файл
+    не будет прочитан: порядок обхода сохраняется.
+    """
+    
+    def __init__(self, max_items: int):
+        """
+        Args:
+            max_items: Сколько URL держать в памяти
+        """
+        self.max_items = max_items
+        self._memory: deque = deque()
+        self._file = None
+        self._read_pos = 0
+        self._spilled = 0
+    
+    def __len__(self) -> int:
+        return len(self._memory) + self._spilled
+    
+    def append(self, item: Tuple[str, int]) -> None:
+        """Добавляет (url, depth) в конец очереди."""
+        if not self._spilled and len(self._memory) < self.max_items:
+            self._memory.append(item)
+            return
+        
+        if self._file is None:
+            self._file = tempfile.TemporaryFile()
+        self._file.seek(0, os.SEEK_END)
+        self._file.write(json_dumps_bytes(item) + b'\n')
+        self._spilled += 1
+    
+    def popleft(self) -> Tuple[str, int]:
+        """Извлекает (url, depth) из начала очереди."""
+        if not self._memory and self._spilled:
+            self._load()
+        return self._memory.popleft()
+    
+    def _load(self) -> None:
+        """Переносит в память следующую порцию URL из файла."""
+        count = min(self.max_items, self._spilled)
+        self._file.seek(self._read_pos)
+        for _ in range(count):
+            url, depth = json_loads(self._file.readline())
+            self._memory.append((url, depth))
+        self._spilled -= count
+        self._read_pos = self._file.tell()
+        
+        # Файл прочитан целиком: начинаем его заново
+        if not self._spilled:
+            self._file.seek(0)
+            self._file.truncate()
+            self._read_pos = 0
+    
+    def close(self) -> None:
+        """Удаляет временный файл."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._memory.clear()
+        self._read_pos = 0
+        self._spilled = 0
+
+class RateLimiter:
+    """
+    Ограничитель частоты запросов (token bucket).
+    
+    В отличие от семафора ограничивает не число одновременных запросов,
+    а количество запросов за период времени.
+    """
+    
+    def __init__(self, rate: float, period: float = 1.0):
+        """
+        Args:
+            rate: Допустимое число запросов за период (0 - без ограничения)
+            period: Длительность периода в секундах
+        """
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self) -> None:
+        """Ожидает, пока в корзине не появится свободный токен."""
+        if self.rate <= 0:
+            return
+        
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.rate,
+                    self._tokens + (now - self._updated) * self.rate / self.period
+                )
+                self._updated = now
+                
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self._tokens) * self.period / self.rate)
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
 class AsyncDocumentationParser:
     """
     Асинхронный парсер документации с улучшенной производительностью и настройками для RAG.
@@ -60,6 +266,14 @@ class AsyncDocumentationParser:
             'timeout': self.config.get('timeout', 30),
             'follow_redirects': self.config.get('follow_redirects', True),
             'verify_ssl': self.config.get('verify_ssl', True),
+            'max_html_bytes': self.config.get('max_html_bytes', 10 * 1024 * 1024),
+            'queue_maxsize': self.config.get('queue_maxsize', 10_000),
+            # Сколько отложенных URL держать в памяти сверх очереди (остальные - на диске)
+            'overflow_maxsize': self.config.get('overflow_maxsize', 100_000),
+            'worker_batch_size': self.config.get('worker_batch_size', 4),
+            # Запись результатов в JSONL по мере обработки вместо хранения в памяти
+            'stream_results': self.config.get('stream_results', False),
+            'write_batch_size': self.config.get('write_batch_size', 64),
             'headers': self.config.get('headers', {
                 'User-Agent': self.config.get('user_agent', 'DocParser/Async/2.0')
             }),
@@ -67,14 +281,33 @@ class AsyncDocumentationParser:
         
         # Состояние парсера
         self.visited_urls: Set[str] = set()
-        self.url_queue: asyncio.Queue = asyncio.Queue()
+        self.enqueued: Set[str] = set()
+        self.url_queue: asyncio.Queue = asyncio.Queue(maxsize=self.parsing_config['queue_maxsize'])
+        # Ссылки, не поместившиеся в заполненную очередь; воркеры не ждут на put(),
+        # иначе при заполненной очереди все они заблокируются и обход встанет.
+        # Сверх overflow_maxsize ссылки уходят во временный файл
+        self._overflow = SpillDeque(self.parsing_config['overflow_maxsize'])
         self.results: Dict = {}
+        self.results_path = os.path.join(self.config['output_dir'], 'results.jsonl')
+        self._out_fh = None
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._stream_started = False
+        self.profiles = ProfileCache()
         self.stats = ParsingStats()
         self.logger = logging.getLogger('async_parser')
         
+        # Шаблоны URL компилируются один раз
+        self._include = PatternMatcher(self.config['include_patterns'])
+        self._exclude = PatternMatcher(self.config['exclude_patterns'])
+        
         # Семафоры для контроля конкурентности
         self.request_semaphore = asyncio.Semaphore(self.parsing_config['max_concurrent_requests'])
-        self.rate_limiter = asyncio.Semaphore(self.parsing_config['rate_limit'])
+        self.rate_limiter = RateLimiter(self.parsing_config['rate_limit'])
+    
+    @staticmethod
+    def _parse(html: str) -> LexborHTMLParser:
+        """Разбор HTML быстрым C-парсером (Lexbor) для горячих путей обработки."""
+        return LexborHTMLParser(html)
     
     async def fetch_url(self, session: aiohttp.ClientSession, url: str) -> Optional[str]:
         """Асинхронная загрузка URL с улучшенной обработкой ошибок и повторными попытками."""
@@ -85,27 +318,73 @@ class AsyncDocumentationParser:
         )
         
         async with self.request_semaphore:
-            async with self.rate_limiter:
-                try:
-                    async for attempt in retry_config:
-                        with attempt:
+            try:
+                async for attempt in retry_config:
+                    with attempt:
+                        # Лимит частоты применяется и к повторным попыткам
+                        async with self.rate_limiter:
                             async with session.get(
                                 url,
-                                headers=self.parsing_config['headers'],
-                                timeout=self.parsing_config['timeout'],
                                 ssl=self.parsing_config['verify_ssl'],
                                 allow_redirects=self.parsing_config['follow_redirects']
                             ) as response:
                                 response.raise_for_status()
-                                return await response.text()
-                except Exception as e:
-                    self.logger.error(f"Ошибка при загрузке {url}: {e}")
-                    self.stats.failed_urls += 1
-                    return None
-    
-    async def process_content_for_rag(self, content_html: str) -> Dict:
-        """Обработка контента для RAG с сохранением структуры и метаданных."""
-        soup = BeautifulSoup(content_html, 'lxml')
+                                
+                                # Пропускаем не-HTML ресурсы (PDF, изображения, архивы); без
+                                # заголовка aiohttp сообщает application/octet-stream, поэтому
+                                # проверяется сам заголовок
+                                content_type = response.headers.get('Content-Type', '')
+                                if not is_html_content_type(content_type):
+                                    self.logger.debug(f"Пропуск {url}: {content_type}")
+                                    self.stats.skipped_urls += 1
+                                    return None
+                                
+                                if (response.content_length and
+                                        response.content_length > self.parsing_config['max_html_bytes']):
+                                    self.logger.debug(f"Пропуск {url}: слишком большой ответ")
+                                    self.stats.skipped_urls += 1
+                                    return None
+                                
+                                # Размер chunked-ответов заранее неизвестен: читаем с лимитом
+                                body = await read_limited(response, self.parsing_config['max_html_bytes'])
+                                if body is None:
+                                    self.logger.debug(f"Пропуск {url}: слишком большой ответ")
+                                    self.stats.skipped_urls += 1
+                                    return None
+                                
+                                # Без явной кодировки считаем UTF-8 и не запускаем её автоопределение
+                                return decode_body(body, response.charset)
+            except Exception as e:
+                self.logger.error(f"Ошибка при загрузке {url}: {e}")
+                self.stats.failed_urls += 1
+                return None
+    
+    async def process_content_for_rag(
+        self, content: Union[str, LexborHTMLParser, LexborNode]
+    ) -> Dict:
+        """
+        Обработка контента для RAG в пуле потоков, чтобы не блокировать цикл событий.
+        
+        Args:
+            content: HTML-строка или уже разобранное дерево/узел selectolax
+        """
+        return await asyncio.to_thread(self._process_content_for_rag_sync, content)
+    
+    def _process_content_for_rag_sync(
+        self, content: Union[str, LexborHTMLParser, LexborNode]
+    ) -> Dict:
+        """
+        Обработка контента для RAG с сохранением структуры и метаданных.
+        
+        Дерево обходится один раз; каждый узел направляется в нужный
+        обработчик по имени тега.
+        
+        Args:
+            content: HTML-строка или уже разобранное дерево/узел selectolax
+        """
+        if isinstance(content, str):
+            content = self._parse(content)
+        root = content.root if isinstance(content, LexborHTMLParser) else content
         result = {
             'chunks': [],
             'code_blocks': [],
@@ -114,94 +393,109 @@ class AsyncDocumentationParser:
             'metadata': {}
         }
         
-        # Извлечение метаданных
-        for meta in soup.find_all('meta'):
-            name = meta.get('name', meta.get('property', ''))
-            content = meta.get('content', '')
-            if name and content:
-                result['metadata'][name] = content
-        
-        # Разбиение на чанки с сохранением структуры
-        current_chunk = []
-        current_size = 0
-        
-        for element in soup.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-            text = element.get_text(strip=True)
-            if not text:
-                continue
+        extract_code = self.rag_config['extract_code_blocks']
+        extract_tables = self.rag_config['extract_tables']
+        extract_lists = self.rag_config['extract_lists']
+        
+        # Текст собирается по разделам: каждый заголовок открывает новый раздел
+        sections = []
+        section_parts = []
+        heading_path = {}
+        
+        def close_section():
+            if section_parts:
+                sections.append(('\n\n'.join(section_parts), dict(heading_path)))
+        
+        for node in root.traverse(include_text=False):
+            tag = node.tag
+            
+            if tag in _TEXT_TAGS:
+                text = node.text(deep=True, strip=True)
+                if not text:
+                    continue
+                
+                level = _HEADING_LEVELS.get(tag)
+                if level:
+                    close_section()
+                    section_parts = []
+                    heading_path = {lvl: h for lvl, h in heading_path.items() if lvl < level}
+                    heading_path[level] = text
+                
+                section_parts.append(text)
+            
+            elif tag == 'meta':
+                attrs = node.attributes
+                name = attrs.get('name') or attrs.get('property') or ''
+                content = attrs.get('content') or ''
+                if name and content:
+                    result['metadata'][name] = content
             
-            # Сохраняем структурные элементы
-            if element.name.startswith('h'):
-                if current_chunk:
-                    result['chunks'].append({
-                        'text': ' '.join(current_chunk),
-                        'size': current_size
+            elif tag in _CODE_TAGS:
+                if extract_code:
+                    classes = (node.attributes.get('class') or '').split()
+                    result['code_blocks'].append({
+                        'language': classes[0].replace('language-', '') if classes else '',
+                        'code': node.text(deep=True, strip=True)
                     })
-                    current_chunk = []
-                    current_size = 0
             
-            # Добавляем текст в текущий чанк
-            current_chunk.append(text)
-            current_size += len(text)
+            elif tag == 'table':
+                if extract_tables:
+                    headers = [th.text(deep=True, strip=True) for th in node.css('th')]
+                    rows = []
+                    for tr in node.css('tr'):
+                        row = [td.text(deep=True, strip=True) for td in tr.css('td')]
+                        if row:
+                            rows.append(row)
+                    
+                    result['tables'].append({
+                        'headers': headers,
+                        'rows': rows
+                    })
             
-            # Если достигнут размер чанка, сохраняем его
-            if current_size >= self.rag_config['chunk_size']:
-                result['chunks'].append({
-                    'text': ' '.join(current_chunk),
-                    'size': current_size
-                })
-                current_chunk = []
-                current_size = 0
-        
-        # Сохраняем последний чанк
-        if current_chunk:
-            result['chunks'].append({
-                'text': ' '.join(current_chunk),
-                'size': current_size
-            })
-        
-        # Извлечение кода
-        if self.rag_config['extract_code_blocks']:
-            for code in soup.find_all(['pre', 'code']):
-                result['code_blocks'].append({
-                    'language': code.get('class', [''])[0].replace('language-', ''),
-                    'code': code.get_text(strip=True)
-                })
-        
-        # Извлечение таблиц
-        if self.rag_config['extract_tables']:
-            for table in soup.find_all('table'):
-                headers = []
-                rows = []
-                
-                # Извлечение заголовков
-                for th in table.find_all('th'):
-                    headers.append(th.get_text(strip=True))
-                
-                # Извлечение данных
-                for tr in table.find_all('tr'):
-                    row = []
-                    for td in tr.find_all('td'):
-                        row.append(td.get_text(strip=True))
-                    if row:
-                        rows.append(row)
-                
-                result['tables'].append({
-                    'headers': headers,
-                    'rows': rows
-                })
+            elif tag in _LIST_TAGS:
+                if extract_lists:
+                    result['lists'].append({
+                        'type': tag,
+                        'items': [li.text(deep=True, strip=True) for li in node.css('li')]
+                    })
         
-        # Извлечение списков
-        if self.rag_config['extract_lists']:
-            for list_elem in soup.find_all(['ul', 'ol']):
-                items = [li.get_text(strip=True) for li in list_elem.find_all('li')]
-                result['lists'].append({
-                    'type': list_elem.name,
-                    'items': items
-                })
+        close_section()
+        result['chunks'] = self._chunk_sections(sections)
         
         return result
     
+    def _chunk_sections(self, sections: List[Tuple[str, Dict[int, str]]]) -> List[Dict]:
+        """
+        Разбиение разделов на чанки с перекрытием и иерархией заголовков.
+        
+        Args:
+            sections: Пары (текст раздела, {уровень: заголовок})
+            
+        Returns:
+            List[Dict]: Чанки; start_char/end_char - смещения в тексте страницы,
+            где разделы разделены пустой строкой
+        """
+        chunk_size = self.rag_config['chunk_size']
+        overlap = self.rag_config['chunk_overlap']
+        
+        chunks = []
+        offset = 0
+        for text, heading_path in sections:
+            level = max(heading_path) if heading_path else 0
+            for start, end in _recursive_chunk(text, chunk_size, overlap):
+                chunk_text = text[start:end]
+                chunks.append({
+                    'text': chunk_text,
+                    'size': len(chunk_text),
+                    'start_char': offset + start,
+                    'end_char': offset + end,
+                    'parent_heading': heading_path.get(level, ''),
+                    'level': level,
+                    'headings': [heading_path[lvl] for lvl in sorted(heading_path)],
+                })
+            offset += len(text) + 2
+        return chunks
+    
     async def process_url(self, session: aiohttp.ClientSession, url: str, depth: int) -> None:
         """Асинхронная обработка URL с извлечением контента и сохранением структуры."""
         norm_url = normalize_url(url)
@@ -216,8 +510,89 @@ class AsyncDocumentationParser:
         if not html_content:
             return
         
+        follow_links = self.config['follow_links'] and depth < self.config['max_depth']
+        
+        # Разбор страницы - чистая работа CPU; выносим ее в поток, чтобы остальные
+        # воркеры продолжали сетевой обмен (lxml и selectolax отпускают GIL при разборе)
+        page = await asyncio.to_thread(self._process_page, norm_url, html_content, follow_links)
+        page['depth'] = depth
+        
+        if self._write_queue is not None:
+            # Полный результат уходит писателю на диск, в памяти остается только индекс
+            await self._write_queue.put(page)
+            self.results[norm_url] = {
+                'url': norm_url,
+                'title': page['title'],
+                'profile': page['profile'],
+                'depth': depth
+            }
+        else:
+            self.results[norm_url] = page
+        
+        if follow_links:
+            for link in page['links']:
+                if link in self.enqueued or link in self.visited_urls:
+                    continue
+                if not self._allowed(link):
+                    continue
+                
+                self._enqueue(link, depth + 1)
+                self.stats.total_urls += 1
+    
+    async def _writer(self) -> None:
+        """
+        Запись результатов в JSONL пачками.
+        
+        Сериализация и запись пачки выполняются в потоке, поэтому дисковый
+        ввод-вывод не останавливает цикл событий.
+        """
+        batch_size = self.parsing_config['write_batch_size']
+        while True:
+            batch = [await self._write_queue.get()]
+            while len(batch) < batch_size and not self._write_queue.empty():
+                batch.append(self._write_queue.get_nowait())
+            
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as e:
+                self.logger.error(f"Ошибка записи результатов: {e}")
+            finally:
+                for _ in batch:
+                    self._write_queue.task_done()
+    
+    def _write_batch(self, batch: List[Dict]) -> None:
+        """Сериализация и запись пачки результатов одним вызовом write."""
+        self._out_fh.write(b''.join(json_dumps_bytes(page) + b'\n' for page in batch))
+        self._out_fh.flush()
+    
+    def _enqueue(self, url: str, depth: int) -> None:
+        """Постановка URL в очередь без повторов."""
+        self.enqueued.add(url)
+        try:
+            self.url_queue.put_nowait((url, depth))
+        except asyncio.QueueFull:
+            self._overflow.append((url, depth))
+    
+    def _refill_queue(self) -> None:
+        """Перенос отложенных URL в освободившуюся очередь."""
+        while self._overflow and not self.url_queue.full():
+            self.url_queue.put_nowait(self._overflow.popleft())
+    
+    def _process_page(self, url: str, html_content: str, follow_links: bool) -> Dict:
+        """
+        Синхронная обработка загруженной страницы.
+        
+        Args:
+            url: Нормализованный URL страницы
+            html_content: HTML-код страницы
+            follow_links: Извлекать ли ссылки для дальнейшего обхода
+            
+        Returns:
+            Dict: Результат для страницы (без глубины)
+        """
+        tree = self._parse(html_content)
         soup = BeautifulSoup(html_content, 'lxml')
-        profile = detect_site_profile(norm_url, html_content)
+        profile = self.profiles.detect(url, soup)
         
         # Используем Generic профиль если не определен конкретный
         if not profile:
@@ -227,83 +602,144 @@ class AsyncDocumentationParser:
         content = profile.extract_content(soup)
         navigation = profile.extract_navigation(soup)
         
-        # Обработка для RAG
-        rag_content = await self.process_content_for_rag(str(content) if content else '')
+        # Контент сериализуется один раз: строка идет и в результат, и в RAG-обработку
+        content_html = str(content) if content else ''
         
-        self.results[norm_url] = {
-            'url': norm_url,
-            'title': soup.title.text.strip() if soup.title else '',
-            'content_html': str(content) if content else '',
+        return {
+            'url': url,
+            'title': self._extract_title(tree),
+            'content_html': content_html,
             'navigation_html': str(navigation) if navigation else '',
             'profile': profile.name,
-            'depth': depth,
-            'rag_content': rag_content,
-            'links': []
+            'rag_content': self._process_content_for_rag_sync(content_html),
+            'links': self._extract_links(tree, url) if follow_links else []
         }
-        
-        if self.config['follow_links'] and depth < self.config['max_depth']:
-            links = self._extract_links(soup, norm_url)
-            self.results[norm_url]['links'] = links
-            
-            for link in links:
-                if (self.config['include_patterns'] and 
-                    not matches_pattern(link, self.config['include_patterns'])):
-                    continue
-                if matches_pattern(link, self.config['exclude_patterns']):
-                    continue
-                
-                await self.url_queue.put((link, depth + 1))
-                self.stats.total_urls += 1
     
-    def _extract_links(self, soup: BeautifulSoup, base_url: str) -> List[str]:
-        """Извлечение и фильтрация ссылок."""
-        links = []
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag['href']
-            if href.startswith(('#', 'javascript:', 'mailto:')):
-                continue
-            
-            full_url = normalize_url(urljoin(base_url, href))
-            if not is_valid_url(full_url) or not is_same_domain(full_url, base_url):
-                continue
-            
-            links.append(full_url)
-        return links
+    def _allowed(self, link: str) -> bool:
+        """Проверяет ссылку по шаблонам включения и исключения."""
+        if self._include and not self._include.search(link):
+            return False
+        return not self._exclude.search(link)
+    
+    @staticmethod
+    def _extract_title(tree: LexborHTMLParser) -> str:
+        """Извлечение заголовка страницы."""
+        title = tree.css_first('title')
+        return title.text(strip=True) if title else ''
+    
+    def _extract_links(self, tree: LexborHTMLParser, base_url: str) -> List[str]:
+        """Извлечение и фильтрация ссылок (без повторов)."""
+        hrefs = (a_tag.attributes.get('href') or '' for a_tag in tree.css('a[href]'))
+        return resolve_links(hrefs, base_url)
     
     async def worker(self, session: aiohttp.ClientSession) -> None:
         """Рабочий процесс обработки URL из очереди."""
+        batch_size = self.parsing_config['worker_batch_size']
         while True:
             try:
-                url, depth = await self.url_queue.get()
-                await self.process_url(session, url, depth)
-                self.url_queue.task_done()
+                batch = [await self.url_queue.get()]
             except asyncio.CancelledError:
                 break
-            except Exception as e:
-                self.logger.error(f"Ошибка в worker: {e}")
-                self.url_queue.task_done()
+            
+            # Забираем из очереди сразу несколько URL: запросы пачки идут параллельно,
+            # а число одновременных загрузок по-прежнему ограничено семафором в fetch_url
+            while len(batch) < batch_size and not self.url_queue.empty():
+                batch.append(self.url_queue.get_nowait())
+            
+            try:
+                results = await asyncio.gather(
+                    *(self.process_url(session, url, depth) for url, depth in batch),
+                    return_exceptions=True
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        self.logger.error(f"Ошибка в worker: {result}")
+            finally:
+                # Пополняем очередь до task_done, чтобы join() не завершился раньше времени
+                self._refill_queue()
+                for _ in batch:
+                    self.url_queue.task_done()
     
     async def crawl(self, start_url: str) -> Dict:
         """Запуск асинхронного обхода с указанного URL."""
         self.stats = ParsingStats()
         self.stats.total_urls = 1
+        self.stats.start_time = time.monotonic()
         
-        async with aiohttp.ClientSession() as session:
-            await self.url_queue.put((start_url, 0))
-            
-            workers = [
-                asyncio.create_task(self.worker(session))
-                for _ in range(self.parsing_config['max_concurrent_requests'])
-            ]
-            
-            await self.url_queue.join()
-            
-            for worker in workers:
-                worker.cancel()
+        # Все страницы документации обычно на одном хосте: держим соединения
+        # открытыми и кэшируем DNS, чтобы не платить за TLS/DNS на каждый URL
+        connector = aiohttp.TCPConnector(
+            limit=self.parsing_config['max_concurrent_requests'],
+            limit_per_host=self.parsing_config['max_concurrent_requests'],
+            ttl_dns_cache=300,
+            keepalive_timeout=30,
+            enable_cleanup_closed=True
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=self.parsing_config['timeout'],
+            connect=10,
+            sock_read=20
+        )
+        
+        if self.parsing_config['stream_results']:
+            os.makedirs(self.config['output_dir'], exist_ok=True)
+            # Первый обход экземпляра начинает файл заново, повторные дописывают
+            mode = 'ab' if self._stream_started else 'wb'
+            self._out_fh = open(self.results_path, mode)
+            self._stream_started = True
+            self._write_queue = asyncio.Queue(maxsize=self.parsing_config['write_batch_size'] * 4)
+            writer = asyncio.create_task(self._writer())
+        
+        try:
+            async with aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers=self.parsing_config['headers']
+            ) as session:
+                self._enqueue(normalize_url(start_url), 0)
+                
+                workers = [
+                    asyncio.create_task(self.worker(session))
+                    for _ in range(self.parsing_config['max_concurrent_requests'])
+                ]
+                
+                await self.url_queue.join()
+                
+                for worker in workers:
+                    worker.cancel()
+                
+                await asyncio.gather(*workers, return_exceptions=True)
             
-            await asyncio.gather(*workers, return_exceptions=True)
+            if self._write_queue is not None:
+                await self._write_queue.join()
+        finally:
+            if self._write_queue is not None:
+                writer.cancel()
+                await asyncio.gather(writer, return_exceptions=True)
+                self._write_queue = None
+            if self._out_fh:
+                self._out_fh.close()
+                self._out_fh = None
+            self._overflow.close()
         
+        self.stats.end_time = time.monotonic()
         return self.results
+    
+    def iter_results(self) -> Iterator[Dict]:
+        """
+        Итерация по полным результатам обхода.
+        
+        При stream_results результаты читаются из JSONL-файла построчно,
+        иначе берутся из памяти.
+        """
+        if not self._stream_started:
+            yield from self.results.values()
+            return
+        
+        with open(self.results_path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield json_loads(line)
 
 # Пример использования:
 # async def main():
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Контрольная точка обхода для продолжения прерванного парсинга.
+"""
+
+import time
+import sqlite3
+import hashlib
+
+try:
+    from blake3 import blake3
+except ImportError:  # blake3 необязателен: без него используется blake2b из hashlib
+    blake3 = None
+
+from doc_parser.utils.helpers import json_dumps_bytes, json_loads
+
+
+def _url_key(url):
+    """16-байтовый ключ URL для индекса посещенных страниц."""
+    data = url.encode()
+    if blake3 is not None:
+        return blake3(data).digest(16)
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class CrawlCheckpoint:
+    """
+    Хранит в SQLite посещенные URL, результаты их парсинга и еще не
+    обработанные ссылки (фронтир).
+    
+    Страница отмечается посещенной вместе с добавлением найденных на ней
+    ссылок, и изменения фиксируются пачками (commit_every), чтобы не делать
+    fsync на каждую страницу. После сбоя теряется не более одной пачки:
+    такие страницы просто будут обработаны повторно.
+    """
+    
+    def __init__(self, path, commit_every=500):
+        """
+        Открывает (или создает) файл контрольной точки.
+        
+        Args:
+            path: Путь к файлу SQLite
+            commit_every: Количество изменений между фиксациями
+        """
+        self.path = path
+        self.commit_every = commit_every
+        self._pending = 0
+        
+        # Обход может запускаться не в том потоке, где создан парсер (GUI, API);
+        # обращения к соединению при этом последовательны
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS seen(url_hash BLOB PRIMARY KEY, ts REAL)')
+        self._db.execute('CREATE TABLE IF NOT EXISTS frontier(url TEXT PRIMARY KEY, depth INTEGER)')
+        # Результаты страниц: продолженный обход экспортирует и страницы прошлых запусков
+        self._db.execute('CREATE TABLE IF NOT EXISTS results(url TEXT PRIMARY KEY, data BLOB)')
+        self._db.commit()
+    
+    def seen(self, url):
+        """
+        Проверяет, была ли страница обработана в этом или предыдущем запуске.
+        
+        Args:
+            url: Нормализованный URL
+        
+        Returns:
+            bool: True если страница уже обработана
+        """
+        row = self._db.execute('SELECT 1 FROM seen WHERE url_hash=?', (_url_key(url),)).fetchone()
+        return row is not None
+    
+    def mark_done(self, url, links=(), depth=0, result=None):
+        """
+        Отмечает страницу обработанной и сохраняет найденные на ней ссылки.
+        
+        Args:
+            url: Нормализованный URL страницы
+            links: Ссылки для обхода
+            depth: Глубина страницы (ссылки получают depth + 1)
+            result: Результат парсинга страницы (опционально)
+        """
+        self._db.execute('INSERT OR IGNORE INTO seen VALUES (?, ?)', (_url_key(url), time.time()))
+        if result is not None:
+            self._db.execute('INSERT OR REPLACE INTO results VALUES (?, ?)', (url, json_dumps_bytes(result)))
+        self._db.execute('DELETE FROM frontier WHERE url=?', (url,))
+        if links:
+            self._db.executemany(
+                'INSERT OR IGNORE INTO frontier VALUES (?, ?)',
+                [(link, depth + 1) for link in links]
+            )
+        
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self.flush()
+    
+    def pending(self):
+        """
+        Возвращает ссылки, оставшиеся необработанными после прошлого запуска.
+        
+        Returns:
+            list: Список кортежей (url, depth)
+        """
+        return self._db.execute('SELECT url, depth FROM frontier').fetchall()
+    
+    def results(self):
+        """
+        Возвращает результаты страниц, обработанных во всех запусках.
+        
+        Returns:
+            dict: URL -> результат парсинга (в порядке обработки)
+        """
+        rows = self._db.execute('SELECT url, data FROM results ORDER BY rowid').fetchall()
+        return {url: json_loads(data) for url, data in rows}
+    
+    def flush(self):
+        """Фиксирует накопленные изменения."""
+        self._db.commit()
+        self._pending = 0
+    
+    def close(self):
+        """Фиксирует изменения и закрывает файл."""
+        self.flush()
+        self._db.close()
@@ -7,12 +7,49 @@
 
 import re
 from bs4 import BeautifulSoup
+from lxml import etree
+from lxml import html as lxml_html
 
 from doc_parser.utils.helpers import (
-    find_element, extract_text, get_meta_tag, get_title
+    find_element, fast_text, get_title, lxml_document
 )
 
 
+# XPath для div с заданным CSS-классом
+_DIV_CLASS_XPATH = "//div[contains(concat(' ', normalize-space(@class), ' '), ' %s ')]"
+
+# Кандидаты на основной контент в порядке приоритета: (тег, класс, XPath)
+_MAIN_CONTENT_CANDIDATES = [
+    ('main', None, etree.XPath('//main')),
+    ('article', None, etree.XPath('//article')),
+    ('div', 'content', etree.XPath(_DIV_CLASS_XPATH % 'content')),
+    ('div', 'main', etree.XPath(_DIV_CLASS_XPATH % 'main')),
+    ('div', 'body', etree.XPath(_DIV_CLASS_XPATH % 'body')),
+]
+
+_ALL_DIVS = etree.XPath('//div')
+_NESTED_DIVS = etree.XPath('.//div')
+
+# Начиная с этого размера (в символах) страница не разбирается в lxml-дерево:
+# берется первый <main>/<article> без оценки всех кандидатов
+_LARGE_PAGE_CHARS = 2 * 1024 * 1024
+
+# Очистка контента
+_CLEANUP_ELEMENTS = ('script', 'style', 'iframe', 'noscript')
+_CLEANUP_ATTRIBUTES = ('style', 'class', 'id', 'onclick', 'onload')
+
+
+# Генерация якорей для заголовков
+_HEADING_TAGS = ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']
+_SLUG_STRIP_RE = re.compile(r'[^\w\s-]')
+_SLUG_DASH_RE = re.compile(r'[\s-]+')
+
+
+def _text_length(element):
+    """Длина текста lxml-элемента с нормализованными пробелами."""
+    return len(' '.join(element.text_content().split()))
+
+
 class ContentExtractor:
     """
     Класс для извлечения и обработки контента документации.
@@ -47,8 +84,8 @@ class ContentExtractor:
             if main_content:
                 return main_content
             
-            # Если не нашли, возвращаем копию всей страницы
-            return BeautifulSoup(str(soup), 'lxml')
+            # Если не нашли, возвращаем всю страницу
+            return soup
         
         # Очищаем контент от нежелательных элементов
         return self.profile.clean_content(content)
@@ -78,21 +115,29 @@ class ContentExtractor:
         Returns:
             dict: Словарь с метаданными
         """
+        # Все meta-теги собираются за один обход дерева, а не поиском на каждое
+        # имя; при повторе имени берется первый тег, как у get_meta_tag
+        meta_tags = soup.find_all('meta')
+        meta_names = {}
+        for tag in meta_tags:
+            name = tag.get('name')
+            if name is not None and name not in meta_names:
+                meta_names[name] = tag.get('content', '')
+        
         metadata = {
             'title': get_title(soup),
-            'description': get_meta_tag(soup, 'description'),
-            'keywords': get_meta_tag(soup, 'keywords'),
-            'author': get_meta_tag(soup, 'author'),
-            'generator': get_meta_tag(soup, 'generator'),
+            'description': meta_names.get('description', ''),
+            'keywords': meta_names.get('keywords', ''),
+            'author': meta_names.get('author', ''),
+            'generator': meta_names.get('generator', ''),
             'url': url,
         }
         
         # Добавляем OpenGraph метаданные
-        og_tags = soup.find_all('meta', property=lambda x: x and x.startswith('og:'))
-        for tag in og_tags:
-            if tag.get('property') and tag.get('content'):
-                property_name = tag['property'][3:]  # Убираем 'og:'
-                metadata[f'og_{property_name}'] = tag['content']
+        for tag in meta_tags:
+            property_name = tag.get('property')
+            if property_name and property_name.startswith('og:') and tag.get('content'):
+                metadata[f'og_{property_name[3:]}'] = tag['content']  # Убираем 'og:'
         
         return metadata
     
@@ -100,49 +145,73 @@ class ContentExtractor:
         """
         Эвристически находит основной контент страницы.
         
+        Длина текста кандидатов считается на lxml-дереве (без повторной
+        сериализации и разбора каждого кандидата), а найденный элемент
+        возвращается из исходного soup по его порядковому номеру.
+        
         Args:
             soup: BeautifulSoup объект
             
         Returns:
             BeautifulSoup объект с найденным контентом или None
         """
-        # Приоритет тегов для поиска
-        priority_tags = ['main', 'article', 'div.content', 'div.main', 'div.body']
+        html_content = str(soup)
+        
+        # На очень больших страницах (справочники API, карты сайта) второе дерево
+        # удвоило бы память: довольствуемся первым явным контейнером
+        if len(html_content) > _LARGE_PAGE_CHARS:
+            for tag_name in ('main', 'article'):
+                element = soup.find(tag_name)
+                if element:
+                    return element
+        
+        try:
+            root = lxml_document(html_content)
+        except etree.ParserError:
+            return None
         
-        for tag in priority_tags:
-            if '.' in tag:
-                tag_name, class_name = tag.split('.')
-                elements = soup.find_all(tag_name, class_=class_name)
+        # Текст скриптов и стилей не учитываем
+        etree.strip_elements(root, 'script', 'style', with_tail=False)
+        
+        # Приоритет тегов для поиска
+        for tag_name, class_name, xpath in _MAIN_CONTENT_CANDIDATES:
+            elements = xpath(root)
+            if not elements:
+                continue
+            
+            # Выбираем элемент с наибольшим количеством текста
+            lengths = [_text_length(element) for element in elements]
+            max_text_len = max(lengths)
+            if not max_text_len:
+                return None
+            
+            if class_name:
+                matches = soup.find_all(tag_name, class_=class_name)
             else:
-                elements = soup.find_all(tag)
+                matches = soup.find_all(tag_name)
             
-            if elements:
-                # Выбираем элемент с наибольшим количеством текста
-                max_text_len = 0
-                best_element = None
-                
-                for element in elements:
-                    text_len = len(extract_text(str(element)))
-                    if text_len > max_text_len:
-                        max_text_len = text_len
-                        best_element = element
-                
-                return best_element
+            best_idx = lengths.index(max_text_len)
+            return matches[best_idx] if best_idx < len(matches) else None
         
         # Если ничего не нашли, ищем div с максимальным количеством текста
-        divs = soup.find_all('div')
+        divs = _ALL_DIVS(root)
+        total_divs = len(divs)
         max_text_len = 0
-        best_div = None
+        best_idx = None
         
-        for div in divs:
-            text_len = len(extract_text(str(div)))
+        for idx, div in enumerate(divs):
+            text_len = _text_length(div)
             if text_len > max_text_len:
                 # Проверяем, что это не обёртка всей страницы
-                if len(div.find_all('div')) < len(soup.find_all('div')) / 2:
+                if len(_NESTED_DIVS(div)) < total_divs / 2:
                     max_text_len = text_len
-                    best_div = div
+                    best_idx = idx
+        
+        if best_idx is None:
+            return None
         
-        return best_div
+        soup_divs = soup.find_all('div')
+        return soup_divs[best_idx] if best_idx < len(soup_divs) else None
 
 
 class ContentProcessor:
@@ -164,19 +233,16 @@ class ContentProcessor:
         Returns:
             str: Очищенный HTML-контент
         """
-        soup = BeautifulSoup(html_content, 'lxml')
+        try:
+            root = lxml_document(html_content)
+        except etree.ParserError:
+            return ''
         
-        # Удаляем скрипты и стили
-        for tag in soup(['script', 'style', 'iframe', 'noscript']):
-            tag.decompose()
+        # Удаляем скрипты, стили и атрибуты оформления за один проход lxml
+        etree.strip_elements(root, *_CLEANUP_ELEMENTS, with_tail=False)
+        etree.strip_attributes(root, *_CLEANUP_ATTRIBUTES)
         
-        # Удаляем атрибуты оформления
-        for tag in soup.find_all(True):
-            for attr in list(tag.attrs):
-                if attr in ['style', 'class', 'id', 'onclick', 'onload']:
-                    del tag[attr]
-        
-        return str(soup)
+        return lxml_html.tostring(root, encoding='unicode')
     
     def structure(self, html_content):
         """
@@ -190,15 +256,18 @@ class ContentProcessor:
         """
         soup = BeautifulSoup(html_content, 'lxml')
         
-        # Добавляем id к заголовкам
-        for tag_name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-            for idx, tag in enumerate(soup.find_all(tag_name)):
-                if not tag.get('id'):
-                    # Генерируем id из текста заголовка
-                    text = tag.get_text().strip()
-                    slug = re.sub(r'[^\w\s-]', '', text.lower())
-                    slug = re.sub(r'[\s-]+', '-', slug)
-                    tag['id'] = f"{slug}-{idx}"
+        # Добавляем id к заголовкам (номер считается отдельно для каждого уровня)
+        counters = dict.fromkeys(_HEADING_TAGS, 0)
+        for tag in soup.find_all(_HEADING_TAGS):
+            idx = counters[tag.name]
+            counters[tag.name] = idx + 1
+            
+            if not tag.get('id'):
+                # Генерируем id из текста заголовка
+                text = fast_text(tag)
+                slug = _SLUG_STRIP_RE.sub('', text.lower())
+                slug = _SLUG_DASH_RE.sub('-', slug)
+                tag['id'] = f"{slug}-{idx}"
         
         return str(soup)
     
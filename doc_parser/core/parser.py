@@ -7,18 +7,69 @@
 
 import os
 import time
+import asyncio
+import aiohttp
+from concurrent.futures import ProcessPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from collections import deque
 from urllib.parse import urljoin
 from bs4 import BeautifulSoup
-from tenacity import retry, stop_after_attempt, wait_fixed
+from selectolax.lexbor import LexborHTMLParser
+from tenacity import (
+    AsyncRetrying, retry, retry_if_exception, stop_after_attempt,
+    wait_exponential, wait_fixed
+)
 
 from doc_parser.config import DEFAULT_CONFIG
 from doc_parser.utils.helpers import (
-    setup_logger, normalize_url, is_same_domain, 
-    is_valid_url, matches_pattern
+    setup_logger, normalize_url, get_domain, resolve_links, PatternMatcher,
+    is_html_content_type, read_limited, decode_body
 )
-from doc_parser.core.profiles import detect_site_profile
+from doc_parser.core.profiles import ProfileCache
+from doc_parser.core.checkpoint import CrawlCheckpoint
+
+# Ответы, после которых имеет смысл повторить запрос
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Максимальная пауза по заголовкам ограничения частоты (секунды)
+_MAX_RATE_LIMIT_WAIT = 300
+# Размер части при потоковом чтении ответа
+_READ_CHUNK_SIZE = 64 * 1024
+
+
+def _is_retryable(exc):
+    """Повторяем сетевые ошибки, таймауты и ответы 429/5xx, но не 404 и т.п."""
+    if isinstance(exc, aiohttp.ClientResponseError):
+        return exc.status in _RETRY_STATUSES
+    return isinstance(exc, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+def _rate_limit_wait(response):
+    """
+    Определяет, сколько секунд не стоит обращаться к хосту, по заголовкам ответа.
+    
+    Учитываются Retry-After (для 429/503) и X-RateLimit-Remaining/X-RateLimit-Reset.
+    X-RateLimit-Reset может быть как абсолютным временем (unix time), так и
+    числом секунд до сброса.
+    
+    Args:
+        response: Ответ aiohttp
+        
+    Returns:
+        float: Пауза в секундах (0 - ограничений нет)
+    """
+    headers = response.headers
+    wait = 0.0
+    try:
+        if response.status in (429, 503) and 'Retry-After' in headers:
+            wait = float(headers['Retry-After'])
+        elif headers.get('X-RateLimit-Remaining') == '0' and 'X-RateLimit-Reset' in headers:
+            reset = float(headers['X-RateLimit-Reset'])
+            wait = reset - time.time() if reset > 1e9 else reset
+    except ValueError:
+        # Retry-After в виде HTTP-даты: просто делаем короткую паузу
+        wait = 1.0
+    return min(max(wait, 0.0), _MAX_RATE_LIMIT_WAIT)
 
 
 class DocumentationParser:
@@ -41,9 +92,62 @@ class DocumentationParser:
         self.visited_urls = set()
         self.queue = deque()
         self.results = {}
+        self.profiles = ProfileCache()
+        self._host_semaphores = {}
+        self._host_resume_at = {}
+        self._session = None
+        self._parse_executor = None
+        
+        # Шаблоны URL компилируются один раз
+        self._include = PatternMatcher(self.config['include_patterns'])
+        self._exclude = PatternMatcher(self.config['exclude_patterns'])
         
         # Создаем директорию для результатов, если её нет
         os.makedirs(self.config['output_dir'], exist_ok=True)
+        
+        # Контрольная точка для продолжения прерванного обхода
+        self._checkpoint = None
+        self._open_checkpoint()
+    
+    def _open_checkpoint(self):
+        """Открывает контрольную точку при resume, если она еще не открыта."""
+        if self.config['resume'] and self._checkpoint is None:
+            self._checkpoint = CrawlCheckpoint(
+                os.path.join(self.config['output_dir'], 'visited.sqlite')
+            )
+    
+    def close(self):
+        """
+        Закрывает контрольную точку и сессию requests.
+        
+        Вызывается по окончании обхода; при следующем обходе или вызове
+        parse_url они открываются заново.
+        """
+        if self._checkpoint:
+            self._checkpoint.close()
+            self._checkpoint = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+    
+    @property
+    def session(self):
+        """
+        Сессия requests для синхронной загрузки (создается при первом обращении).
+        
+        Соединения с хостом держатся открытыми и переиспользуются между
+        вызовами fetch_url, без нового TCP/TLS-рукопожатия на каждую страницу.
+        
+        Returns:
+            requests.Session: Сессия с пулом соединений
+        """
+        if self._session is None:
+            self._session = requests.Session()
+            self._session.headers['User-Agent'] = self.config['user_agent']
+            adapter = HTTPAdapter(pool_maxsize=self.config['concurrency'])
+            self._session.mount('http://', adapter)
+            self._session.mount('https://', adapter)
+        return self._session
     
     @retry(stop=stop_after_attempt(3), wait=wait_fixed(1))
     def fetch_url(self, url):
@@ -54,21 +158,105 @@ class DocumentationParser:
             url: URL для загрузки
             
         Returns:
-            Текст страницы или None в случае ошибки
+            Текст страницы или None в случае ошибки или если это не HTML
         """
         try:
-            headers = {'User-Agent': self.config['user_agent']}
-            response = requests.get(
+            # Тело читается потоком: не-HTML и слишком большие ответы
+            # обрываются до загрузки целиком
+            with self.session.get(
                 url, 
-                headers=headers, 
-                timeout=self.config['timeout']
-            )
-            response.raise_for_status()
-            return response.text
+                timeout=self.config['timeout'],
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                
+                content_type = response.headers.get('Content-Type', '')
+                if not is_html_content_type(content_type):
+                    self.logger.debug(f"Пропуск {url}: {content_type}")
+                    return None
+                
+                max_bytes = self.config['max_html_bytes']
+                if int(response.headers.get('Content-Length') or 0) > max_bytes:
+                    self.logger.debug(f"Пропуск {url}: слишком большой ответ")
+                    return None
+                
+                chunks = []
+                total = 0
+                for chunk in response.iter_content(_READ_CHUNK_SIZE):
+                    total += len(chunk)
+                    if total > max_bytes:
+                        self.logger.debug(f"Пропуск {url}: слишком большой ответ")
+                        return None
+                    chunks.append(chunk)
+                
+                # Без явной кодировки считаем UTF-8 (requests подставил бы ISO-8859-1)
+                encoding = response.encoding if 'charset' in content_type.lower() else 'utf-8'
+                return decode_body(b''.join(chunks), encoding)
         except Exception as e:
             self.logger.error(f"Ошибка при загрузке {url}: {e}")
             return None
     
+    async def fetch_url_async(self, session, url):
+        """
+        Асинхронно загружает страницу по URL.
+        
+        Запросы к одному хосту ограничены семафором (per_host), а после
+        каждого запроса соединение с хостом удерживается на время задержки.
+        Сетевые ошибки и ответы 429/5xx повторяются с экспоненциальной паузой;
+        если сервер сообщает об исчерпании лимита (Retry-After,
+        X-RateLimit-*), запросы к хосту приостанавливаются до его сброса.
+        
+        Args:
+            session: aiohttp.ClientSession
+            url: URL для загрузки
+            
+        Returns:
+            Текст страницы или None в случае ошибки
+        """
+        host = get_domain(url)
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.config['per_host'])
+        
+        retrying = AsyncRetrying(
+            stop=stop_after_attempt(self.config['retries']),
+            wait=wait_exponential(multiplier=1, max=30),
+            retry=retry_if_exception(_is_retryable),
+            reraise=True
+        )
+        
+        async with semaphore:
+            try:
+                async for attempt in retrying:
+                    with attempt:
+                        pause = self._host_resume_at.get(host, 0) - time.monotonic()
+                        if pause > 0:
+                            await asyncio.sleep(pause)
+                        
+                        async with session.get(url) as response:
+                            wait = _rate_limit_wait(response)
+                            if wait:
+                                self.logger.warning(f"Лимит запросов для {host}, пауза {wait:.0f} с")
+                                self._host_resume_at[host] = time.monotonic() + wait
+                            response.raise_for_status()
+                            
+                            content_type = response.headers.get('Content-Type', '')
+                            if not is_html_content_type(content_type):
+                                self.logger.debug(f"Пропуск {url}: {content_type}")
+                                return None
+                            
+                            body = await read_limited(response, self.config['max_html_bytes'], _READ_CHUNK_SIZE)
+                            if body is None:
+                                self.logger.debug(f"Пропуск {url}: слишком большой ответ")
+                                return None
+                            return decode_body(body, response.charset)
+            except Exception as e:
+                self.logger.error(f"Ошибка при загрузке {url}: {e}")
+                return None
+            finally:
+                # Вежливая задержка перед следующим запросом к тому же хосту
+                await asyncio.sleep(self.config['delay'])
+    
     def parse_url(self, url, depth=0):
         """
         Парсит URL и извлекает контент, метаданные и ссылки.
@@ -84,9 +272,10 @@ class DocumentationParser:
         
         # Нормализуем URL
         url = normalize_url(url)
+        self._open_checkpoint()
         
         # Проверяем, не посещали ли мы уже этот URL
-        if url in self.visited_urls:
+        if self._seen(url):
             self.logger.debug(f"URL уже посещен: {url}")
             return None
         
@@ -98,11 +287,42 @@ class DocumentationParser:
         if not html_content:
             return None
         
+        result = self._parse_page(url, html_content, depth)
+        links = self._links_to_follow(result)
+        
+        if self._checkpoint:
+            self._checkpoint.mark_done(url, links, depth, result)
+            self._checkpoint.flush()
+        
+        # Добавляем ссылки в очередь
+        for link in links:
+            self.queue.append((link, depth + 1))
+        
+        # Сохраняем результат
+        self.results[url] = result
+        
+        # Задержка перед следующим запросом
+        time.sleep(self.config['delay'])
+        
+        return result
+    
+    def _parse_page(self, url, html_content, depth):
+        """
+        Разбирает загруженную страницу: профиль, контент, навигация и ссылки.
+        
+        Args:
+            url: Нормализованный URL страницы
+            html_content: HTML-код страницы
+            depth: Глубина страницы
+            
+        Returns:
+            dict: Результат парсинга страницы
+        """
         # Создаем BeautifulSoup объект
         soup = BeautifulSoup(html_content, 'lxml')
         
         # Определяем профиль сайта
-        profile = detect_site_profile(url, html_content)
+        profile = self.profiles.detect(url, soup)
         if profile is None:
             # Если профиль не определен, используем Generic профиль
             from doc_parser.profiles.ai_docs import GenericProfile
@@ -128,69 +348,106 @@ class DocumentationParser:
             'links': []
         }
         
-        # Обрабатываем ссылки, если нужно
+        # Извлекаем ссылки, если нужно
         if self.config['follow_links'] and depth < self.config['max_depth']:
-            links = self.extract_links(soup, url)
-            result['links'] = links
-            
-            # Добавляем ссылки в очередь
-            for link in links:
-                # Проверяем, подходит ли ссылка по шаблонам
-                if self.config['include_patterns'] and not matches_pattern(link, self.config['include_patterns']):
-                    continue
-                if matches_pattern(link, self.config['exclude_patterns']):
-                    continue
-                
-                # Добавляем в очередь
-                self.queue.append((link, depth + 1))
-        
-        # Сохраняем результат
-        self.results[url] = result
-        
-        # Задержка перед следующим запросом
-        time.sleep(self.config['delay'])
+            result['links'] = self.extract_links(html_content, url)
         
         return result
     
-    def extract_links(self, soup, base_url):
+    def _links_to_follow(self, result):
         """
-        Извлекает ссылки из страницы, которые подходят для обхода.
+        Возвращает ссылки страницы, подходящие по шаблонам и еще не посещенные.
         
         Args:
-            soup: BeautifulSoup объект
-            base_url: Базовый URL для относительных ссылок
+            result: Результат парсинга страницы
             
         Returns:
-            list: Список нормализованных URL
+            list: Список URL для обхода
+        """
+        return [
+            link for link in result['links']
+            if not self._seen(link) and self._allowed(link)
+        ]
+    
+    def _seen(self, url):
         """
-        links = []
+        Проверяет, посещался ли URL в текущем обходе или, при resume,
+        в одном из предыдущих.
         
-        for a_tag in soup.find_all('a', href=True):
-            href = a_tag['href']
-            
-            # Пропускаем якоря, javascript и mailto
-            if href.startswith('#') or href.startswith('javascript:') or href.startswith('mailto:'):
-                continue
-            
-            # Нормализуем URL
-            full_url = normalize_url(href, base_url)
-            
-            # Проверяем, что URL валидный
-            if not is_valid_url(full_url):
-                continue
+        Args:
+            url: Нормализованный URL
             
-            # Проверяем, что URL принадлежит тому же домену
-            if not is_same_domain(full_url, base_url):
-                continue
+        Returns:
+            bool: True если URL уже посещен
+        """
+        if url in self.visited_urls:
+            return True
+        return bool(self._checkpoint) and self._checkpoint.seen(url)
+    
+    def _allowed(self, link):
+        """
+        Проверяет ссылку по шаблонам включения и исключения.
+        
+        Args:
+            link: Нормализованный URL
             
-            links.append(full_url)
+        Returns:
+            bool: True если ссылку нужно обходить
+        """
+        if self._include and not self._include.search(link):
+            return False
+        return not self._exclude.search(link)
+    
+    def extract_links(self, page, base_url):
+        """
+        Извлекает ссылки из страницы, которые подходят для обхода.
         
-        return links
+        HTML разбирается Lexbor и ссылки выбираются CSS-селектором на стороне C,
+        без обхода дерева BeautifulSoup в Python.
+        
+        Args:
+            page: HTML-код страницы (или BeautifulSoup объект)
+            base_url: Базовый URL для относительных ссылок
+            
+        Returns:
+            list: Список нормализованных URL
+        """
+        if isinstance(page, BeautifulSoup):
+            hrefs = (a_tag.get('href', '') for a_tag in page.find_all('a', href=True))
+        else:
+            tree = LexborHTMLParser(page)
+            hrefs = (a_tag.attributes.get('href') or '' for a_tag in tree.css('a[href]'))
+        return resolve_links(hrefs, base_url)
     
     def crawl(self, start_url):
         """
         Обходит сайт документации, начиная с указанного URL.
         
+        Args:
+            start_url: Начальный URL
+            
+        Returns:
+            dict: Словарь с результатами парсинга для всех посещенных URL
+        """
+        return asyncio.run(self.crawl_async(start_url))
+    
+    async def crawl_async(self, start_url):
+        """
+        Асинхронно обходит сайт документации, начиная с указанного URL.
+        
+        URL обрабатываются параллельно (concurrency воркеров), загрузка идет
+        через общую aiohttp-сессию, а разбор HTML выполняется в пуле потоков,
+        чтобы не блокировать цикл событий. При parse_processes > 0 страницы
+        разбираются в пуле процессов: разбор упирается в GIL, и потоки
+        не дают выигрыша на нескольких ядрах. Очередь ограничена (queue_maxsize):
+        ссылки сверх лимита ждут в отдельном буфере и переносятся в очередь
+        по мере ее освобождения.
+        
+        При resume уже обработанные в прошлых запусках страницы пропускаются,
+        а обход продолжается с сохраненных необработанных ссылок; в результат
+        попадают и страницы прошлых запусков (их результаты хранятся в
+        контрольной точке), чтобы экспорт не терял их.
+        
         Args:
             start_url: Начальный URL
             
@@ -201,14 +458,139 @@ class DocumentationParser:
         
         # Очищаем состояние
         self.visited_urls = set()
-        self.queue = deque([(start_url, 0)])
         self.results = {}
+        self._host_semaphores = {}
+        self._host_resume_at = {}
+        self._open_checkpoint()
+        
+        queue = asyncio.Queue(maxsize=self.config['queue_maxsize'])
+        # Воркеры не ждут на put(): при заполненной очереди они заблокировались бы все
+        overflow = deque()
+        # Уже поставленные в очередь или буфер URL: ссылка, найденная на многих
+        # страницах, хранится один раз
+        enqueued = {normalize_url(start_url)}
+        queue.put_nowait((start_url, 0))
+        if self._checkpoint:
+            for url, depth in self._checkpoint.pending():
+                if url not in enqueued:
+                    enqueued.add(url)
+                    overflow.append((url, depth))
+            while overflow and not queue.full():
+                queue.put_nowait(overflow.popleft())
+        
+        connector = aiohttp.TCPConnector(
+            limit=self.config['concurrency'],
+            limit_per_host=self.config['per_host'],
+            ttl_dns_cache=300
+        )
+        timeout = aiohttp.ClientTimeout(total=self.config['timeout'])
+        headers = {'User-Agent': self.config['user_agent']}
         
-        # Обходим все URL в очереди
-        while self.queue:
-            url, depth = self.queue.popleft()
-            self.parse_url(url, depth)
+        if self.config['parse_processes'] > 0:
+            self._parse_executor = ProcessPoolExecutor(
+                max_workers=self.config['parse_processes'],
+                initializer=_init_parse_worker,
+                initargs=(self.config,)
+            )
+        
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=headers) as session:
+            async def worker():
+                while True:
+                    url, depth = await queue.get()
+                    try:
+                        for link in await self._parse_url_async(session, url, depth):
+                            if link not in enqueued:
+                                enqueued.add(link)
+                                overflow.append((link, depth + 1))
+                    except Exception as e:
+                        self.logger.error(f"Ошибка при обработке {url}: {e}")
+                    finally:
+                        # Переносим ссылки в очередь до task_done, чтобы join() не завершился раньше времени
+                        while overflow and not queue.full():
+                            queue.put_nowait(overflow.popleft())
+                        queue.task_done()
+            
+            workers = [asyncio.create_task(worker()) for _ in range(self.config['concurrency'])]
+            try:
+                await queue.join()
+            finally:
+                for task in workers:
+                    task.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                if self._parse_executor:
+                    self._parse_executor.shutdown(cancel_futures=True)
+                    self._parse_executor = None
+                if self._checkpoint:
+                    self.results = {**self._checkpoint.results(), **self.results}
+                self.close()
         
         self.logger.info(f"Обход завершен. Обработано URL: {len(self.results)}")
         
         return self.results
+    
+    async def _parse_url_async(self, session, url, depth):
+        """
+        Асинхронно парсит URL.
+        
+        Args:
+            session: aiohttp.ClientSession
+            url: URL для парсинга
+            depth: Текущая глубина обхода
+            
+        Returns:
+            list: Ссылки, которые нужно добавить в очередь
+        """
+        url = normalize_url(url)
+        if self._seen(url):
+            return []
+        self.visited_urls.add(url)
+        
+        self.logger.info(f"Парсинг URL: {url} (глубина: {depth})")
+        
+        html_content = await self.fetch_url_async(session, url)
+        if not html_content:
+            return []
+        
+        loop = asyncio.get_running_loop()
+        if self._parse_executor:
+            result = await loop.run_in_executor(self._parse_executor, _parse_page_in_worker, url, html_content, depth)
+        else:
+            result = await loop.run_in_executor(None, self._parse_page, url, html_content, depth)
+        self.results[url] = result
+        
+        links = self._links_to_follow(result)
+        if self._checkpoint:
+            self._checkpoint.mark_done(url, links, depth, result)
+        
+        return links
+
+
+# Парсер процесса пула разбора (свой в каждом процессе)
+_worker_parser = None
+
+
+def _init_parse_worker(config):
+    """
+    Создает парсер в процессе пула разбора страниц.
+    
+    Args:
+        config: Конфигурация основного парсера
+    """
+    global _worker_parser
+    # Контрольная точка ведет только основной процесс
+    _worker_parser = DocumentationParser(dict(config, resume=False))
+
+
+def _parse_page_in_worker(url, html_content, depth):
+    """
+    Разбирает страницу в процессе пула (см. DocumentationParser._parse_page).
+    
+    Args:
+        url: URL страницы
+        html_content: HTML-контент
+        depth: Текущая глубина обхода
+        
+    Returns:
+        dict: Результат парсинга страницы
+    """
+    return _worker_parser._parse_page(url, html_content, depth)
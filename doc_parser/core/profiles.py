@@ -6,10 +6,14 @@
 """
 
 import re
-from urllib.parse import urlparse
-from bs4 import BeautifulSoup
+import importlib
+import soupsieve
+from bs4 import BeautifulSoup, Tag
 
-from doc_parser.utils.helpers import get_meta_tag, get_domain
+from doc_parser.utils.helpers import get_meta_tag, get_domain, prepare_selectors
+
+# Простой селектор: имя тега, .класс или #id
+_SIMPLE_SELECTOR_RE = re.compile(r'([.#]?)([A-Za-z_][\w-]*)\Z')
 
 class SiteProfile:
     """
@@ -32,15 +36,44 @@ class SiteProfile:
     
     def __init__(self):
         """Инициализация профиля."""
-        pass
+        # URL-шаблоны объединяются в одно регулярное выражение при создании профиля
+        self._url_pattern = (
+            re.compile('|'.join(f'(?:{p})' for p in self.url_patterns))
+            if self.url_patterns else None
+        )
+        self._meta_generator = tuple(self.meta_generator)
+        # Простые игнорируемые селекторы (тег, .класс, #id) проверяются по
+        # множествам - это дешевле, чем сопоставление soupsieve для каждого
+        # элемента; остальные компилируются один раз в общий CSS-список.
+        # Очистка проходит дерево контента один раз, а не по разу на селектор
+        tags, classes, ids, compound = set(), set(), set(), []
+        for selector in self.ignore_selectors:
+            match = _SIMPLE_SELECTOR_RE.match(selector)
+            if match is None:
+                compound.append(selector)
+            elif match.group(1) == '.':
+                classes.add(match.group(2))
+            elif match.group(1) == '#':
+                ids.add(match.group(2))
+            else:
+                tags.add(match.group(2).lower())
+        self._ignore_tags = frozenset(tags)
+        self._ignore_classes = frozenset(classes)
+        self._ignore_ids = frozenset(ids)
+        self._ignore_selector = soupsieve.compile(', '.join(compound)) if compound else None
+        # Селекторы контента и навигации разбираются для find_element заранее
+        self._content_finders = prepare_selectors(self.content_selectors)
+        self._navigation_finders = prepare_selectors(self.navigation_selectors)
     
-    def matches(self, url, soup=None):
+    def matches(self, url, soup=None, generator=None):
         """
         Проверяет, соответствует ли URL и страница данному профилю.
         
         Args:
             url: URL страницы
             soup: BeautifulSoup объект страницы (опционально)
+            generator: Уже прочитанное значение meta generator (опционально;
+                иначе читается из soup)
             
         Returns:
             bool: True если соответствует, иначе False
@@ -51,13 +84,14 @@ class SiteProfile:
             return True
         
         # Проверка по URL паттернам
-        if self.url_patterns and any(re.search(p, url) for p in self.url_patterns):
+        if self._url_pattern is not None and self._url_pattern.search(url):
             return True
         
         # Если soup доступен, проверяем meta generator
-        if soup and self.meta_generator:
-            generator = get_meta_tag(soup, 'generator')
-            if generator and any(g in generator for g in self.meta_generator):
+        if soup and self._meta_generator:
+            if generator is None:
+                generator = get_meta_tag(soup, 'generator')
+            if generator and any(g in generator for g in self._meta_generator):
                 return True
         
         return False
@@ -100,6 +134,19 @@ class SiteProfile:
         # Реализация в конкретных профилях
         pass
     
+    def _is_ignored(self, element):
+        """Проверяет элемент по простым игнорируемым селекторам (тег, класс, id)."""
+        if element.name in self._ignore_tags:
+            return True
+        attrs = element.attrs
+        if self._ignore_ids and attrs.get('id') in self._ignore_ids:
+            return True
+        if self._ignore_classes:
+            classes = attrs.get('class')
+            if classes and not self._ignore_classes.isdisjoint(classes):
+                return True
+        return False
+    
     def clean_content(self, content):
         """
         Очищает извлеченный контент от нежелательных элементов.
@@ -113,9 +160,18 @@ class SiteProfile:
         if not content:
             return None
         
-        # Удаляем игнорируемые элементы
-        for selector in self.get_ignore_selectors():
-            for element in content.select(selector):
+        # Удаляем игнорируемые элементы (вложенные уже удалены вместе с родителем)
+        elements = []
+        if self._ignore_tags or self._ignore_classes or self._ignore_ids:
+            elements = [
+                element for element in content.descendants
+                if isinstance(element, Tag) and self._is_ignored(element)
+            ]
+        if self._ignore_selector is not None:
+            elements.extend(self._ignore_selector.select(content))
+        
+        for element in elements:
+            if not element.decomposed:
                 element.decompose()
         
         return content
@@ -130,6 +186,17 @@ class ProfileRegistry:
     def __init__(self):
         """Инициализация реестра."""
         self.profiles = {}
+        self._builtin_loaded = False
+    
+    def _load_builtin_profiles(self):
+        """
+        Импортирует пакет встроенных профилей (они регистрируются при импорте).
+        
+        Нужен, если реестр используется без импорта doc_parser.profiles.
+        """
+        if not self._builtin_loaded:
+            self._builtin_loaded = True
+            importlib.import_module('doc_parser.profiles')
     
     def register(self, profile_class):
         """
@@ -151,6 +218,7 @@ class ProfileRegistry:
         Returns:
             SiteProfile объект или None
         """
+        self._load_builtin_profiles()
         return self.profiles.get(name)
     
     def detect_profile(self, url, soup):
@@ -164,8 +232,13 @@ class ProfileRegistry:
         Returns:
             SiteProfile объект или None
         """
+        self._load_builtin_profiles()
+        
+        # meta generator читается один раз, а не каждым профилем: на странице
+        # без него каждый поиск обходит весь документ
+        generator = get_meta_tag(soup, 'generator') if soup else None
         for profile in self.profiles.values():
-            if profile.matches(url, soup):
+            if profile.matches(url, soup, generator):
                 return profile
         
         # Если не найден конкретный профиль, используем generic
@@ -173,6 +246,7 @@ class ProfileRegistry:
     
     def get_all_profiles(self):
         """Возвращает список всех профилей."""
+        self._load_builtin_profiles()
         return list(self.profiles.values())
 
 
@@ -180,16 +254,56 @@ class ProfileRegistry:
 registry = ProfileRegistry()
 
 # Функция для автоматического определения профиля
-def detect_site_profile(url, html_content):
+def detect_site_profile(url, page):
     """
-    Определяет профиль сайта по URL и HTML-контенту.
+    Определяет профиль сайта по URL и странице.
     
     Args:
         url: URL страницы
-        html_content: HTML-контент страницы
+        page: Уже разобранная страница (BeautifulSoup) или HTML-контент;
+            разобранная страница повторно не парсится
         
     Returns:
         SiteProfile объект
     """
-    soup = BeautifulSoup(html_content, 'lxml')
+    soup = page if isinstance(page, Tag) else BeautifulSoup(page, 'lxml')
     return registry.detect_profile(url, soup)
+
+
+class ProfileCache:
+    """
+    Кэш профилей по хосту.
+    
+    Страницы одного сайта используют один профиль, поэтому после первого
+    определения страница больше не проверяется. Результат "generic" не
+    кэшируется: следующие страницы могут дать более явные признаки.
+    """
+    
+    def __init__(self, profile_registry=None):
+        """
+        Инициализация кэша.
+        
+        Args:
+            profile_registry: Реестр профилей (по умолчанию глобальный)
+        """
+        self.registry = profile_registry or registry
+        self._by_host = {}
+    
+    def detect(self, url, soup):
+        """
+        Возвращает профиль для страницы, используя кэш по хосту.
+        
+        Args:
+            url: URL страницы
+            soup: BeautifulSoup объект страницы
+            
+        Returns:
+            SiteProfile объект или None
+        """
+        host = get_domain(url)
+        profile = self._by_host.get(host)
+        if profile is None:
+            profile = self.registry.detect_profile(url, soup)
+            if profile is not None and profile.name != 'generic':
+                self._by_host[host] = profile
+        return profile
@@ -5,9 +5,7 @@
 Экспортеры для различных форматов вывода.
 """
 
-from doc_parser.exporters.text_formats import MarkdownExporter, JsonExporter, CsvExporter
-from doc_parser.exporters.ai_formats import ClaudeExporter
-from doc_parser.exporters.web_formats import HtmlExporter, ZipExporter
+import importlib
 
 __all__ = [
     'MarkdownExporter',
@@ -15,5 +13,30 @@ __all__ = [
     'CsvExporter',
     'ClaudeExporter',
     'HtmlExporter',
-    'ZipExporter'
+    'ZipExporter',
+    'export_results',
+    'get_exporter'
 ]
+
+# Имя -> модуль. Модули экспортеров импортируются при первом обращении:
+# экспорт в JSON не загружает requests и selectolax для HTML/ZIP
+_LAZY_EXPORTS = {
+    'MarkdownExporter': 'doc_parser.exporters.text_formats',
+    'JsonExporter': 'doc_parser.exporters.text_formats',
+    'CsvExporter': 'doc_parser.exporters.text_formats',
+    'ClaudeExporter': 'doc_parser.exporters.ai_formats',
+    'HtmlExporter': 'doc_parser.exporters.web_formats',
+    'ZipExporter': 'doc_parser.exporters.web_formats',
+    'export_results': 'doc_parser.exporters.dispatch',
+    'get_exporter': 'doc_parser.exporters.dispatch',
+}
+
+
+def __getattr__(name):
+    """Импортирует экспортируемое имя при первом обращении."""
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
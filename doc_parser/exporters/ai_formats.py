@@ -8,9 +8,61 @@
 import os
 import re
 import json
-from bs4 import BeautifulSoup
 
-from doc_parser.utils.helpers import extract_text
+from doc_parser.utils.helpers import extract_text, html_to_text, open_text_writer
+
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+
+def _pack_pages(page_lengths, chunk_size):
+    """
+    Жадная упаковка страниц в чанки.
+    
+    Работает только с длинами страниц: страница добавляется в текущий чанк,
+    пока суммарная длина не превышает chunk_size (страница длиннее лимита
+    занимает отдельный чанк).
+    
+    Args:
+        page_lengths: Длины страниц в порядке вывода
+        chunk_size: Размер чанка в символах
+        
+    Returns:
+        list: Границы чанков [(start, end), ...] в индексах страниц
+    """
+    bounds = []
+    start = 0
+    current_size = 0
+    
+    for i, length in enumerate(page_lengths):
+        if current_size + length > chunk_size and i > start:
+            bounds.append((start, i))
+            start = i
+            current_size = 0
+        current_size += length
+    
+    if start < len(page_lengths):
+        bounds.append((start, len(page_lengths)))
+    
+    return bounds
+
+
+def _sorted_pages(results):
+    """
+    Страницы в порядке вывода: по глубине, затем по заголовку.
+    
+    Ключ сортировки вычисляется один раз для каждой страницы; страницы
+    с одинаковым ключом сохраняют исходный порядок.
+    
+    Args:
+        results: Словарь с результатами парсинга
+        
+    Returns:
+        list: Список пар (url, page_data)
+    """
+    return sorted(
+        results.items(),
+        key=lambda item: (item[1].get('depth', 0), item[1].get('title', ''))
+    )
 
 
 class ClaudeExporter:
@@ -27,6 +79,40 @@ class ClaudeExporter:
         """
         self.config = config or {}
     
+    @staticmethod
+    def _page_text(content_html, render, cache):
+        """
+        Извлекает текст из HTML страницы с кэшированием по содержимому.
+        
+        У дублей страниц (зеркала, index.html, варианты с параметрами)
+        одинаковый content_html, и он разбирается один раз. Ключом служит сама
+        строка HTML: она уже хранится в результатах парсинга, а ее хэш Python
+        вычисляет один раз и кэширует. Кэш живет один экспорт: экспортер
+        переиспользуется между обходами и не должен удерживать их страницы.
+        
+        Args:
+            content_html: HTML-контент страницы
+            render: Функция извлечения текста
+            cache: Словарь кэша текущего экспорта
+            
+        Returns:
+            str: Извлеченный текст
+        """
+        text = cache.get(content_html)
+        if text is None:
+            text = cache[content_html] = render(content_html)
+        return text
+    
+    @staticmethod
+    def _claude_text(content_html):
+        """Текст страницы для format_for_claude: без скриптов, стилей и фреймов."""
+        text = html_to_text(content_html, separator='\n', drop_tags=('script', 'style', 'iframe'))
+        # Текстовые узлы уже обрезаны, так что серии пустых строк встречаются
+        # редко (в основном внутри <pre>): проверка подстроки идет в C без regex
+        if '\n\n\n' in text:
+            text = _BLANK_LINES_RE.sub('\n\n', text)
+        return text
+    
     def format_for_claude(self, results):
         """
         Форматирует результаты парсинга для Claude.
@@ -38,15 +124,13 @@ class ClaudeExporter:
             str: Форматированный текст для Claude
         """
         output = []
+        text_cache = {}
         
         # Добавляем заголовок
         output.append("# Документация\n")
         
         # Сортируем страницы по глубине
-        pages = sorted(
-            results.items(), 
-            key=lambda x: (x[1].get('depth', 0), x[1].get('title', ''))
-        )
+        pages = _sorted_pages(results)
         
         # Добавляем содержание
         output.append("## Содержание\n")
@@ -79,17 +163,7 @@ class ClaudeExporter:
             output.append("### Содержание\n")
             
             if 'content_html' in page_data and page_data['content_html']:
-                # Очищаем HTML
-                soup = BeautifulSoup(page_data['content_html'], 'lxml')
-                
-                # Удаляем скрипты и стили
-                for tag in soup(['script', 'style', 'iframe']):
-                    tag.decompose()
-                
-                # Форматируем текст
-                text = soup.get_text(separator='\n', strip=True)
-                text = re.sub(r'\n{3,}', '\n\n', text)
-                
+                text = self._page_text(page_data['content_html'], self._claude_text, text_cache)
                 output.append(text + "\n")
             
             output.append("\n---\n")
@@ -113,7 +187,7 @@ class ClaudeExporter:
         # Форматируем и сохраняем
         formatted_text = self.format_for_claude(results)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
+        with open_text_writer(output_path) as f:
             f.write(formatted_text)
         
         return output_path
@@ -136,57 +210,45 @@ class ClaudeExporter:
         saved_files = []
         
         # Сортируем страницы по глубине
-        pages = sorted(
-            results.items(), 
-            key=lambda x: (x[1].get('depth', 0), x[1].get('title', ''))
-        )
-        
-        # Создаем чанки
-        chunks = []
-        current_chunk = []
-        current_size = 0
+        pages = _sorted_pages(results)
         
+        # Форматируем страницы
+        page_texts = []
+        text_cache = {}
         for url, page_data in pages:
-            # Форматируем страницу
             title = page_data.get('title', url)
             page_text = f"## {title}\n\nURL: {url}\n\n"
             
             if 'content_html' in page_data and page_data['content_html']:
                 # Очищаем HTML
-                text = extract_text(page_data['content_html'])
+                text = self._page_text(page_data['content_html'], extract_text, text_cache)
                 page_text += text + "\n\n---\n\n"
             
-            # Если текущий чанк + страница превышают лимит, создаем новый чанк
-            if current_size + len(page_text) > chunk_size and current_chunk:
-                chunks.append("\n".join(current_chunk))
-                current_chunk = []
-                current_size = 0
-            
-            # Добавляем страницу в текущий чанк
-            current_chunk.append(page_text)
-            current_size += len(page_text)
+            page_texts.append(page_text)
         
-        # Добавляем последний чанк
-        if current_chunk:
-            chunks.append("\n".join(current_chunk))
+        # Создаем чанки: упаковка считается по длинам страниц
+        bounds = _pack_pages([len(text) for text in page_texts], chunk_size)
         
-        # Сохраняем чанки
-        for i, chunk_text in enumerate(chunks):
+        # Сохраняем чанки: страницы пишутся по одной, без склейки чанка в памяти
+        for i, (start, end) in enumerate(bounds):
             filename = f"claude_chunk_{i + 1}.md"
             output_path = os.path.join(output_dir, filename)
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(chunk_text)
+            with open(output_path, 'wb', buffering=1 << 20) as f:
+                for j in range(start, end):
+                    if j > start:
+                        f.write(b"\n")
+                    f.write(page_texts[j].encode('utf-8'))
             
             saved_files.append(output_path)
         
         # Создаем индексный файл
         index_path = os.path.join(output_dir, "claude_index.md")
         
-        with open(index_path, 'w', encoding='utf-8') as f:
-            f.write(f"# Документация (разбита на {len(chunks)} чанков)\n\n")
+        with open_text_writer(index_path) as f:
+            f.write(f"# Документация (разбита на {len(bounds)} чанков)\n\n")
             
-            for i, _ in enumerate(chunks):
+            for i in range(len(bounds)):
                 f.write(f"- [Чанк {i + 1}](claude_chunk_{i + 1}.md)\n")
         
         saved_files.append(index_path)
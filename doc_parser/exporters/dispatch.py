@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Экспорт результатов в формат, выбранный по имени.
+"""
+
+import os
+import importlib
+
+
+def _export_markdown(exporter, results, output_dir, report):
+    """Сохраняет страницы в Markdown-файлы."""
+    saved_files = exporter.save_results(results, output_dir)
+    report(f"Результаты сохранены в формате Markdown. Файлов: {len(saved_files)}")
+
+
+def _export_json(exporter, results, output_dir, report):
+    """Сохраняет результаты в results.json."""
+    saved_file = exporter.save_results(results, os.path.join(output_dir, 'results.json'))
+    report(f"Результаты сохранены в JSON: {saved_file}")
+
+
+def _export_csv(exporter, results, output_dir, report):
+    """Сохраняет результаты в results.csv и ссылки в links.csv."""
+    saved_file = exporter.export_results(results, os.path.join(output_dir, 'results.csv'))
+    report(f"Результаты сохранены в CSV: {saved_file}")
+    
+    # Также сохраняем ссылки
+    links_file = exporter.export_links(results, os.path.join(output_dir, 'links.csv'))
+    report(f"Ссылки сохранены в: {links_file}")
+
+
+def _export_claude(exporter, results, output_dir, report):
+    """Сохраняет claude.md и чанки в claude_chunks."""
+    saved_file = exporter.export_for_claude(results, os.path.join(output_dir, 'claude.md'))
+    report(f"Результаты сохранены в формате для Claude: {saved_file}")
+    
+    # Также сохраняем чанки
+    chunked_dir = os.path.join(output_dir, 'claude_chunks')
+    exporter.export_chunked(results, chunked_dir)
+    report(f"Чанки сохранены в директории: {chunked_dir}")
+
+
+def _export_html(exporter, results, output_dir, report):
+    """Сохраняет HTML-страницы и index.html."""
+    exporter.save_results(results, output_dir)
+    index_path = os.path.join(output_dir, 'index.html')
+    report(f"Результаты сохранены в HTML. Индексный файл: {index_path}")
+
+
+def _export_zip(exporter, results, output_dir, report):
+    """Сохраняет documentation.zip."""
+    saved_file = exporter.export_to_zip(results, os.path.join(output_dir, 'documentation.zip'))
+    report(f"Результаты сохранены в ZIP-архив: {saved_file}")
+
+
+# Формат -> (модуль, класс экспортера, функция экспорта). Модуль импортируется
+# при первом экспорте в формат
+EXPORT_FORMATS = {
+    'markdown': ('doc_parser.exporters.text_formats', 'MarkdownExporter', _export_markdown),
+    'json': ('doc_parser.exporters.text_formats', 'JsonExporter', _export_json),
+    'csv': ('doc_parser.exporters.text_formats', 'CsvExporter', _export_csv),
+    'claude': ('doc_parser.exporters.ai_formats', 'ClaudeExporter', _export_claude),
+    'html': ('doc_parser.exporters.web_formats', 'HtmlExporter', _export_html),
+    'zip': ('doc_parser.exporters.web_formats', 'ZipExporter', _export_zip),
+}
+
+
+def get_exporter(output_format, config=None, cache=None):
+    """
+    Возвращает экспортер для формата.
+    
+    Args:
+        output_format: Формат вывода
+        config: Настройки экспортеров
+        cache: Словарь формат -> экспортер для повторного использования
+            экземпляров (их внутренние кэши и сессии сохраняются между
+            экспортами); вызывающий сбрасывает его при смене настроек
+        
+    Returns:
+        Экземпляр экспортера
+        
+    Raises:
+        ValueError: Если формат неизвестен
+    """
+    if cache is not None and output_format in cache:
+        return cache[output_format]
+    
+    try:
+        module, class_name, _ = EXPORT_FORMATS[output_format]
+    except KeyError:
+        raise ValueError(f"Неизвестный формат: {output_format}") from None
+    
+    exporter = getattr(importlib.import_module(module), class_name)(config)
+    if cache is not None:
+        cache[output_format] = exporter
+    return exporter
+
+
+def export_results(results, output_dir, output_format, config=None, report=print, cache=None):
+    """
+    Экспорт результатов в конкретный формат.
+    
+    Модуль не зависит от PySide6: GUI вызывает функцию из потока парсинга
+    и с вкладки экспорта, но тот же конвейер можно запустить и отдельно
+    (например, под PyPy, где PySide6 недоступен).
+    
+    Args:
+        results: Данные для экспорта
+        output_dir: Директория вывода
+        output_format: Формат вывода
+        config: Настройки экспортеров
+        report: Функция для вывода сообщений о ходе экспорта
+        cache: Кэш экземпляров экспортеров (см. get_exporter)
+        
+    Raises:
+        ValueError: Если формат неизвестен
+    """
+    exporter = get_exporter(output_format, config, cache)
+    EXPORT_FORMATS[output_format][2](exporter, results, output_dir, report)
@@ -7,12 +7,21 @@
 
 import os
 import json
+import base64
 import hashlib
-from typing import Dict, List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 from dataclasses import dataclass
 import logging
 
+from doc_parser.utils.helpers import json_dumps_bytes
+
+try:
+    from blake3 import blake3
+except ImportError:  # blake3 необязателен: без него используется blake2b из hashlib
+    blake3 = None
+
 @dataclass
 class ChunkMetadata:
     """Метаданные чанка для RAG."""
@@ -22,11 +31,157 @@ class ChunkMetadata:
     type: str  # text, code, table, list
     position: int
     length: int
-    embedding: Optional[List[float]] = None
+    embedding: Optional[np.ndarray] = None  # строка матрицы эмбеддингов float32
+    embedding_int8: Optional[str] = None  # base64 int8-вектора при embedding_precision='int8'
+    embedding_scale: Optional[float] = None  # embedding ~= int8 * scale
     parent_section: Optional[str] = None
     next_chunk_id: Optional[str] = None
     prev_chunk_id: Optional[str] = None
 
+def _quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Симметричное квантование векторов в int8 с отдельным масштабом для каждого.
+    
+    Args:
+        embeddings: Матрица эмбеддингов (n, dim)
+        
+    Returns:
+        Tuple: (int8-матрица, масштабы float32 формы (n,))
+    """
+    scales = np.abs(embeddings).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(embeddings / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+def _generate_chunk_id(content: str, url: str, position: int) -> str:
+    """Генерация уникального ID для чанка."""
+    # Криптостойкость не нужна: один быстрый хэш по URL и содержимому
+    data = url.encode() + b'\0' + content.encode()
+    if blake3 is not None:
+        digest = blake3(data).hexdigest(10)
+    else:
+        digest = hashlib.blake2b(data, digest_size=10).hexdigest()
+    return f"{digest[:8]}-{digest[8:20]}-{position}"
+
+def _create_chunk_metadata(
+    content: str, 
+    url: str, 
+    title: str, 
+    chunk_type: str,
+    position: int,
+    embedding: Optional[np.ndarray] = None,
+    parent_section: Optional[str] = None
+) -> ChunkMetadata:
+    """Создание метаданных для чанка."""
+    return ChunkMetadata(
+        id=_generate_chunk_id(content, url, position),
+        source_url=url,
+        title=title,
+        type=chunk_type,
+        position=position,
+        length=len(content),
+        embedding=embedding,
+        parent_section=parent_section
+    )
+
+def _process_chunks(page_data: Dict) -> List[Dict]:
+    """
+    Обработка чанков страницы (без эмбеддингов, см. RAGExporter._attach_embeddings).
+    
+    Функция модульного уровня и не зависит от экспортера, чтобы ее можно было
+    выполнять в ProcessPoolExecutor.
+    """
+    chunks = []
+    url = page_data['url']
+    title = page_data.get('title', '')
+    
+    if 'rag_content' not in page_data:
+        return chunks
+    
+    rag_content = page_data['rag_content']
+    
+    # Обработка текстовых чанков
+    for i, chunk in enumerate(rag_content.get('chunks', [])):
+        metadata = _create_chunk_metadata(
+            content=chunk['text'],
+            url=url,
+            title=title,
+            chunk_type='text',
+            position=i,
+            parent_section=chunk.get('parent_heading') or None
+        )
+    
+        chunks.append({
+            'content': chunk['text'],
+            'metadata': metadata.__dict__
+        })
+    
+    # Обработка кода
+    for i, block in enumerate(rag_content.get('code_blocks', [])):
+        metadata = _create_chunk_metadata(
+            content=block['code'],
+            url=url,
+            title=title,
+            chunk_type='code',
+            position=len(chunks) + i
+        )
+    
+        chunks.append({
+            'content': block['code'],
+            'language': block.get('language', ''),
+            'metadata': metadata.__dict__
+        })
+    
+    # Обработка таблиц
+    for i, table in enumerate(rag_content.get('tables', [])):
+        table_text = ' '.join(
+            [' '.join(table.get('headers', ''))] +
+            [' '.join(row) for row in table.get('rows', [])]
+        )
+    
+        metadata = _create_chunk_metadata(
+            content=table_text,
+            url=url,
+            title=title,
+            chunk_type='table',
+            position=len(chunks) + i
+        )
+    
+        chunks.append({
+            'content': table_text,
+            'headers': table.get('headers', []),
+            'rows': table.get('rows', []),
+            'metadata': metadata.__dict__
+        })
+    
+    # Обработка списков
+    for i, lst in enumerate(rag_content.get('lists', [])):
+        list_text = ' '.join(lst.get('items', []))
+    
+        metadata = _create_chunk_metadata(
+            content=list_text,
+            url=url,
+            title=title,
+            chunk_type='list',
+            position=len(chunks) + i
+        )
+    
+        chunks.append({
+            'content': list_text,
+            'items': lst.get('items', []),
+            'list_type': lst.get('type', 'ul'),
+            'metadata': metadata.__dict__
+        })
+    
+    # Связываем чанки
+    for i in range(len(chunks)):
+        if i > 0:
+            chunks[i]['metadata']['prev_chunk_id'] = chunks[i-1]['metadata']['id']
+        if i < len(chunks) - 1:
+            chunks[i]['metadata']['next_chunk_id'] = chunks[i+1]['metadata']['id']
+    
+    return chunks
+
 class RAGExporter:
     """
     Экспортер для форматов RAG с поддержкой векторных эмбеддингов.
@@ -45,11 +200,16 @@ class RAGExporter:
         # Настройки эмбеддингов
         self.embedding_config = {
             'enabled': self.config.get('enable_embeddings', True),
-            'batch_size': self.config.get('embedding_batch_size', 32),
+            'batch_size': self.config.get('embedding_batch_size', 64),
             'model': self.config.get('embedding_model', 'all-MiniLM-L6-v2'),
             'normalize': self.config.get('normalize_embeddings', True),
+            # 'float32' - список чисел, 'int8' - квантованный вектор в base64 (в 4 раза меньше)
+            'precision': self.config.get('embedding_precision', 'float32'),
         }
         
+        # Число процессов для нарезки страниц на чанки (1 - в текущем процессе, 0 - по числу ядер)
+        self.workers = self.config.get('export_workers', 1) or os.cpu_count() or 1
+        
         # Инициализация модели эмбеддингов (ленивая)
         self._embedding_model = None
     
@@ -64,160 +224,73 @@ class RAGExporter:
                 self.embedding_config['enabled'] = False
         return self._embedding_model
     
-    def _generate_chunk_id(self, content: str, url: str, position: int) -> str:
-        """Генерация уникального ID для чанка."""
-        content_hash = hashlib.sha256(content.encode()).hexdigest()[:12]
-        url_hash = hashlib.sha256(url.encode()).hexdigest()[:8]
-        return f"{url_hash}-{content_hash}-{position}"
-    
-    def _create_chunk_metadata(
-        self, 
-        content: str, 
-        url: str, 
-        title: str, 
-        chunk_type: str,
-        position: int,
-        embedding: Optional[List[float]] = None,
-        parent_section: Optional[str] = None
-    ) -> ChunkMetadata:
-        """Создание метаданных для чанка."""
-        return ChunkMetadata(
-            id=self._generate_chunk_id(content, url, position),
-            source_url=url,
-            title=title,
-            type=chunk_type,
-            position=position,
-            length=len(content),
-            embedding=embedding,
-            parent_section=parent_section
-        )
-    
-    def _compute_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Вычисление эмбеддингов для списка текстов."""
-        if not self.embedding_config['enabled']:
-            return [None] * len(texts)
+    def _encode(self, texts: List[str]) -> Optional[np.ndarray]:
+        """
+        Вычисление эмбеддингов для списка текстов.
+        
+        Нормализация выполняется самой моделью (normalize_embeddings), без
+        отдельных проходов numpy; результат - одна матрица float32.
+        
+        Returns:
+            Матрица эмбеддингов (n, dim) или None, если эмбеддинги недоступны
+        """
+        if not self.embedding_config['enabled'] or not texts:
+            return None
         
         model = self._get_embedding_model()
         if not model:
-            return [None] * len(texts)
+            return None
         
         try:
-            # Вычисляем эмбеддинги батчами
-            embeddings = []
-            for i in range(0, len(texts), self.embedding_config['batch_size']):
-                batch = texts[i:i + self.embedding_config['batch_size']]
-                batch_embeddings = model.encode(batch)
-                
-                if self.embedding_config['normalize']:
-                    batch_embeddings = batch_embeddings / np.linalg.norm(batch_embeddings, axis=1, keepdims=True)
-                
-                embeddings.extend(batch_embeddings.tolist())
-            
+            # Один вызов encode: модель сама делит тексты на батчи и нормализует векторы
+            embeddings = model.encode(
+                texts,
+                batch_size=self.embedding_config['batch_size'],
+                convert_to_numpy=True,
+                normalize_embeddings=self.embedding_config['normalize'],
+                show_progress_bar=False
+            )
             return embeddings
             
         except Exception as e:
             self.logger.error(f"Ошибка при вычислении эмбеддингов: {e}")
-            return [None] * len(texts)
+            return None
     
-    def _process_chunks(self, page_data: Dict) -> List[Dict]:
-        """Обработка чанков страницы."""
-        chunks = []
-        url = page_data['url']
-        title = page_data.get('title', '')
-        
-        if 'rag_content' not in page_data:
-            return chunks
-        
-        rag_content = page_data['rag_content']
-        
-        # Обработка текстовых чанков
-        texts = [chunk['text'] for chunk in rag_content.get('chunks', [])]
-        embeddings = self._compute_embeddings(texts)
-        
-        for i, chunk in enumerate(rag_content.get('chunks', [])):
-            metadata = self._create_chunk_metadata(
-                content=chunk['text'],
-                url=url,
-                title=title,
-                chunk_type='text',
-                position=i,
-                embedding=embeddings[i] if embeddings else None
-            )
-            
-            chunks.append({
-                'content': chunk['text'],
-                'metadata': metadata.__dict__
-            })
-        
-        # Обработка кода
-        code_texts = [block['code'] for block in rag_content.get('code_blocks', [])]
-        code_embeddings = self._compute_embeddings(code_texts)
-        
-        for i, block in enumerate(rag_content.get('code_blocks', [])):
-            metadata = self._create_chunk_metadata(
-                content=block['code'],
-                url=url,
-                title=title,
-                chunk_type='code',
-                position=len(chunks) + i,
-                embedding=code_embeddings[i] if code_embeddings else None
-            )
-            
-            chunks.append({
-                'content': block['code'],
-                'language': block.get('language', ''),
-                'metadata': metadata.__dict__
-            })
-        
-        # Обработка таблиц
-        for i, table in enumerate(rag_content.get('tables', [])):
-            table_text = ' '.join(
-                [' '.join(table.get('headers', ''))] +
-                [' '.join(row) for row in table.get('rows', [])]
-            )
-            
-            metadata = self._create_chunk_metadata(
-                content=table_text,
-                url=url,
-                title=title,
-                chunk_type='table',
-                position=len(chunks) + i
-            )
-            
-            chunks.append({
-                'content': table_text,
-                'headers': table.get('headers', []),
-                'rows': table.get('rows', []),
-                'metadata': metadata.__dict__
-            })
-        
-        # Обработка списков
-        for i, lst in enumerate(rag_content.get('lists', [])):
-            list_text = ' '.join(lst.get('items', []))
-            
-            metadata = self._create_chunk_metadata(
-                content=list_text,
-                url=url,
-                title=title,
-                chunk_type='list',
-                position=len(chunks) + i
-            )
-            
-            chunks.append({
-                'content': list_text,
-                'items': lst.get('items', []),
-                'list_type': lst.get('type', 'ul'),
-                'metadata': metadata.__dict__
-            })
-        
-        # Связываем чанки
-        for i in range(len(chunks)):
-            if i > 0:
-                chunks[i]['metadata']['prev_chunk_id'] = chunks[i-1]['metadata']['id']
-            if i < len(chunks) - 1:
-                chunks[i]['metadata']['next_chunk_id'] = chunks[i+1]['metadata']['id']
+    def _attach_embeddings(self, chunks: List[Dict]) -> None:
+        """
+        Вычисление эмбеддингов текстовых чанков и блоков кода.
         
-        return chunks
+        Тексты всех переданных чанков кодируются одним вызовом модели,
+        после чего векторы раскладываются по метаданным чанков.
+        """
+        targets = [chunk for chunk in chunks if chunk['metadata']['type'] in ('text', 'code')]
+        embeddings = self._encode([chunk['content'] for chunk in targets])
+        if embeddings is None:
+            return
+        
+        if self.embedding_config['precision'] == 'int8':
+            codes, scales = _quantize_int8(embeddings)
+            for chunk, code, scale in zip(targets, codes, scales):
+                chunk['metadata']['embedding_int8'] = base64.b64encode(code.tobytes()).decode('ascii')
+                chunk['metadata']['embedding_scale'] = float(scale)
+            return
+        
+        # Строки матрицы без .tolist(): сериализуются напрямую, без списков Python-float
+        for chunk, embedding in zip(targets, embeddings):
+            chunk['metadata']['embedding'] = embedding
+    
+    def _iter_page_chunks(self, results: Dict):
+        """
+        Нарезка всех страниц на чанки, при export_workers > 1 - в пуле процессов.
+        
+        Порядок страниц сохраняется. Модель эмбеддингов в дочерние процессы
+        не передается.
+        """
+        if self.workers <= 1 or len(results) < 2:
+            return map(_process_chunks, results.values())
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(_process_chunks, results.values(), chunksize=8))
     
     def export_results(self, results: Dict) -> Dict:
         """
@@ -243,9 +316,8 @@ class RAGExporter:
             }
         }
         
-        # Обрабатываем каждую страницу
-        for url, page_data in results.items():
-            chunks = self._process_chunks(page_data)
+        # Обрабатываем каждую страницу; эмбеддинги считаются отдельно в текущем процессе
+        for chunks in self._iter_page_chunks(results):
             rag_data['chunks'].extend(chunks)
             
             # Обновляем статистику
@@ -255,12 +327,33 @@ class RAGExporter:
             
             rag_data['metadata']['total_chunks'] += len(chunks)
         
+        # Эмбеддинги для всех страниц сразу - один большой батч вместо множества мелких
+        self._attach_embeddings(rag_data['chunks'])
+        
         return rag_data
     
     def save_results(self, results: Dict, output_path: str) -> str:
         """
         Сохраняет результаты в файл.
         
+        Формат выбирается по расширению: .parquet - колоночный Parquet
+        (нужен pyarrow), иначе JSON.
+        
+        Args:
+            results: Словарь с результатами парсинга
+            output_path: Путь для сохранения файла
+            
+        Returns:
+            str: Путь к сохраненному файлу
+        """
+        if output_path.endswith('.parquet'):
+            return self.save_results_parquet(results, output_path)
+        return self.save_results_json(results, output_path)
+    
+    def save_results_json(self, results: Dict, output_path: str) -> str:
+        """
+        Сохраняет результаты в JSON-файл.
+        
         Args:
             results: Словарь с результатами парсинга
             output_path: Путь для сохранения файла
@@ -275,7 +368,86 @@ class RAGExporter:
         rag_data = self.export_results(results)
         
         # Сохраняем в файл
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(rag_data, f, ensure_ascii=False, indent=2)
+        with open(output_path, 'wb') as f:
+            f.write(json_dumps_bytes(rag_data, indent=True))
+        
+        return output_path
+    
+    def save_results_parquet(self, results: Dict, output_path: str) -> str:
+        """
+        Сохраняет результаты в Parquet: одна строка на чанк, эмбеддинги -
+        колонка FixedSizeList<float32> (или int8 при квантовании), сжатие zstd.
+        
+        Общие метаданные экспорта сохраняются в метаданных схемы (ключ 'rag_metadata').
+        Без pyarrow результаты сохраняются в JSON рядом с указанным путем.
+        
+        Args:
+            results: Словарь с результатами парсинга
+            output_path: Путь для сохранения файла
+            
+        Returns:
+            str: Путь к сохраненному файлу
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            json_path = os.path.splitext(output_path)[0] + '.json'
+            self.logger.warning(f"pyarrow не установлен. Результаты будут сохранены в JSON: {json_path}")
+            return self.save_results_json(results, json_path)
+        
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        
+        rag_data = self.export_results(results)
+        chunks = rag_data['chunks']
+        metadata = [chunk['metadata'] for chunk in chunks]
+        
+        columns = {
+            name: [meta[name] for meta in metadata]
+            for name in ('id', 'source_url', 'title', 'type', 'position', 'length',
+                         'parent_section', 'prev_chunk_id', 'next_chunk_id')
+        }
+        columns['content'] = [chunk['content'] for chunk in chunks]
+        columns['language'] = [chunk.get('language') for chunk in chunks]
+        
+        # Структурные поля таблиц и списков храним как JSON-строку
+        extra_keys = ('headers', 'rows', 'items', 'list_type')
+        columns['extra'] = [
+            json.dumps({k: chunk[k] for k in extra_keys if k in chunk}, ensure_ascii=False)
+            if any(k in chunk for k in extra_keys) else None
+            for chunk in chunks
+        ]
+        
+        # Типы колонок задаются явно: иначе колонка, в которой у всех чанков
+        # None, получила бы тип null, и схема менялась бы от экспорта к экспорту
+        types = {
+            name: pa.int64() if name in ('position', 'length') else pa.string()
+            for name in columns
+        }
+        values = dict(columns)
+        
+        embeddings = [meta['embedding'] for meta in metadata]
+        dim = next((len(e) for e in embeddings if e is not None), 0)
+        if dim:
+            types['embedding'] = pa.list_(pa.float32(), dim)
+            values['embedding'] = embeddings
+        if any(meta['embedding_int8'] is not None for meta in metadata):
+            types['embedding_int8'] = pa.binary()
+            values['embedding_int8'] = [
+                base64.b64decode(meta['embedding_int8']) if meta['embedding_int8'] else None
+                for meta in metadata
+            ]
+            types['embedding_scale'] = pa.float32()
+            values['embedding_scale'] = [meta['embedding_scale'] for meta in metadata]
+        
+        schema = pa.schema(
+            [pa.field(name, column_type) for name, column_type in types.items()],
+            metadata={'rag_metadata': json.dumps(rag_data['metadata'], ensure_ascii=False)}
+        )
+        table = pa.table(
+            [pa.array(values[name], type=column_type) for name, column_type in types.items()],
+            schema=schema
+        )
+        pq.write_table(table, output_path, compression='zstd')
         
         return output_path
@@ -6,13 +6,47 @@
 """
 
 import os
-import json
 import csv
 import re
-from bs4 import BeautifulSoup
+import threading
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree
+from lxml import html as lxml_html
 import html2text
 
-from doc_parser.utils.helpers import extract_text
+from doc_parser.utils.helpers import (
+    PAGE_WRITE_BUFFER_SIZE, extract_text, json_dumps_bytes, lxml_document, open_text_writer, url_to_slug
+)
+
+# Теги, удаляемые перед конвертацией в Markdown
+_MARKDOWN_STRIP_TAGS = ('script', 'style', 'iframe', 'noscript')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+# Теги, сохраняемые в навигации; остальные разворачиваются (остается их содержимое)
+_NAVIGATION_TAGS = frozenset(['a', 'ul', 'ol', 'li', 'div', 'span', 'p'])
+
+
+def _ensure_text(page_data, field='content'):
+    """
+    Возвращает простой текст поля страницы, вычисляя его только один раз.
+    
+    Текст сохраняется в page_data[field + '_text'], поэтому при экспорте
+    в несколько форматов HTML каждой страницы разбирается однократно.
+    
+    Args:
+        page_data: Словарь с данными страницы (дополняется на месте)
+        field: Имя поля без суффикса ('content' или 'navigation')
+        
+    Returns:
+        str: Простой текст ('' если HTML отсутствует)
+    """
+    text_key = field + '_text'
+    if text_key not in page_data:
+        html_key = field + '_html'
+        if html_key not in page_data:
+            return ''
+        page_data[text_key] = extract_text(page_data[html_key])
+    return page_data[text_key]
 
 
 class MarkdownExporter:
@@ -29,13 +63,23 @@ class MarkdownExporter:
         """
         self.config = config or {}
         
-        # Настраиваем конвертер html2text
-        self.converter = html2text.HTML2Text()
-        self.converter.ignore_links = False
-        self.converter.bypass_tables = False
-        self.converter.ignore_images = False
-        self.converter.unicode_snob = True
-        self.converter.body_width = 0  # Отключаем перенос строк
+        # Конвертер html2text хранит состояние разбора, поэтому у каждого
+        # потока save_results свой экземпляр
+        self._local = threading.local()
+    
+    @property
+    def converter(self):
+        """Конвертер html2text текущего потока."""
+        converter = getattr(self._local, 'converter', None)
+        if converter is None:
+            # Настраиваем конвертер html2text
+            converter = self._local.converter = html2text.HTML2Text()
+            converter.ignore_links = False
+            converter.bypass_tables = False
+            converter.ignore_images = False
+            converter.unicode_snob = True
+            converter.body_width = 0  # Отключаем перенос строк
+        return converter
     
     def export_content(self, content_html, metadata=None):
         """
@@ -51,19 +95,26 @@ class MarkdownExporter:
         if not content_html:
             return ""
         
-        # Предварительная обработка HTML
-        soup = BeautifulSoup(content_html, 'lxml')
+        # Предварительная обработка HTML: один разбор lxml вместо дерева BeautifulSoup
+        try:
+            root = lxml_document(content_html)
+        except etree.ParserError:
+            # Пустой документ (только пробелы или комментарии)
+            root = None
+        
+        # Удаляем ненужные элементы (текст после них сохраняется)
+        html = ''
+        if root is not None:
+            etree.strip_elements(root, *_MARKDOWN_STRIP_TAGS, with_tail=False)
+            html = lxml_html.tostring(root, encoding='unicode')
         
-        # Удаляем ненужные элементы
-        for selector in ['script', 'style', 'iframe', 'noscript']:
-            for tag in soup.find_all(selector):
-                tag.decompose()
+        # Преобразуем в Markdown
+        markdown = self.converter.handle(html) if html else ''
         
-        # Добавляем заголовок из метаданных, если есть
+        # Добавляем заголовок из метаданных, если есть (сразу в Markdown,
+        # без повторного прохода через html2text)
         if metadata and 'title' in metadata:
-            title_tag = soup.new_tag('h1')
-            title_tag.string = metadata['title']
-            soup.insert(0, title_tag)
+            header = f"# {metadata['title']}\n\n"
             
             # Добавляем метаданные
             meta_text = []
@@ -73,16 +124,13 @@ class MarkdownExporter:
                 meta_text.append(f"Description: {metadata['description']}")
             
             if meta_text:
-                meta_div = soup.new_tag('div')
-                meta_div.string = '\n'.join(meta_text)
-                soup.insert(1, meta_div)
-        
-        # Преобразуем в Markdown
-        markdown = self.converter.handle(str(soup))
+                header += '\n'.join(meta_text) + '\n\n'
+            
+            markdown = header + markdown
         
         # Пост-обработка Markdown
         # Удаляем лишние пробелы и пустые строки
-        markdown = re.sub(r'\n{3,}', '\n\n', markdown).strip()
+        markdown = _BLANK_LINES_RE.sub('\n\n', markdown).strip()
         
         return markdown
     
@@ -99,16 +147,26 @@ class MarkdownExporter:
         if not navigation_html:
             return ""
         
-        # Предварительная обработка HTML
-        soup = BeautifulSoup(navigation_html, 'lxml')
-        
-        # Удаляем все, кроме ссылок и текста
-        for tag in soup.find_all(True):
-            if tag.name not in ['a', 'ul', 'ol', 'li', 'div', 'span', 'p']:
-                tag.unwrap()
+        # Предварительная обработка HTML (lxml использует общий модульный парсер)
+        try:
+            root = lxml_document(navigation_html)
+        except etree.ParserError:
+            # Пустой документ (только пробелы или комментарии)
+            root = None
+        
+        html = ''
+        if root is not None:
+            # Удаляем все, кроме ссылок и текста: лишние теги разворачиваются за один проход
+            unwrap = {el.tag for el in root.iter(tag=etree.Element)} - _NAVIGATION_TAGS
+            etree.strip_tags(root, *unwrap)
+            
+            # Корневой <html> не разворачивается, сериализуем только его содержимое
+            html = (root.text or '') + ''.join(
+                lxml_html.tostring(child, encoding='unicode') for child in root
+            )
         
         # Преобразуем в Markdown
-        markdown = self.converter.handle(str(soup))
+        markdown = self.converter.handle(html)
         
         # Добавляем заголовок
         markdown = "## Навигация\n\n" + markdown
@@ -157,13 +215,14 @@ class MarkdownExporter:
         
         return '\n'.join(parts)
     
-    def save_page(self, output_path, page_data):
+    def save_page(self, output_path, page_data, ensure_dir=True):
         """
         Сохраняет данные страницы в Markdown-файл.
         
         Args:
             output_path: Путь для сохранения файла
             page_data: Словарь с данными страницы
+            ensure_dir: Создавать ли директорию файла (save_results создает ее сам)
             
         Returns:
             str: Путь к сохраненному файлу
@@ -171,10 +230,11 @@ class MarkdownExporter:
         markdown = self.export_page(page_data)
         
         # Создаем директорию, если не существует
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        if ensure_dir:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
         # Сохраняем файл
-        with open(output_path, 'w', encoding='utf-8') as f:
+        with open_text_writer(output_path, buffering=PAGE_WRITE_BUFFER_SIZE) as f:
             f.write(markdown)
         
         return output_path
@@ -183,6 +243,10 @@ class MarkdownExporter:
         """
         Сохраняет результаты парсинга в Markdown-файлы.
         
+        Страницы независимы и сохраняются в пуле потоков (export_threads,
+        по умолчанию - как у ThreadPoolExecutor); порядок путей совпадает
+        с порядком страниц.
+        
         Args:
             results: Словарь с результатами парсинга
             output_dir: Директория для сохранения файлов
@@ -190,18 +254,16 @@ class MarkdownExporter:
         Returns:
             list: Список путей к сохраненным файлам
         """
-        saved_files = []
+        os.makedirs(output_dir, exist_ok=True)
         
-        for url, page_data in results.items():
+        def save(item):
+            url, page_data = item
             # Создаем имя файла из URL
-            filename = re.sub(r'[^\w\-]', '_', url) + '.md'
-            output_path = os.path.join(output_dir, filename)
-            
-            # Сохраняем файл
-            saved_file = self.save_page(output_path, page_data)
-            saved_files.append(saved_file)
+            filename = url_to_slug(url) + '.md'
+            return self.save_page(os.path.join(output_dir, filename), page_data, ensure_dir=False)
         
-        return saved_files
+        with ThreadPoolExecutor(max_workers=self.config.get('export_threads')) as pool:
+            return list(pool.map(save, results.items()))
 
 
 class JsonExporter:
@@ -218,6 +280,17 @@ class JsonExporter:
         """
         self.config = config or {}
     
+    def _add_text(self, results):
+        """
+        Добавляет простой текст контента и навигации для каждой страницы.
+        
+        Args:
+            results: Словарь с результатами парсинга (дополняется на месте)
+        """
+        for url, page_data in results.items():
+            _ensure_text(page_data, 'content')
+            _ensure_text(page_data, 'navigation')
+    
     def export_results(self, results):
         """
         Экспортирует результаты парсинга в JSON.
@@ -228,16 +301,10 @@ class JsonExporter:
         Returns:
             str: JSON-строка
         """
-        # Добавляем простой текст для каждой страницы
-        for url, page_data in results.items():
-            if 'content_html' in page_data:
-                page_data['content_text'] = extract_text(page_data['content_html'])
-            
-            if 'navigation_html' in page_data:
-                page_data['navigation_text'] = extract_text(page_data['navigation_html'])
+        self._add_text(results)
         
         # Преобразуем в JSON
-        return json.dumps(results, ensure_ascii=False, indent=2)
+        return json_dumps_bytes(results, indent=True).decode('utf-8')
     
     def save_results(self, results, output_path):
         """
@@ -253,11 +320,11 @@ class JsonExporter:
         # Создаем директорию, если не существует
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # Преобразуем в JSON и сохраняем
-        json_data = self.export_results(results)
+        self._add_text(results)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(json_data)
+        # orjson сразу выдает UTF-8, поэтому файл пишется в бинарном режиме
+        with open(output_path, 'wb') as f:
+            f.write(json_dumps_bytes(results, indent=True))
         
         return output_path
 
@@ -294,19 +361,22 @@ class CsvExporter:
         headers = ['url', 'title', 'content_text', 'profile', 'depth']
         
         # Записываем в CSV
-        with open(output_path, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader()
-            
-            for url, page_data in results.items():
-                row = {
-                    'url': url,
-                    'title': page_data.get('title', ''),
-                    'content_text': extract_text(page_data.get('content_html', '')),
-                    'profile': page_data.get('profile', ''),
-                    'depth': page_data.get('depth', 0)
-                }
-                writer.writerow(row)
+        # Строки собираются генератором и пишутся одним вызовом writerows
+        rows = (
+            (
+                url,
+                page_data.get('title', ''),
+                _ensure_text(page_data),
+                page_data.get('profile', ''),
+                page_data.get('depth', 0)
+            )
+            for url, page_data in results.items()
+        )
+        
+        with open_text_writer(output_path, newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(rows)
         
         return output_path
     
@@ -328,16 +398,14 @@ class CsvExporter:
         headers = ['source_url', 'target_url']
         
         # Записываем в CSV
-        with open(output_path, 'w', encoding='utf-8', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=headers)
-            writer.writeheader()
-            
-            for url, page_data in results.items():
-                for link in page_data.get('links', []):
-                    row = {
-                        'source_url': url,
-                        'target_url': link
-                    }
-                    writer.writerow(row)
+        rows = chain.from_iterable(
+            ((url, link) for link in page_data.get('links', []))
+            for url, page_data in results.items()
+        )
+        
+        with open_text_writer(output_path, newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            writer.writerows(rows)
         
         return output_path
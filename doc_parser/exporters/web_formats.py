@@ -6,12 +6,98 @@
 """
 
 import os
-import re
+import json
+import hashlib
+import tempfile
 import zipfile
 import shutil
+import threading
+from collections import OrderedDict
+from html import escape
+from string import Template
+from concurrent.futures import Future, ThreadPoolExecutor
+from operator import itemgetter
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from doc_parser.utils.helpers import PAGE_WRITE_BUFFER_SIZE, open_text_writer, url_to_slug
+
+# Параллельные загрузки ассетов одной страницы
+_ASSET_WORKERS = 16
+# Буфер копирования тела ответа в файл
+_ASSET_COPY_BUFFER = 1 << 16
+# Индекс скачанных ассетов (URL -> файл, хэш -> файл) для повторных экспортов
+_ASSET_INDEX = 'assets.json'
+# Сколько результатов обработки ассетов одинаковых страниц хранить в памяти
+_PAGE_ASSETS_CACHE_SIZE = 256
+
+# Шаблон HTML-страницы разбит на части вокруг навигации и контента,
+# чтобы крупные фрагменты писались в файл без сборки всего документа
+_PAGE_HEAD = Template("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="utf-8">
+            <meta name="viewport" content="width=device-width, initial-scale=1.0">
+            <title>$title</title>
+            <style>
+                body { font-family: Arial, sans-serif; line-height: 1.6; margin: 0; padding: 0; }
+                .container { display: flex; }
+                .nav { width: 300px; padding: 20px; border-right: 1px solid #eee; }
+                .content { flex: 1; padding: 20px; }
+                @media (max-width: 768px) {
+                    .container { flex-direction: column; }
+                    .nav { width: 100%; border-right: none; border-bottom: 1px solid #eee; }
+                }
+                pre { background-color: #f5f5f5; padding: 10px; overflow: auto; }
+                code { font-family: monospace; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <div class="nav">
+                    """)
+_PAGE_MIDDLE = Template("""
+                </div>
+                <div class="content">
+                    <h1>$title</h1>
+                    <p>URL: <a href="$href">$url</a></p>
+                    """)
+_PAGE_TAIL = """
+                </div>
+            </div>
+        </body>
+        </html>
+        """
+
+# Шаблон индексной страницы (items)
+_INDEX_TEMPLATE = Template("""
+            <!DOCTYPE html>
+            <html>
+            <head>
+                <meta charset="utf-8">
+                <meta name="viewport" content="width=device-width, initial-scale=1.0">
+                <title>Документация - Индекс</title>
+                <style>
+                    body { font-family: Arial, sans-serif; line-height: 1.6; margin: 0; padding: 20px; }
+                    h1 { border-bottom: 1px solid #eee; padding-bottom: 10px; }
+                    ul { list-style-type: none; padding: 0; }
+                    li { margin-bottom: 10px; }
+                    a { text-decoration: none; color: #0366d6; }
+                    a:hover { text-decoration: underline; }
+                </style>
+            </head>
+            <body>
+                <h1>Документация - Индекс</h1>
+                <ul>
+                    $items
+                </ul>
+            </body>
+            </html>
+            """)
 
 
 class HtmlExporter:
@@ -27,8 +113,93 @@ class HtmlExporter:
             config: Словарь с настройками
         """
         self.config = config or {}
+        
+        # Общие для страниц ассеты (CSS, JS, логотипы) скачиваются один раз,
+        # в том числе при сохранении страниц в несколько потоков:
+        # URL -> имя файла (или Future, пока идет загрузка) и хэш -> имя файла
+        self._assets_lock = threading.Lock()
+        self._asset_cache = {}
+        self._asset_digests = {}
+        
+        # Страницы с одинаковым HTML (пагинация, зеркала) обрабатываются один раз:
+        # отпечаток HTML -> HTML с переписанными ссылками (None, если ссылок нет)
+        self._page_assets_cache = OrderedDict()
+        
+        # Одна сессия с пулом соединений: ассеты одного хоста не открывают
+        # новое TCP/TLS-соединение на каждый файл
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=Retry(total=2))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
     
-    def export_page(self, page_data, output_path, assets_dir=None):
+    def iter_page(self, page_data):
+        """
+        Формирует HTML-документ страницы по частям.
+        
+        Args:
+            page_data: Словарь с данными страницы
+            
+        Returns:
+            tuple: Последовательные фрагменты HTML-кода страницы
+        """
+        title = escape(page_data.get('title', 'Документация'))
+        return (
+            _PAGE_HEAD.substitute(title=title),
+            page_data.get('navigation_html', ''),
+            _PAGE_MIDDLE.substitute(
+                title=title,
+                href=escape(page_data.get('url', '#')),
+                url=escape(page_data.get('url', ''))
+            ),
+            page_data.get('content_html', ''),
+            _PAGE_TAIL
+        )
+    
+    def render_page(self, page_data):
+        """
+        Формирует HTML-документ страницы.
+        
+        Args:
+            page_data: Словарь с данными страницы
+            
+        Returns:
+            str: HTML-код страницы
+        """
+        return ''.join(self.iter_page(page_data))
+    
+    @staticmethod
+    def page_entries(results):
+        """
+        Вычисляет для каждой страницы имя файла и заголовок (один раз на страницу).
+        
+        Args:
+            results: Словарь с результатами парсинга
+            
+        Returns:
+            list: Список кортежей (url, имя файла, заголовок, данные страницы)
+        """
+        return [
+            (url, url_to_slug(url) + '.html', page_data.get('title', url), page_data)
+            for url, page_data in results.items()
+        ]
+    
+    def render_index(self, entries):
+        """
+        Формирует индексную страницу со ссылками на все страницы.
+        
+        Args:
+            entries: Список страниц из page_entries
+            
+        Returns:
+            str: HTML-код индекса
+        """
+        items = ''.join(
+            f'<li><a href="{filename}">{escape(title)}</a></li>'
+            for _, filename, title, _ in sorted(entries, key=itemgetter(2))
+        )
+        return _INDEX_TEMPLATE.substitute(items=items)
+    
+    def export_page(self, page_data, output_path, assets_dir=None, ensure_dir=True):
         """
         Экспортирует данные страницы в HTML.
         
@@ -36,147 +207,252 @@ class HtmlExporter:
             page_data: Словарь с данными страницы
             output_path: Путь для сохранения файла
             assets_dir: Директория для сохранения ассетов (если None, не сохраняет)
+            ensure_dir: Создавать ли директории файла и ассетов (save_results создает их сам)
             
         Returns:
             str: Путь к сохраненному файлу
         """
         # Создаем директорию, если не существует
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        if ensure_dir:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # Создаем шаблон HTML
-        html_template = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="utf-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <title>{page_data.get('title', 'Документация')}</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; margin: 0; padding: 0; }}
-                .container {{ display: flex; }}
-                .nav {{ width: 300px; padding: 20px; border-right: 1px solid #eee; }}
-                .content {{ flex: 1; padding: 20px; }}
-                @media (max-width: 768px) {{
-                    .container {{ flex-direction: column; }}
-                    .nav {{ width: 100%; border-right: none; border-bottom: 1px solid #eee; }}
-                }}
-                pre {{ background-color: #f5f5f5; padding: 10px; overflow: auto; }}
-                code {{ font-family: monospace; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="nav">
-                    {page_data.get('navigation_html', '')}
-                </div>
-                <div class="content">
-                    <h1>{page_data.get('title', 'Документация')}</h1>
-                    <p>URL: <a href="{page_data.get('url', '#')}">{page_data.get('url', '')}</a></p>
-                    {page_data.get('content_html', '')}
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Сохраняем файл
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html_template)
+        # Сохраняем файл по частям, не собирая документ целиком в памяти
+        with open_text_writer(output_path, buffering=PAGE_WRITE_BUFFER_SIZE) as f:
+            f.writelines(self.iter_page(page_data))
         
         # Если нужно сохранять ассеты
         if assets_dir and self.config.get('save_assets', False):
-            self._save_assets(page_data, assets_dir)
+            self._save_assets(page_data, assets_dir, ensure_dir)
         
         return output_path
     
-    def _save_assets(self, page_data, assets_dir):
+    def _load_asset_index(self, assets_dir):
+        """
+        Загружает индекс скачанных ассетов, сохраненный прошлым экспортом.
+        
+        Учитываются только записи, файлы которых есть в assets_dir.
+        
+        Args:
+            assets_dir: Директория ассетов
+        """
+        try:
+            with open(os.path.join(assets_dir, _ASSET_INDEX), encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        with self._assets_lock:
+            for digest, filename in index.get('digests', {}).items():
+                if os.path.exists(os.path.join(assets_dir, filename)):
+                    self._asset_digests[digest] = filename
+            known = set(self._asset_digests.values())
+            for url, filename in index.get('urls', {}).items():
+                if filename in known:
+                    self._asset_cache[url] = filename
+    
+    def _save_asset_index(self, assets_dir):
+        """
+        Сохраняет индекс скачанных ассетов рядом с ними (assets.json).
+        
+        Args:
+            assets_dir: Директория ассетов
+        """
+        with self._assets_lock:
+            index = {
+                'urls': {url: name for url, name in self._asset_cache.items() if isinstance(name, str)},
+                'digests': dict(self._asset_digests),
+            }
+        
+        with open_text_writer(os.path.join(assets_dir, _ASSET_INDEX)) as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+    
+    def _fetch_asset(self, full_url, filename, assets_dir):
+        """
+        Возвращает локальное имя ассета, скачивая его только при первом обращении.
+        
+        Ассеты кэшируются по URL; одновременные запросы одного URL ждут
+        первую загрузку. Файлы с одинаковым содержимым (по хэшу) хранятся
+        в одном экземпляре.
+        
+        Args:
+            full_url: Абсолютный URL ассета
+            filename: Имя файла из URL
+            assets_dir: Директория ассетов
+            
+        Returns:
+            str: Имя файла в assets_dir
+        """
+        with self._assets_lock:
+            entry = self._asset_cache.get(full_url)
+            owner = entry is None
+            if owner:
+                entry = self._asset_cache[full_url] = Future()
+        
+        if not owner:
+            return entry.result() if isinstance(entry, Future) else entry
+        
+        try:
+            local_name = self._download_asset(full_url, filename, assets_dir)
+        except Exception as e:
+            with self._assets_lock:
+                del self._asset_cache[full_url]
+            entry.set_exception(e)
+            raise
+        
+        with self._assets_lock:
+            self._asset_cache[full_url] = local_name
+        entry.set_result(local_name)
+        return local_name
+    
+    def _download_asset(self, full_url, filename, assets_dir):
+        """
+        Скачивает ассет через общую сессию во временный файл и переносит его
+        под итоговым именем (или удаляет, если такой файл уже есть).
+        
+        Returns:
+            str: Имя файла в assets_dir
+        """
+        fd, temp_path = tempfile.mkstemp(dir=assets_dir, suffix='.part')
+        try:
+            digest = hashlib.blake2b(digest_size=16)
+            
+            # Скачиваем файл потоком, без загрузки тела в память целиком
+            with os.fdopen(fd, 'wb') as f, \
+                    self.session.get(full_url, stream=True, timeout=self.config.get('timeout', 30)) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                for chunk in iter(lambda: response.raw.read(_ASSET_COPY_BUFFER), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+            
+            digest = digest.hexdigest()
+            with self._assets_lock:
+                existing = self._asset_digests.get(digest)
+                if existing is not None:
+                    os.remove(temp_path)
+                    return existing
+                
+                # Разные URL с одинаковым именем файла не перезаписывают друг друга
+                local_name = filename
+                if local_name in self._asset_digests.values():
+                    stem, ext = os.path.splitext(filename)
+                    local_name = f"{stem}-{digest[:8]}{ext}"
+                
+                os.replace(temp_path, os.path.join(assets_dir, local_name))
+                self._asset_digests[digest] = local_name
+                return local_name
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    
+    def _save_assets(self, page_data, assets_dir, ensure_dir=True):
         """
         Сохраняет ассеты (изображения, CSS, JS) из страницы.
         
+        Ассеты страницы скачиваются параллельно через пул соединений сессии;
+        ссылки в HTML обновляются после загрузки.
+        
         Args:
             page_data: Словарь с данными страницы
             assets_dir: Директория для сохранения ассетов
+            ensure_dir: Создавать ли директорию ассетов
         """
         # Создаем директорию для ассетов
-        os.makedirs(assets_dir, exist_ok=True)
-        
-        # Парсим HTML
-        soup = BeautifulSoup(page_data.get('content_html', ''), 'lxml')
+        if ensure_dir:
+            os.makedirs(assets_dir, exist_ok=True)
         
-        # Находим все ассеты
-        images = soup.find_all('img', src=True)
-        css_links = soup.find_all('link', rel='stylesheet', href=True)
-        js_scripts = soup.find_all('script', src=True)
+        content_html = page_data.get('content_html', '')
         
         # URL страницы для относительных ссылок
         base_url = page_data.get('url', '')
         
-        # Сохраняем изображения
-        for img in images:
-            src = img['src']
-            # Получаем полный URL
-            full_url = urljoin(base_url, src)
-            try:
-                # Получаем имя файла
-                parsed_url = urlparse(full_url)
-                filename = os.path.basename(parsed_url.path)
-                if not filename:
-                    continue
-                
-                # Создаем путь для сохранения
-                save_path = os.path.join(assets_dir, filename)
-                
-                # Скачиваем файл
-                response = requests.get(full_url, stream=True)
-                response.raise_for_status()
-                
-                # Сохраняем файл
-                with open(save_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
-                # Обновляем src в HTML
-                img['src'] = os.path.join('assets', filename)
-            except Exception as e:
-                print(f"Ошибка при сохранении изображения {src}: {e}")
+        # Относительные ссылки одинаково разрешаются в пределах директории страницы
+        fingerprint = hashlib.blake2b(digest_size=16)
+        for part in (assets_dir, urljoin(base_url, '.'), content_html):
+            fingerprint.update(part.encode('utf-8'))
+            fingerprint.update(b'\0')
+        key = fingerprint.digest()
+        
+        with self._assets_lock:
+            if key in self._page_assets_cache:
+                self._page_assets_cache.move_to_end(key)
+                rewritten = self._page_assets_cache[key]
+                if rewritten is not None:
+                    page_data['content_html'] = rewritten
+                return
+        
+        # Парсим HTML (Lexbor)
+        tree = LexborHTMLParser(content_html)
+        
+        # Находим все ассеты
+        images = tree.css('img[src]')
+        css_links = tree.css('link[rel~="stylesheet"][href]')
+        js_scripts = tree.css('script[src]')
         
-        # Аналогично для CSS и JS
-        for link in css_links + js_scripts:
-            src_attr = 'href' if link.name == 'link' else 'src'
-            src = link[src_attr]
+        # Собираем задачи загрузки: (тег, атрибут, полный URL, имя файла)
+        tasks = []
+        for tag in images + css_links + js_scripts:
+            src_attr = 'href' if tag.tag == 'link' else 'src'
             
-            # Получаем полный URL
-            full_url = urljoin(base_url, src)
+            # Получаем полный URL и имя файла
+            full_url = urljoin(base_url, tag.attributes[src_attr])
+            filename = os.path.basename(urlparse(full_url).path)
+            if filename:
+                tasks.append((tag, src_attr, full_url, filename))
+        
+        def fetch(task):
+            tag, src_attr, full_url, filename = task
             try:
-                # Получаем имя файла
-                parsed_url = urlparse(full_url)
-                filename = os.path.basename(parsed_url.path)
-                if not filename:
-                    continue
-                
-                # Создаем путь для сохранения
-                save_path = os.path.join(assets_dir, filename)
-                
-                # Скачиваем файл
-                response = requests.get(full_url)
-                response.raise_for_status()
-                
-                # Сохраняем файл
-                with open(save_path, 'wb') as f:
-                    f.write(response.content)
-                
-                # Обновляем src в HTML
-                link[src_attr] = os.path.join('assets', filename)
+                return self._fetch_asset(full_url, filename, assets_dir)
             except Exception as e:
-                print(f"Ошибка при сохранении ресурса {src}: {e}")
+                kind = 'изображения' if tag.tag == 'img' else 'ресурса'
+                print(f"Ошибка при сохранении {kind} {tag.attributes[src_attr]}: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=_ASSET_WORKERS) as pool:
+            local_names = list(pool.map(fetch, tasks))
+        
+        # Обновляем ссылки в HTML (дерево меняется только в этом потоке)
+        updated = False
+        for (tag, src_attr, full_url, filename), local_name in zip(tasks, local_names):
+            if local_name:
+                tag.attrs[src_attr] = os.path.join('assets', local_name)
+                updated = True
+        
+        # Обновляем HTML в page_data (без изменений повторная сериализация не нужна)
+        rewritten = tree.html if updated else None
+        if rewritten is not None:
+            page_data['content_html'] = rewritten
+        
+        with self._assets_lock:
+            self._page_assets_cache[key] = rewritten
+            if len(self._page_assets_cache) > _PAGE_ASSETS_CACHE_SIZE:
+                self._page_assets_cache.popitem(last=False)
+    
+    def download_assets(self, results, assets_dir):
+        """
+        Скачивает ассеты всех страниц в assets_dir (без сохранения самих страниц).
         
-        # Обновляем HTML в page_data
-        page_data['content_html'] = str(soup)
+        Args:
+            results: Словарь с результатами парсинга
+            assets_dir: Директория для сохранения ассетов
+        """
+        os.makedirs(assets_dir, exist_ok=True)
+        self._load_asset_index(assets_dir)
+        
+        with ThreadPoolExecutor(max_workers=self.config.get('export_threads')) as pool:
+            list(pool.map(lambda page_data: self._save_assets(page_data, assets_dir, False), results.values()))
+        
+        self._save_asset_index(assets_dir)
     
     def save_results(self, results, output_dir):
         """
         Сохраняет результаты парсинга в HTML-файлы.
         
+        Страницы (вместе с загрузкой их ассетов) сохраняются в пуле потоков
+        (export_threads, по умолчанию - как у ThreadPoolExecutor).
+        
         Args:
             results: Словарь с результатами парсинга
             output_dir: Директория для сохранения файлов
@@ -184,54 +460,32 @@ class HtmlExporter:
         Returns:
             list: Список путей к сохраненным файлам
         """
-        saved_files = []
-        
         # Создаем директорию для ассетов
         assets_dir = os.path.join(output_dir, 'assets')
         os.makedirs(assets_dir, exist_ok=True)
         
-        for url, page_data in results.items():
-            # Создаем имя файла из URL
-            filename = re.sub(r'[^\w\-]', '_', url) + '.html'
-            output_path = os.path.join(output_dir, filename)
-            
-            # Сохраняем файл
-            saved_file = self.export_page(page_data, output_path, assets_dir)
-            saved_files.append(saved_file)
+        save_assets = self.config.get('save_assets', False)
+        if save_assets:
+            self._load_asset_index(assets_dir)
+        
+        # Имена файлов и заголовки нужны и страницам, и индексу
+        entries = self.page_entries(results)
+        
+        def save(entry):
+            _, filename, _, page_data = entry
+            return self.export_page(page_data, os.path.join(output_dir, filename), assets_dir, ensure_dir=False)
+        
+        with ThreadPoolExecutor(max_workers=self.config.get('export_threads')) as pool:
+            saved_files = list(pool.map(save, entries))
+        
+        if save_assets:
+            self._save_asset_index(assets_dir)
         
         # Создаем индексный файл
         index_path = os.path.join(output_dir, 'index.html')
         
-        with open(index_path, 'w', encoding='utf-8') as f:
-            f.write(f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <meta charset="utf-8">
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                <title>Документация - Индекс</title>
-                <style>
-                    body {{ font-family: Arial, sans-serif; line-height: 1.6; margin: 0; padding: 20px; }}
-                    h1 {{ border-bottom: 1px solid #eee; padding-bottom: 10px; }}
-                    ul {{ list-style-type: none; padding: 0; }}
-                    li {{ margin-bottom: 10px; }}
-                    a {{ text-decoration: none; color: #0366d6; }}
-                    a:hover {{ text-decoration: underline; }}
-                </style>
-            </head>
-            <body>
-                <h1>Документация - Индекс</h1>
-                <ul>
-                    {
-                        ''.join(
-                            f'<li><a href="{re.sub(r"[^\w\-]", "_", url)}.html">{page_data.get("title", url)}</a></li>'
-                            for url, page_data in sorted(results.items(), key=lambda x: x[1].get('title', x[0]))
-                        )
-                    }
-                </ul>
-            </body>
-            </html>
-            """)
+        with open_text_writer(index_path) as f:
+            f.write(self.render_index(entries))
         
         saved_files.append(index_path)
         
@@ -257,6 +511,9 @@ class ZipExporter:
         """
         Экспортирует результаты парсинга в ZIP-архив.
         
+        Страницы и индекс пишутся в архив прямо из памяти; через временную
+        директорию проходят только скачиваемые ассеты (save_assets).
+        
         Args:
             results: Словарь с результатами парсинга
             output_path: Путь для сохранения ZIP-архива
@@ -264,23 +521,37 @@ class ZipExporter:
         Returns:
             str: Путь к сохраненному архиву
         """
-        # Создаем временную директорию
-        temp_dir = output_path + '_temp'
-        os.makedirs(temp_dir, exist_ok=True)
+        save_assets = self.config.get('save_assets', False)
+        temp_dir = output_path + '_temp' if save_assets else None
         
         try:
-            # Сохраняем HTML-файлы
-            self.html_exporter.save_results(results, temp_dir)
-            
-            # Создаем ZIP-архив
-            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for root, _, files in os.walk(temp_dir):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, temp_dir)
-                        zipf.write(file_path, arcname)
+            # Для HTML-текста быстрый уровень сжатия почти не уступает по размеру
+            compresslevel = self.config.get('zip_compresslevel', 1)
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as zipf:
+                # HTML-страницы и индекс
+                entries = self.html_exporter.page_entries(results)
+                for _, filename, _, page_data in entries:
+                    with zipf.open(filename, 'w') as entry:
+                        for part in self.html_exporter.iter_page(page_data):
+                            entry.write(part.encode('utf-8'))
+                zipf.writestr('index.html', self.html_exporter.render_index(entries))
+                
+                # Ассеты
+                if save_assets:
+                    assets_dir = os.path.join(temp_dir, 'assets')
+                    self.html_exporter.download_assets(results, assets_dir)
+                    # scandir отдает готовые пути и тип записи без лишнего stat;
+                    # служебный индекс кэша ассетов в архив не входит
+                    with os.scandir(assets_dir) as dir_entries:
+                        files = sorted(
+                            (item.name, item.path) for item in dir_entries
+                            if item.is_file() and item.name != _ASSET_INDEX
+                        )
+                    for name, path in files:
+                        zipf.write(path, 'assets/' + name)
             
             return output_path
         finally:
             # Удаляем временную директорию
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
@@ -5,8 +5,24 @@
 Интерфейсы для парсера документации (GUI, API, WebUI).
 """
 
-from doc_parser.interface.app import run_app
-from doc_parser.interface.api import start_server
-from doc_parser.interface.webui import run_webui
+import importlib
 
 __all__ = ['run_app', 'start_server', 'run_webui']
+
+# Имя -> модуль. Интерфейсы импортируются при первом обращении: запуск GUI
+# не загружает FastAPI и наоборот
+_LAZY_EXPORTS = {
+    'run_app': 'doc_parser.interface.app',
+    'start_server': 'doc_parser.interface.api',
+    'run_webui': 'doc_parser.interface.webui',
+}
+
+
+def __getattr__(name):
+    """Импортирует экспортируемое имя при первом обращении."""
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
@@ -6,22 +6,30 @@ REST API-сервер для парсера документации.
 """
 
 import os
+import shutil
 import logging
 import asyncio
-import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
 from typing import Dict, List, Optional, Any, Union
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, HttpUrl, validator
 import uvicorn
 import uuid
 
+try:
+    import orjson
+except ImportError:  # orjson необязателен: без него ответы сериализует стандартный json
+    orjson = None
+
 from doc_parser.config import DEFAULT_CONFIG
 from doc_parser.core.parser import DocumentationParser
-from doc_parser.exporters.text_formats import MarkdownExporter, JsonExporter, CsvExporter
-from doc_parser.exporters.ai_formats import ClaudeExporter
-from doc_parser.exporters.web_formats import HtmlExporter, ZipExporter
+from doc_parser.exporters.dispatch import export_results
+from doc_parser.interface.job_store import JobStore, private_state_dir
+from doc_parser.utils.helpers import json_dumps_bytes, open_text_writer, url_to_slug
 
 
 # Модели данных API
@@ -65,7 +73,8 @@ class ParsingJob(BaseModel):
 app = FastAPI(
     title="DocParser API",
     description="REST API для парсера документации",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
 )
 
 # Добавляем поддержку CORS
@@ -85,45 +94,271 @@ handler.setFormatter(formatter)
 logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
-# Хранилище задач
-parsing_jobs: Dict[str, ParsingJob] = {}
+# Задачи этого процесса (в порядке создания). Все изменения сразу записываются
+# в job_store; и там, и здесь хранится не больше MAX_JOBS задач - при
+# переполнении вытесняются самые старые завершенные задачи
+MAX_JOBS = 1000
+parsing_jobs: "OrderedDict[str, ParsingJob]" = OrderedDict()
+
+# Готовый JSON для GET /jobs и версия данных job_store, для которой он построен;
+# сбрасывается при изменении задач этим или другим процессом
+_jobs_cache_json: Optional[bytes] = None
+_jobs_cache_version: Optional[int] = None
+
+# Временная директория для результатов и хранилища задач (доступна только владельцу)
+TEMP_DIR = private_state_dir("doc_parser_api")
+
+# Общее для всех процессов сервера хранилище задач
+job_store = JobStore(os.path.join(TEMP_DIR, "jobs.sqlite"))
+
+# Пул процессов для обхода: разбор HTML упирается в CPU, и в потоках
+# одновременные задачи сериализовались бы на GIL. Создается при первой задаче.
+_crawl_pool: Optional[ProcessPoolExecutor] = None
+
+
+# Максимум одновременно выполняемых задач; остальные ждут в очереди
+# со статусом pending, не занимая процессы, память и диск
+MAX_PARALLEL_JOBS = int(os.environ.get("DP_MAX_PARALLEL", "4"))
+_jobs_semaphore: Optional[asyncio.Semaphore] = None
+_queued_jobs = 0
+
+
+def _get_jobs_semaphore() -> asyncio.Semaphore:
+    """Возвращает семафор задач (создается в работающем event loop)."""
+    global _jobs_semaphore
+    if _jobs_semaphore is None:
+        _jobs_semaphore = asyncio.Semaphore(MAX_PARALLEL_JOBS)
+    return _jobs_semaphore
+
+
+def _get_crawl_pool() -> ProcessPoolExecutor:
+    """Возвращает пул процессов для обхода, создавая его при первом вызове."""
+    global _crawl_pool
+    if _crawl_pool is None:
+        _crawl_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _crawl_pool
+
+
+def crawl_url(url: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Выполняет обход в рабочем процессе (парсер создается на месте, так как
+    его сессия и логгер не передаются между процессами).
+    
+    Args:
+        url: URL для парсинга
+        config: Конфигурация парсера
+        
+    Returns:
+        dict: Результаты парсинга
+    """
+    parser = DocumentationParser(config)
+    return parser.crawl(url)
 
-# Временная директория для результатов
-TEMP_DIR = os.path.join(tempfile.gettempdir(), "doc_parser_api")
-os.makedirs(TEMP_DIR, exist_ok=True)
 
 # Функции для работы с задачами
-def get_job_result_path(job_id: str, output_format: str) -> str:
+def _invalidate_jobs_cache():
+    """Сбрасывает кэшированный список задач."""
+    global _jobs_cache_json
+    _jobs_cache_json = None
+
+
+def update_job(job_id: str, **fields):
+    """
+    Обновляет поля задачи и сбрасывает кэш списка задач.
+    
+    Args:
+        job_id: Идентификатор задачи
+        **fields: Новые значения полей ParsingJob
+    """
+    job = parsing_jobs[job_id]
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job_store.put(job.dict())
+    _invalidate_jobs_cache()
+
+
+def find_job(job_id: str) -> Optional[ParsingJob]:
+    """
+    Находит задачу: сначала среди задач этого процесса, затем в общем хранилище.
+    
+    Args:
+        job_id: Идентификатор задачи
+        
+    Returns:
+        ParsingJob: Задача или None, если она не найдена
+    """
+    job = parsing_jobs.get(job_id)
+    if job is None:
+        data = job_store.get(job_id)
+        if data is not None:
+            job = ParsingJob(**data)
+    return job
+
+
+def remove_job_files(job_id: str, result_file: Optional[str] = None):
+    """
+    Удаляет файлы результатов задачи (блокирующая операция с ФС).
+    
+    Args:
+        job_id: Идентификатор задачи
+        result_file: Путь к файлу (или директории) результата
+    """
+    if result_file and os.path.exists(result_file):
+        if os.path.isdir(result_file):
+            shutil.rmtree(result_file, ignore_errors=True)
+        else:
+            os.remove(result_file)
+    
+    # Удаляем директорию задачи
+    job_dir = os.path.join(TEMP_DIR, job_id)
+    if os.path.exists(job_dir):
+        shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def add_job(job: ParsingJob):
+    """
+    Добавляет задачу в хранилище, вытесняя старые завершенные задачи
+    при превышении MAX_JOBS в общем хранилище или в этом процессе
+    (выполняющиеся задачи не вытесняются).
+    
+    Args:
+        job: Новая задача
+        
+    Returns:
+        list: Вытесненные задачи (их файлы удаляет вызывающий код)
+    """
+    parsing_jobs[job.job_id] = job
+    parsing_jobs.move_to_end(job.job_id)
+    job_store.put(job.dict())
+    
+    # Общее хранилище: задачи всех процессов, в том числе прошлых запусков
+    evicted = [ParsingJob(**data) for data in job_store.evict(MAX_JOBS)]
+    for old_job in evicted:
+        parsing_jobs.pop(old_job.job_id, None)
+    
+    if len(parsing_jobs) > MAX_JOBS:
+        local_evicted = []
+        for job_id, old_job in list(parsing_jobs.items()):
+            if len(parsing_jobs) <= MAX_JOBS:
+                break
+            if old_job.status in ("completed", "error"):
+                local_evicted.append(parsing_jobs.pop(job_id))
+        if local_evicted:
+            job_store.delete(*(old_job.job_id for old_job in local_evicted))
+            evicted.extend(local_evicted)
+    
+    for old_job in evicted:
+        logger.info(f"Задача {old_job.job_id} вытеснена из хранилища")
+    _invalidate_jobs_cache()
+    return evicted
+
+
+def write_markdown_index(results: Dict[str, Any], output_dir: str) -> str:
+    """
+    Создает индексный файл для Markdown-экспорта.
+    
+    Args:
+        results: Результаты парсинга
+        output_dir: Директория с Markdown-файлами
+        
+    Returns:
+        str: Путь к индексному файлу
+    """
+    index_path = os.path.join(output_dir, 'index.md')
+    # Имена файлов - те же, что у MarkdownExporter (общий скомпилированный url_to_slug)
+    # Ключи сортировки вычисляются одним проходом; сортировка сравнивает только
+    # заголовки и сохраняет исходный порядок страниц с одинаковым заголовком
+    entries = [(page_data.get('title', url), url_to_slug(url)) for url, page_data in results.items()]
+    entries.sort(key=itemgetter(0))
+    lines = ["# Документация - Индекс\n\n"]
+    lines.extend(f"- [{title}]({slug}.md)\n" for title, slug in entries)
+    
+    # Индекс собирается целиком и записывается одним вызовом
+    with open_text_writer(index_path) as f:
+        f.write(''.join(lines))
+    return index_path
+
+
+# Формат вывода -> файл результата в директории задачи (его отдает download);
+# для markdown результатом служит индекс, построенный по страницам
+RESULT_FILES = {
+    'json': 'results.json',
+    'csv': 'results.csv',
+    'claude': 'claude.md',
+    'html': 'index.html',
+    'zip': 'documentation.zip',
+}
+
+
+def get_job_dir(job_id: str) -> str:
     """
-    Получает путь для сохранения результатов задачи.
+    Создает директорию для результатов задачи.
     
     Args:
         job_id: Идентификатор задачи
-        output_format: Формат вывода
         
     Returns:
-        str: Путь для сохранения результатов
+        str: Путь к директории задачи
     """
     job_dir = os.path.join(TEMP_DIR, job_id)
     os.makedirs(job_dir, exist_ok=True)
+    return job_dir
+
+
+def export_job_results(job_id: str, results: Dict[str, Any], config: Dict[str, Any]) -> str:
+    """
+    Экспортирует результаты задачи в выбранный формат (блокирующая операция с ФС).
     
-    if output_format == 'json':
-        return os.path.join(job_dir, 'results.json')
-    elif output_format == 'csv':
-        return os.path.join(job_dir, 'results.csv')
-    elif output_format == 'claude':
-        return os.path.join(job_dir, 'claude.md')
-    elif output_format == 'html':
-        return os.path.join(job_dir, 'index.html')
-    elif output_format == 'zip':
-        return os.path.join(job_dir, 'documentation.zip')
-    else:  # markdown и другие
-        return job_dir
+    Args:
+        job_id: Идентификатор задачи
+        results: Результаты парсинга
+        config: Конфигурация парсера
+        
+    Returns:
+        str: Путь к файлу результата
+        
+    Raises:
+        ValueError: Если формат неизвестен
+    """
+    output_format = config.get('output_format', 'markdown')
+    job_dir = get_job_dir(job_id)
+    
+    export_results(results, job_dir, output_format, config, report=logger.info)
+    
+    if output_format == 'markdown':
+        return write_markdown_index(results, job_dir)
+    return os.path.join(job_dir, RESULT_FILES[output_format])
 
 
 async def run_parsing_job(job_id: str, url: str, config: Dict[str, Any]):
     """
-    Запускает задачу парсинга в фоне.
+    Запускает задачу парсинга в фоне, когда освободится место
+    (не более MAX_PARALLEL_JOBS задач одновременно).
+    
+    Args:
+        job_id: Идентификатор задачи
+        url: URL для парсинга
+        config: Конфигурация парсера
+    """
+    global _queued_jobs
+    semaphore = _get_jobs_semaphore()
+    
+    # Ожидание места в очереди
+    _queued_jobs += 1
+    try:
+        await semaphore.acquire()
+    finally:
+        _queued_jobs -= 1
+    
+    try:
+        await _run_parsing_job(job_id, url, config)
+    finally:
+        semaphore.release()
+
+
+async def _run_parsing_job(job_id: str, url: str, config: Dict[str, Any]):
+    """
+    Выполняет задачу парсинга (вызывается после получения места в семафоре).
     
     Args:
         job_id: Идентификатор задачи
@@ -132,61 +367,17 @@ async def run_parsing_job(job_id: str, url: str, config: Dict[str, Any]):
     """
     try:
         # Обновляем статус
-        parsing_jobs[job_id].status = "processing"
-        
-        # Запускаем парсер
-        parser = DocumentationParser(config)
-        
-        # Запускаем обход (в отдельном потоке)
-        loop = asyncio.get_event_loop()
-        results = await loop.run_in_executor(None, parser.crawl, url)
+        update_job(job_id, status="processing")
         
-        # Экспортируем результаты
-        output_format = config.get('output_format', 'markdown')
-        output_path = get_job_result_path(job_id, output_format)
+        # Запускаем обход (в отдельном процессе)
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(_get_crawl_pool(), crawl_url, url, config)
         
-        # Экспорт в соответствующий формат
-        if output_format == 'markdown':
-            exporter = MarkdownExporter(config)
-            exporter.save_results(results, output_path)
-            # Создаем индексный файл
-            index_path = os.path.join(output_path, 'index.md')
-            with open(index_path, 'w', encoding='utf-8') as f:
-                f.write(f"# Документация - Индекс\n\n")
-                for url, page_data in sorted(results.items(), key=lambda x: x[1].get('title', x[0])):
-                    title = page_data.get('title', url)
-                    filename = f"{url.replace('://', '_').replace('/', '_')}.md"
-                    f.write(f"- [{title}]({filename})\n")
-            result_file = index_path
-            
-        elif output_format == 'json':
-            exporter = JsonExporter(config)
-            exporter.save_results(results, output_path)
-            result_file = output_path
-            
-        elif output_format == 'csv':
-            exporter = CsvExporter(config)
-            exporter.export_results(results, output_path)
-            result_file = output_path
-            
-        elif output_format == 'claude':
-            exporter = ClaudeExporter(config)
-            exporter.export_for_claude(results, output_path)
-            result_file = output_path
-            
-        elif output_format == 'html':
-            exporter = HtmlExporter(config)
-            exporter.save_results(results, output_path)
-            result_file = os.path.join(output_path, 'index.html')
-            
-        elif output_format == 'zip':
-            exporter = ZipExporter(config)
-            exporter.export_to_zip(results, output_path)
-            result_file = output_path
+        # Экспортируем результаты в пуле потоков, не блокируя event loop
+        result_file = await loop.run_in_executor(None, export_job_results, job_id, results, config)
         
         # Обновляем статус задачи
-        parsing_jobs[job_id].status = "completed"
-        parsing_jobs[job_id].result_file = result_file
+        update_job(job_id, status="completed", result_file=result_file)
         logger.info(f"Задача {job_id} завершена. Результат: {result_file}")
         
     except Exception as e:
@@ -195,15 +386,35 @@ async def run_parsing_job(job_id: str, url: str, config: Dict[str, Any]):
         logger.error(f"Ошибка в задаче {job_id}: {error_text}")
         
         # Обновляем статус задачи
-        parsing_jobs[job_id].status = "error"
-        parsing_jobs[job_id].error = str(e)
+        update_job(job_id, status="error", error=str(e))
+
+
+@app.on_event("startup")
+async def log_event_loop():
+    """Логирует используемые event loop и сервер (uvloop при наличии uvicorn[standard])."""
+    loop = asyncio.get_running_loop()
+    logger.info(f"API-сервер запущен, event loop: {type(loop).__module__}.{type(loop).__name__}")
+
+
+@app.on_event("startup")
+async def recover_jobs():
+    """Помечает ошибкой задачи, не завершенные остановленными процессами сервера."""
+    orphaned = job_store.fail_orphaned("Сервер был остановлен во время выполнения задачи")
+    if orphaned:
+        _invalidate_jobs_cache()
+        logger.warning(f"Задачи прерваны остановкой сервера: {', '.join(orphaned)}")
 
 
 # Маршруты API
 @app.get("/")
 async def root():
     """Корневой маршрут."""
-    return {"message": "DocParser API", "version": "0.1.0"}
+    return {
+        "message": "DocParser API",
+        "version": "0.1.0",
+        "queued_jobs": _queued_jobs,
+        "max_parallel_jobs": MAX_PARALLEL_JOBS
+    }
 
 
 @app.post("/parse", response_model=ParsingJob)
@@ -221,10 +432,12 @@ async def parse_url(request: ParsingRequest, background_tasks: BackgroundTasks):
     # Создаем ID задачи
     job_id = str(uuid.uuid4())
     
-    # Получаем конфигурацию
-    config = DEFAULT_CONFIG.copy()
-    if request.config:
-        config.update(request.config.dict(exclude_unset=True))
+    # Получаем конфигурацию: копия настроек по умолчанию и поля, заданные
+    # клиентом (берутся напрямую, без повторного обхода модели в dict()),
+    # собираются одним литералом
+    parser_config = request.config
+    overlay = {name: getattr(parser_config, name) for name in parser_config.__fields_set__} if parser_config else {}
+    config = {**DEFAULT_CONFIG, **overlay}
     
     # Создаем задачу
     job = ParsingJob(
@@ -232,7 +445,12 @@ async def parse_url(request: ParsingRequest, background_tasks: BackgroundTasks):
         url=str(request.url),
         status="pending"
     )
-    parsing_jobs[job_id] = job
+    evicted = add_job(job)
+    
+    # Файлы вытесненных задач удаляются в фоне (синхронные задачи
+    # выполняются в пуле потоков)
+    for old_job in evicted:
+        background_tasks.add_task(remove_job_files, old_job.job_id, old_job.result_file)
     
     # Запускаем задачу в фоне
     background_tasks.add_task(run_parsing_job, job_id, str(request.url), config)
@@ -241,7 +459,9 @@ async def parse_url(request: ParsingRequest, background_tasks: BackgroundTasks):
     return job
 
 
-@app.get("/jobs/{job_id}", response_model=ParsingJob)
+# Схема ответа только документируется: повторная валидация модели при
+# частом опросе статуса не нужна
+@app.get("/jobs/{job_id}", responses={200: {"model": ParsingJob}})
 async def get_job(job_id: str):
     """
     Получает информацию о задаче.
@@ -252,10 +472,11 @@ async def get_job(job_id: str):
     Returns:
         ParsingJob: Информация о задаче
     """
-    if job_id not in parsing_jobs:
+    job = find_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Задача не найдена")
     
-    return parsing_jobs[job_id]
+    return job.dict()
 
 
 @app.get("/jobs")
@@ -263,38 +484,63 @@ async def list_jobs():
     """
     Получает список всех задач.
     
+    Список берется из общего хранилища (задачи всех процессов сервера).
+    JSON строится один раз и переиспользуется, пока задачи не меняются.
+    
     Returns:
-        list: Список задач
+        Response: JSON-список задач
     """
-    return list(parsing_jobs.values())
+    global _jobs_cache_json, _jobs_cache_version
+    version = job_store.data_version()
+    if _jobs_cache_json is None or version != _jobs_cache_version:
+        _jobs_cache_json = json_dumps_bytes(job_store.list())
+        _jobs_cache_version = version
+    return Response(content=_jobs_cache_json, media_type="application/json")
 
 
 @app.get("/jobs/{job_id}/download")
-async def download_result(job_id: str):
+async def download_result(job_id: str, request: Request):
     """
     Скачивает результат задачи.
     
+    Файл отдается с ETag (задача, время изменения и размер файла); повторный
+    запрос с совпадающим If-None-Match получает 304 без тела.
+    
     Args:
         job_id: Идентификатор задачи
+        request: HTTP-запрос
         
     Returns:
         FileResponse: Файл с результатом
     """
-    if job_id not in parsing_jobs:
+    job = find_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Задача не найдена")
     
-    job = parsing_jobs[job_id]
-    
     if job.status != "completed":
         raise HTTPException(status_code=400, detail=f"Задача не завершена. Текущий статус: {job.status}")
     
-    if not job.result_file or not os.path.exists(job.result_file):
+    if not job.result_file:
+        raise HTTPException(status_code=404, detail="Файл результата не найден")
+    
+    # Один stat (вне event loop) и для проверки файла, и для ответа:
+    # FileResponse получает его готовым и не обращается к ФС повторно
+    loop = asyncio.get_running_loop()
+    try:
+        stat_result = await loop.run_in_executor(None, os.stat, job.result_file)
+    except OSError:
         raise HTTPException(status_code=404, detail="Файл результата не найден")
     
+    etag = f'"{job_id}-{stat_result.st_mtime_ns}-{stat_result.st_size}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    
     return FileResponse(
         path=job.result_file,
         filename=os.path.basename(job.result_file),
-        media_type="application/octet-stream"
+        media_type="application/octet-stream",
+        stat_result=stat_result,
+        headers={"ETag": etag}
     )
 
 
@@ -309,26 +555,18 @@ async def delete_job(job_id: str):
     Returns:
         dict: Статус операции
     """
-    if job_id not in parsing_jobs:
+    job = find_job(job_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Задача не найдена")
     
-    # Удаляем файлы результатов
-    job = parsing_jobs[job_id]
-    if job.result_file and os.path.exists(job.result_file):
-        if os.path.isdir(job.result_file):
-            import shutil
-            shutil.rmtree(job.result_file, ignore_errors=True)
-        else:
-            os.remove(job.result_file)
-    
-    # Удаляем директорию задачи
-    job_dir = os.path.join(TEMP_DIR, job_id)
-    if os.path.exists(job_dir):
-        import shutil
-        shutil.rmtree(job_dir, ignore_errors=True)
-    
     # Удаляем задачу из хранилища
-    del parsing_jobs[job_id]
+    parsing_jobs.pop(job_id, None)
+    job_store.delete(job_id)
+    _invalidate_jobs_cache()
+    
+    # Удаляем файлы результатов в пуле потоков, не блокируя event loop
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, remove_job_files, job_id, job.result_file)
     
     logger.info(f"Удалена задача {job_id}")
     return {"status": "ok", "message": f"Задача {job_id} удалена"}
@@ -342,7 +580,13 @@ def start_server(host: str = "0.0.0.0", port: int = 8000):
         host: Хост для привязки
         port: Порт для привязки
     """
-    uvicorn.run(app, host=host, port=port)
+    # uvloop и httptools (uvicorn[standard]) выбираются автоматически, если
+    # установлены; иначе используются asyncio и h11. Журнал запросов отключен.
+    try:
+        uvicorn.run(app, host=host, port=port, loop="auto", http="auto", log_level="warning")
+    finally:
+        if _crawl_pool is not None:
+            _crawl_pool.shutdown(cancel_futures=True)
 
 
 if __name__ == "__main__":
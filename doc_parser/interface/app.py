@@ -6,70 +6,232 @@ GUI-приложение для парсера документации на о
 """
 
 import os
+import re
 import sys
+import asyncio
+import logging
 import threading
+from collections import deque
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QLabel, QLineEdit, QPushButton, QComboBox, QSpinBox, QDoubleSpinBox,
-    QCheckBox, QTextEdit, QFileDialog, QProgressBar, QGroupBox, QTabWidget,
+    QCheckBox, QPlainTextEdit, QFileDialog, QProgressBar, QGroupBox, QTabWidget,
     QMessageBox, QStatusBar
 )
-from PySide6.QtCore import Qt, Signal, QThread
-from PySide6.QtGui import QTextCursor
+from PySide6.QtCore import Qt, Signal, QThread, QTimer, QUrl, QSettings
+from PySide6.QtGui import QDesktopServices
 
 from doc_parser.config import DEFAULT_CONFIG
-from doc_parser.core.parser import DocumentationParser
-from doc_parser.exporters.text_formats import MarkdownExporter, JsonExporter, CsvExporter
-from doc_parser.exporters.ai_formats import ClaudeExporter
-from doc_parser.exporters.web_formats import HtmlExporter, ZipExporter
+from doc_parser.exporters.dispatch import export_results, get_exporter
+
+
+# Период выгрузки накопленных сообщений лога в окно (мс)
+LOG_FLUSH_INTERVAL = 100
+# Сколько последних строк лога хранит окно
+LOG_MAX_LINES = 5000
+# Сколько сообщений лога выводится за одну выгрузку; более ранние
+# заменяются строкой с числом пропущенных
+LOG_MAX_BATCH = 500
+
+
+class LogBuffer(logging.Handler):
+    """
+    Накапливает сообщения лога парсера для вывода в GUI.
+    
+    Сообщения не передаются в поток GUI по одному: окно периодически
+    забирает их пачкой (drain) и добавляет в лог одним вызовом. Между
+    выгрузками хранится не более max_messages последних сообщений, поэтому
+    объем вывода не растет со скоростью обхода.
+    """
+    
+    def __init__(self, max_messages=LOG_MAX_BATCH):
+        """
+        Инициализация буфера.
+        
+        Args:
+            max_messages: Сколько последних сообщений хранить между выгрузками
+        """
+        super().__init__()
+        self._messages = deque(maxlen=max_messages)
+        self._dropped = 0
+        self._messages_lock = threading.Lock()
+    
+    def emit(self, record):
+        """Добавляет сообщение в буфер."""
+        message = self.format(record)
+        with self._messages_lock:
+            if len(self._messages) == self._messages.maxlen:
+                self._dropped += 1
+            self._messages.append(message)
+    
+    def drain(self):
+        """
+        Забирает накопленные сообщения.
+        
+        Returns:
+            list: Сообщения в порядке поступления (первым - число пропущенных,
+                если буфер переполнялся)
+        """
+        with self._messages_lock:
+            messages = list(self._messages)
+            self._messages.clear()
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            messages.insert(0, f"... (пропущено сообщений: {dropped})")
+        return messages
 
 
 class ParserWorker(QThread):
     """
     Рабочий поток для выполнения парсинга в фоне.
+    
+    После обхода поток сам экспортирует результаты в формат из конфигурации,
+    чтобы сериализация не блокировала окно. Результаты передаются в сигналах
+    как object - по ссылке, без преобразования словаря в QVariantMap.
     """
     progress_signal = Signal(str)
-    finished_signal = Signal(dict)
+    # Результаты и текст ошибки автоматического экспорта (None при успехе)
+    finished_signal = Signal(object, object)
     error_signal = Signal(str)
+    cancelled_signal = Signal(object)
     
-    def __init__(self, url, config):
+    def __init__(self, url, config, exporters=None):
         """
         Инициализация потока.
         
         Args:
             url: URL для парсинга
             config: Конфигурация парсера
+            exporters: Кэш экземпляров экспортеров окна
         """
         super().__init__()
         self.url = url
         self.config = config
+        self.exporters = exporters
+        
+        # Сообщения лога парсера забирает окно (см. DocParserGUI.flush_logs)
+        self.log_buffer = LogBuffer()
+        
+        # Цикл событий потока и задача обхода (для отмены из потока GUI)
+        self._loop = None
+        self._task = None
+        self._cancel_requested = False
+    
+    def cancel(self):
+        """
+        Запрашивает остановку обхода.
         
+        Задача обхода отменяется в цикле событий потока: воркеры завершаются,
+        сессия и соединения закрываются штатно, после чего отправляется
+        cancelled_signal с уже обработанными страницами.
+        """
+        self._cancel_requested = True
+        loop, task = self._loop, self._task
+        if loop is not None and task is not None:
+            try:
+                loop.call_soon_threadsafe(task.cancel)
+            except RuntimeError:
+                # Цикл уже закрыт - обход завершился сам
+                pass
+    
     def run(self):
         """Запуск парсинга в отдельном потоке."""
+        loop = asyncio.new_event_loop()
+        self._loop = loop
+        parser = None
         try:
-            # Создаем объект парсера
+            # Создаем объект парсера (модуль парсера с aiohttp загружается
+            # здесь, а не при запуске окна)
             self.progress_signal.emit("Инициализация парсера...")
+            from doc_parser.core.parser import DocumentationParser
             parser = DocumentationParser(self.config)
             
-            # Устанавливаем хук для логгера
-            old_info = parser.logger.info
-            def new_info(msg):
-                self.progress_signal.emit(msg)
-                old_info(msg)
-            parser.logger.info = new_info
+            # Сообщения лога собираются в буфер и выводятся в окно пачками
+            parser.logger.addHandler(self.log_buffer)
             
-            # Запускаем обход
+            # Запускаем асинхронный обход в цикле событий этого потока
             self.progress_signal.emit(f"Начало обхода URL: {self.url}")
-            results = parser.crawl(self.url)
+            self._task = loop.create_task(parser.crawl_async(self.url))
+            if self._cancel_requested:
+                self._task.cancel()
+            
+            try:
+                results = loop.run_until_complete(self._task)
+            except asyncio.CancelledError:
+                self.progress_signal.emit(f"Парсинг прерван пользователем. Обработано URL: {len(parser.results)}")
+                self.cancelled_signal.emit(parser.results)
+                return
             
-            # Сигнализируем о завершении
             self.progress_signal.emit(f"Обход завершен. Обработано URL: {len(results)}")
-            self.finished_signal.emit(results)
+            
+            # Сразу экспортируем результаты в этом же потоке
+            export_error = None
+            try:
+                export_results(results, self.config['output_dir'], self.config['output_format'],
+                               self.config, self.progress_signal.emit, self.exporters)
+            except Exception as e:
+                import traceback
+                export_error = f"Ошибка при экспорте: {e}\n{traceback.format_exc()}"
+            
+            # Сигнализируем о завершении
+            self.finished_signal.emit(results, export_error)
             
         except Exception as e:
             import traceback
             error_text = f"Ошибка: {e}\n{traceback.format_exc()}"
             self.error_signal.emit(error_text)
+        finally:
+            if parser is not None:
+                parser.logger.removeHandler(self.log_buffer)
+            
+            # Завершаем цикл так же, как asyncio.run
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+            self._loop = None
+            loop.close()
+
+
+class ExportWorker(QThread):
+    """
+    Рабочий поток для экспорта результатов с вкладки экспорта.
+    
+    Запись файлов не выполняется в потоке GUI, поэтому окно не замирает
+    на больших результатах.
+    """
+    progress_signal = Signal(str)
+    # Директория и формат экспорта
+    finished_signal = Signal(str, str)
+    error_signal = Signal(str)
+    
+    def __init__(self, results, output_dir, output_format, config, exporters=None):
+        """
+        Инициализация потока.
+        
+        Args:
+            results: Данные для экспорта
+            output_dir: Директория вывода
+            output_format: Формат вывода
+            config: Настройки экспортеров
+            exporters: Кэш экземпляров экспортеров окна
+        """
+        super().__init__()
+        self.results = results
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.config = config
+        self.exporters = exporters
+    
+    def run(self):
+        """Запуск экспорта в отдельном потоке."""
+        try:
+            # Создаем директорию, если не существует
+            os.makedirs(self.output_dir, exist_ok=True)
+            export_results(self.results, self.output_dir, self.output_format,
+                           self.config, self.progress_signal.emit, self.exporters)
+            self.finished_signal.emit(self.output_dir, self.output_format)
+        except Exception as e:
+            import traceback
+            self.error_signal.emit(f"Ошибка при экспорте: {e}\n{traceback.format_exc()}")
 
 
 class DocParserGUI(QMainWindow):
@@ -85,12 +247,30 @@ class DocParserGUI(QMainWindow):
         self.setWindowTitle("DocParser - Парсер документации")
         self.setGeometry(100, 100, 800, 600)
         
+        # Значения полей с прошлого запуска
+        self._settings = QSettings("DocParser", "GUI")
+        
         # Инициализация UI
         self.setup_ui()
         
         # Данные
         self.results = None
         self.parser_worker = None
+        self.export_worker = None
+        
+        # Экспортеры создаются один раз на формат и переиспользуются при
+        # повторных экспортах (сохраняются их кэши текста и HTTP-сессии)
+        self._exporters = {}
+        # Уже выполненные экспорты текущих результатов: (директория, формат)
+        self._exports_done = set()
+        self.format_combo.currentTextChanged.connect(self.prepare_exporter)
+        self.export_format_combo.currentTextChanged.connect(self.prepare_exporter)
+        self.save_assets_checkbox.toggled.connect(self._exporters.clear)
+        
+        # Периодический вывод накопленных сообщений лога парсера
+        self.log_timer = QTimer(self)
+        self.log_timer.setInterval(LOG_FLUSH_INTERVAL)
+        self.log_timer.timeout.connect(self.flush_logs)
         
     def setup_ui(self):
         """Настройка пользовательского интерфейса."""
@@ -127,6 +307,7 @@ class DocParserGUI(QMainWindow):
         url_label = QLabel("URL:")
         self.url_input = QLineEdit()
         self.url_input.setPlaceholderText("https://docs.example.com")
+        self.url_input.setText(self._setting('url', ''))
         url_layout.addWidget(url_label)
         url_layout.addWidget(self.url_input)
         
@@ -142,7 +323,7 @@ class DocParserGUI(QMainWindow):
         self.depth_spinner = QSpinBox()
         self.depth_spinner.setMinimum(1)
         self.depth_spinner.setMaximum(10)
-        self.depth_spinner.setValue(DEFAULT_CONFIG['max_depth'])
+        self.depth_spinner.setValue(self._setting('max_depth', DEFAULT_CONFIG['max_depth']))
         depth_layout.addWidget(depth_label)
         depth_layout.addWidget(self.depth_spinner)
         depth_layout.addStretch()
@@ -153,7 +334,7 @@ class DocParserGUI(QMainWindow):
         self.delay_spinner = QDoubleSpinBox()
         self.delay_spinner.setMinimum(0.1)
         self.delay_spinner.setMaximum(10.0)
-        self.delay_spinner.setValue(DEFAULT_CONFIG['delay'])
+        self.delay_spinner.setValue(self._setting('delay', DEFAULT_CONFIG['delay']))
         self.delay_spinner.setSingleStep(0.1)
         delay_layout.addWidget(delay_label)
         delay_layout.addWidget(self.delay_spinner)
@@ -165,17 +346,28 @@ class DocParserGUI(QMainWindow):
         self.timeout_spinner = QSpinBox()
         self.timeout_spinner.setMinimum(5)
         self.timeout_spinner.setMaximum(120)
-        self.timeout_spinner.setValue(DEFAULT_CONFIG['timeout'])
+        self.timeout_spinner.setValue(self._setting('timeout', DEFAULT_CONFIG['timeout']))
         timeout_layout.addWidget(timeout_label)
         timeout_layout.addWidget(self.timeout_spinner)
         timeout_layout.addStretch()
         
+        # Количество одновременных запросов
+        concurrency_layout = QHBoxLayout()
+        concurrency_label = QLabel("Параллельных запросов:")
+        self.concurrency_spinner = QSpinBox()
+        self.concurrency_spinner.setMinimum(1)
+        self.concurrency_spinner.setMaximum(256)
+        self.concurrency_spinner.setValue(self._setting('concurrency', DEFAULT_CONFIG['concurrency']))
+        concurrency_layout.addWidget(concurrency_label)
+        concurrency_layout.addWidget(self.concurrency_spinner)
+        concurrency_layout.addStretch()
+        
         # Флаги
         flags_layout = QHBoxLayout()
         self.follow_links_checkbox = QCheckBox("Следовать по ссылкам")
-        self.follow_links_checkbox.setChecked(DEFAULT_CONFIG['follow_links'])
+        self.follow_links_checkbox.setChecked(self._setting('follow_links', DEFAULT_CONFIG['follow_links']))
         self.save_assets_checkbox = QCheckBox("Сохранять ассеты")
-        self.save_assets_checkbox.setChecked(DEFAULT_CONFIG['save_assets'])
+        self.save_assets_checkbox.setChecked(self._setting('save_assets', DEFAULT_CONFIG['save_assets']))
         flags_layout.addWidget(self.follow_links_checkbox)
         flags_layout.addWidget(self.save_assets_checkbox)
         flags_layout.addStretch()
@@ -188,6 +380,7 @@ class DocParserGUI(QMainWindow):
         include_label = QLabel("Включать URL:")
         self.include_input = QLineEdit()
         self.include_input.setPlaceholderText("Regex паттерн (опционально)")
+        self.include_input.setText(self._setting('include_pattern', ''))
         include_layout.addWidget(include_label)
         include_layout.addWidget(self.include_input)
         
@@ -195,6 +388,7 @@ class DocParserGUI(QMainWindow):
         exclude_label = QLabel("Исключать URL:")
         self.exclude_input = QLineEdit()
         self.exclude_input.setPlaceholderText("Regex паттерн (опционально)")
+        self.exclude_input.setText(self._setting('exclude_pattern', ''))
         exclude_layout.addWidget(exclude_label)
         exclude_layout.addWidget(self.exclude_input)
         
@@ -205,6 +399,7 @@ class DocParserGUI(QMainWindow):
         settings_layout.addLayout(depth_layout)
         settings_layout.addLayout(delay_layout)
         settings_layout.addLayout(timeout_layout)
+        settings_layout.addLayout(concurrency_layout)
         settings_layout.addLayout(flags_layout)
         settings_layout.addWidget(filters_group)
         
@@ -217,11 +412,11 @@ class DocParserGUI(QMainWindow):
         format_label = QLabel("Формат:")
         self.format_combo = QComboBox()
         self.format_combo.addItems(["markdown", "json", "csv", "claude", "html", "zip"])
-        self.format_combo.setCurrentText(DEFAULT_CONFIG['output_format'])
+        self.format_combo.setCurrentText(self._setting('output_format', DEFAULT_CONFIG['output_format']))
         
         output_dir_label = QLabel("Директория:")
         self.output_dir_input = QLineEdit()
-        self.output_dir_input.setText(DEFAULT_CONFIG['output_dir'])
+        self.output_dir_input.setText(self._setting('output_dir', DEFAULT_CONFIG['output_dir']))
         self.output_dir_button = QPushButton("...")
         self.output_dir_button.clicked.connect(self.choose_output_dir)
         
@@ -293,8 +488,11 @@ class DocParserGUI(QMainWindow):
         export_layout.addStretch()
         
         # === Вкладка логов ===
-        self.logs_text = QTextEdit()
+        # QPlainTextEdit добавляет строки без перестроения всего документа,
+        # а старые строки сверх лимита удаляются
+        self.logs_text = QPlainTextEdit()
         self.logs_text.setReadOnly(True)
+        self.logs_text.setMaximumBlockCount(LOG_MAX_LINES)
         logs_layout.addWidget(self.logs_text)
         
         # Добавляем статус бар
@@ -302,6 +500,36 @@ class DocParserGUI(QMainWindow):
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("Готов к работе")
     
+    def _setting(self, key, default):
+        """
+        Читает значение поля, сохраненное при прошлом запуске парсинга.
+        
+        Args:
+            key: Имя настройки
+            default: Значение по умолчанию (задает и тип значения)
+            
+        Returns:
+            Сохраненное значение или default
+        """
+        return self._settings.value(key, default, type=type(default))
+    
+    def save_settings(self, url, config, include_pattern, exclude_pattern):
+        """
+        Сохраняет значения полей для следующего запуска приложения.
+        
+        Args:
+            url: URL для парсинга
+            config: Конфигурация парсера из полей окна
+            include_pattern: Шаблон включаемых URL
+            exclude_pattern: Шаблон исключаемых URL
+        """
+        self._settings.setValue('url', url)
+        for key in ('max_depth', 'delay', 'timeout', 'concurrency', 'follow_links',
+                    'save_assets', 'output_format', 'output_dir'):
+            self._settings.setValue(key, config[key])
+        self._settings.setValue('include_pattern', include_pattern)
+        self._settings.setValue('exclude_pattern', exclude_pattern)
+    
     def choose_output_dir(self):
         """Выбор директории для результатов."""
         directory = QFileDialog.getExistingDirectory(
@@ -332,61 +560,129 @@ class DocParserGUI(QMainWindow):
             'max_depth': self.depth_spinner.value(),
             'delay': self.delay_spinner.value(),
             'timeout': self.timeout_spinner.value(),
+            'concurrency': self.concurrency_spinner.value(),
             'follow_links': self.follow_links_checkbox.isChecked(),
             'save_assets': self.save_assets_checkbox.isChecked(),
             'output_format': self.format_combo.currentText(),
             'output_dir': self.output_dir_input.text(),
         }
         
-        # Добавляем фильтры, если заданы
+        # Добавляем фильтры, если заданы. Шаблоны проверяются здесь, до запуска
+        # потока; парсер компилирует их один раз (в базу Hyperscan, если он
+        # установлен), поэтому передаются исходные строки
         include_pattern = self.include_input.text().strip()
+        exclude_pattern = self.exclude_input.text().strip()
+        for pattern in (include_pattern, exclude_pattern):
+            if not pattern:
+                continue
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                QMessageBox.warning(self, "Предупреждение", f"Некорректное регулярное выражение '{pattern}': {e}")
+                return
+        
         if include_pattern:
             config['include_patterns'] = [include_pattern]
         
-        exclude_pattern = self.exclude_input.text().strip()
         if exclude_pattern:
             config['exclude_patterns'] = [exclude_pattern]
         
-        # Создаем выходную директорию
-        os.makedirs(config['output_dir'], exist_ok=True)
+        self.save_settings(url, config, include_pattern, exclude_pattern)
         
         # Обновляем UI
         self.progress_bar.show()
         self.start_button.setEnabled(False)
         self.stop_button.setEnabled(True)
+        # Экспортеры заняты потоком парсинга до его завершения
+        self.export_button.setEnabled(False)
+        self._exports_done.clear()
         self.logs_text.clear()
         self.statusBar.showMessage("Выполняется парсинг...")
         
         # Запускаем парсинг в отдельном потоке
-        self.parser_worker = ParserWorker(url, config)
-        self.parser_worker.progress_signal.connect(self.update_progress)
+        self.parser_worker = ParserWorker(url, config, self._exporters)
+        self.parser_worker.progress_signal.connect(self.worker_progress)
         self.parser_worker.finished_signal.connect(self.parsing_finished)
         self.parser_worker.error_signal.connect(self.parsing_error)
+        self.parser_worker.cancelled_signal.connect(self.parsing_cancelled)
         self.parser_worker.start()
+        self.log_timer.start()
+    
+    def exporter_config(self):
+        """
+        Настройки экспортеров из текущего состояния окна.
+        
+        Returns:
+            dict: Настройки экспортеров
+        """
+        return {'save_assets': self.save_assets_checkbox.isChecked()}
+    
+    def prepare_exporter(self, output_format):
+        """
+        Заранее создает экспортер выбранного формата.
+        
+        Args:
+            output_format: Формат вывода
+        """
+        get_exporter(output_format, self.exporter_config(), self._exporters)
+    
+    def flush_logs(self):
+        """Выводит накопленные сообщения лога парсера одним добавлением."""
+        if self.parser_worker is None:
+            return
+        messages = self.parser_worker.log_buffer.drain()
+        if messages:
+            self.update_progress("\n".join(messages))
+    
+    def worker_progress(self, message):
+        """Выводит сообщение потока парсинга после уже накопленных сообщений лога."""
+        self.flush_logs()
+        self.update_progress(message)
+    
+    def _stop_log_timer(self):
+        """Останавливает вывод лога, выведя оставшиеся сообщения."""
+        self.log_timer.stop()
+        self.flush_logs()
     
     def stop_parsing(self):
         """Остановка процесса парсинга."""
         if self.parser_worker and self.parser_worker.isRunning():
-            self.parser_worker.terminate()
-            self.parser_worker = None
-            self.update_progress("Парсинг прерван пользователем.")
-            self.statusBar.showMessage("Парсинг прерван")
-            
-            # Обновляем UI
-            self.progress_bar.hide()
-            self.start_button.setEnabled(True)
+            # Обход останавливается штатно; UI обновится по cancelled_signal
+            self.parser_worker.cancel()
             self.stop_button.setEnabled(False)
+            self.statusBar.showMessage("Остановка парсинга...")
+    
+    def parsing_cancelled(self, results):
+        """Обработка остановки парсинга пользователем."""
+        self._stop_log_timer()
+        self.parser_worker = None
+        self.statusBar.showMessage("Парсинг прерван")
+        
+        # Обновляем UI
+        self.progress_bar.hide()
+        self.start_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        
+        # Уже обработанные страницы доступны для экспорта
+        if results:
+            self.results = results
+            self.export_button.setEnabled(True)
+            self.export_info_label.setText(f"Парсинг прерван. Обработано URL: {len(results)}.")
     
     def update_progress(self, message):
         """Обновление статуса парсинга."""
-        self.logs_text.append(message)
-        # Прокрутка в конец
-        cursor = self.logs_text.textCursor()
-        cursor.movePosition(QTextCursor.End)  # Используем константу из QTextCursor
-        self.logs_text.setTextCursor(cursor)
-    
-    def parsing_finished(self, results):
-        """Обработка завершения парсинга."""
+        # Если лог прокручен до конца, он остается прокрученным до конца
+        self.logs_text.appendPlainText(message)
+    
+    def parsing_finished(self, results, export_error):
+        """
+        Обработка завершения парсинга.
+        
+        Args:
+            results: Результаты парсинга
+            export_error: Текст ошибки автоматического экспорта или None
+        """
+        self._stop_log_timer()
         self.results = results
         
         # Обновляем UI
@@ -405,18 +701,21 @@ class DocParserGUI(QMainWindow):
         
         self.statusBar.showMessage(f"Парсинг завершен. Обработано URL: {num_urls}")
         
-        # Сразу экспортируем результаты
-        output_dir = self.output_dir_input.text()
-        output_format = self.format_combo.currentText()
-        self.export_specific_format(results, output_dir, output_format)
+        # Результаты уже экспортированы потоком парсинга
+        if export_error:
+            self.show_export_error(export_error)
+        else:
+            self.show_export_done(self.output_dir_input.text(), self.format_combo.currentText())
     
     def parsing_error(self, error_text):
         """Обработка ошибки парсинга."""
+        self._stop_log_timer()
         self.progress_bar.hide()
         self.start_button.setEnabled(True)
         self.stop_button.setEnabled(False)
+        self.export_button.setEnabled(bool(self.results))
         
-        self.logs_text.append(f"ОШИБКА: {error_text}")
+        self.update_progress(f"ОШИБКА: {error_text}")
         self.statusBar.showMessage("Ошибка парсинга")
         
         # Показываем сообщение об ошибке
@@ -436,8 +735,15 @@ class DocParserGUI(QMainWindow):
             QMessageBox.warning(self, "Предупреждение", "Выберите директорию для экспорта")
             return
         
-        # Создаем директорию, если не существует
-        os.makedirs(output_dir, exist_ok=True)
+        # Те же результаты в тот же формат и директорию уже экспортированы
+        if (os.path.abspath(output_dir), output_format) in self._exports_done:
+            answer = QMessageBox.question(
+                self,
+                "Экспорт",
+                f"Результаты уже экспортированы в формате {output_format} в эту директорию. Повторить?"
+            )
+            if answer != QMessageBox.Yes:
+                return
         
         # Экспортируем в выбранный формат
         self.export_specific_format(self.results, output_dir, output_format)
@@ -451,75 +757,54 @@ class DocParserGUI(QMainWindow):
             output_dir: Директория вывода
             output_format: Формат вывода
         """
-        try:
-            if output_format == 'markdown':
-                exporter = MarkdownExporter()
-                saved_files = exporter.save_results(results, output_dir)
-                self.update_progress(f"Результаты сохранены в формате Markdown. Файлов: {len(saved_files)}")
-                
-            elif output_format == 'json':
-                exporter = JsonExporter()
-                output_path = os.path.join(output_dir, 'results.json')
-                saved_file = exporter.save_results(results, output_path)
-                self.update_progress(f"Результаты сохранены в JSON: {saved_file}")
-                
-            elif output_format == 'csv':
-                exporter = CsvExporter()
-                output_path = os.path.join(output_dir, 'results.csv')
-                saved_file = exporter.export_results(results, output_path)
-                self.update_progress(f"Результаты сохранены в CSV: {saved_file}")
-                
-                # Также сохраняем ссылки
-                links_path = os.path.join(output_dir, 'links.csv')
-                links_file = exporter.export_links(results, links_path)
-                self.update_progress(f"Ссылки сохранены в: {links_file}")
-                
-            elif output_format == 'claude':
-                exporter = ClaudeExporter()
-                output_path = os.path.join(output_dir, 'claude.md')
-                saved_file = exporter.export_for_claude(results, output_path)
-                self.update_progress(f"Результаты сохранены в формате для Claude: {saved_file}")
-                
-                # Также сохраняем чанки
-                chunked_dir = os.path.join(output_dir, 'claude_chunks')
-                chunk_files = exporter.export_chunked(results, chunked_dir)
-                self.update_progress(f"Чанки сохранены в директории: {chunked_dir}")
-                
-            elif output_format == 'html':
-                exporter = HtmlExporter({'save_assets': self.save_assets_checkbox.isChecked()})
-                saved_files = exporter.save_results(results, output_dir)
-                index_path = os.path.join(output_dir, 'index.html')
-                self.update_progress(f"Результаты сохранены в HTML. Индексный файл: {index_path}")
-                
-            elif output_format == 'zip':
-                exporter = ZipExporter({'save_assets': self.save_assets_checkbox.isChecked()})
-                output_path = os.path.join(output_dir, 'documentation.zip')
-                saved_file = exporter.export_to_zip(results, output_path)
-                self.update_progress(f"Результаты сохранены в ZIP-архив: {saved_file}")
-                
-            else:
-                self.update_progress(f"Неизвестный формат: {output_format}")
-                return
-            
-            # Показываем сообщение об успехе
-            QMessageBox.information(
-                self, 
-                "Экспорт завершен", 
-                f"Результаты успешно экспортированы в формате {output_format}."
-            )
-            
-            # Открываем директорию с результатами
-            if sys.platform == 'win32':
-                os.startfile(output_dir)
-            else:
-                import subprocess
-                subprocess.Popen(['xdg-open', output_dir])
-            
-        except Exception as e:
-            import traceback
-            error_text = f"Ошибка при экспорте: {e}\n{traceback.format_exc()}"
-            self.update_progress(f"ОШИБКА: {error_text}")
-            QMessageBox.critical(self, "Ошибка экспорта", error_text)
+        # Запись файлов выполняется в отдельном потоке
+        self.export_button.setEnabled(False)
+        self.statusBar.showMessage("Выполняется экспорт...")
+        
+        self.export_worker = ExportWorker(results, output_dir, output_format,
+                                          self.exporter_config(), self._exporters)
+        self.export_worker.progress_signal.connect(self.update_progress)
+        self.export_worker.finished_signal.connect(self.show_export_done)
+        self.export_worker.error_signal.connect(self.show_export_error)
+        self.export_worker.finished.connect(self.export_worker_finished)
+        self.export_worker.start()
+    
+    def export_worker_finished(self):
+        """Восстанавливает UI после завершения потока экспорта."""
+        self.export_worker = None
+        self.export_button.setEnabled(True)
+        self.statusBar.showMessage("Готов к работе")
+    
+    def show_export_done(self, output_dir, output_format):
+        """
+        Сообщает об успешном экспорте и открывает директорию с результатами.
+        
+        Args:
+            output_dir: Директория вывода
+            output_format: Формат вывода
+        """
+        self._exports_done.add((os.path.abspath(output_dir), output_format))
+        
+        # Показываем сообщение об успехе
+        QMessageBox.information(
+            self, 
+            "Экспорт завершен", 
+            f"Результаты успешно экспортированы в формате {output_format}."
+        )
+        
+        # Открываем директорию с результатами; файловый менеджер запускается
+        # средствами окружения, без ожидания в потоке GUI
+        QDesktopServices.openUrl(QUrl.fromLocalFile(os.path.abspath(output_dir)))
+    
+    def show_export_error(self, error_text):
+        """
+        Сообщает об ошибке экспорта.
+        
+        Args:
+            error_text: Текст ошибки
+        """
+        self.update_progress(f"ОШИБКА: {error_text}")
+        QMessageBox.critical(self, "Ошибка экспорта", error_text)
 
 
 def run_app():
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Хранилище задач API в SQLite, общее для нескольких процессов сервера.
+"""
+
+import os
+import stat
+import time
+import sqlite3
+import tempfile
+import threading
+
+from doc_parser.utils.helpers import json_dumps_bytes, json_loads
+
+# Статусы завершенных задач: только такие задачи удаляются из хранилища
+FINISHED_STATUSES = ('completed', 'error', 'cancelled')
+
+# Столбцы, добавленные после первой версии хранилища
+_EXTRA_COLUMNS = (('status', 'TEXT'), ('owner', 'INTEGER'), ('summary', 'BLOB'))
+
+
+def _process_alive(pid):
+    """
+    Проверяет, существует ли процесс.
+    
+    Args:
+        pid: Идентификатор процесса
+        
+    Returns:
+        bool: False, только если процесса точно нет
+    """
+    if os.name != 'posix':
+        # Вне POSIX os.kill(pid, 0) завершает процесс - не проверяем
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def private_state_dir(name):
+    """
+    Создает (или проверяет) директорию состояния сервера во временной
+    директории, доступную только текущему пользователю.
+    
+    Из хранилища и снимков результатов читает сервер, поэтому директорию,
+    созданную другим пользователем, использовать нельзя.
+    
+    Args:
+        name: Имя директории
+        
+    Returns:
+        str: Путь к директории
+        
+    Raises:
+        PermissionError: Директория принадлежит другому пользователю
+            или не является директорией
+    """
+    if hasattr(os, 'getuid'):
+        name = f"{name}-{os.getuid()}"
+    path = os.path.join(tempfile.gettempdir(), name)
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    
+    if hasattr(os, 'getuid'):
+        st = os.lstat(path)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+            raise PermissionError(f"Директория состояния {path} принадлежит другому пользователю")
+        if st.st_mode & 0o077:
+            os.chmod(path, 0o700)
+    return path
+
+
+class JobStore:
+    """
+    Хранит задачи парсинга в файле SQLite.
+    
+    Задачу, созданную в одном процессе сервера (например, в одном из воркеров
+    uvicorn/gunicorn), видят все остальные; записи переживают перезапуск.
+    Изменения других процессов определяются по PRAGMA data_version, что
+    позволяет кэшировать список задач до следующего изменения.
+    """
+    
+    def __init__(self, path, key='job_id'):
+        """
+        Открывает (или создает) файл хранилища.
+        
+        Args:
+            path: Путь к файлу SQLite
+            key: Поле задачи с ее идентификатором
+        """
+        self.path = path
+        self.key = key
+        
+        # Обращения идут из event loop и пула потоков, поэтому соединение
+        # общее, а доступ к нему сериализуется блокировкой
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS jobs('
+            'job_id TEXT PRIMARY KEY, created REAL, data BLOB, status TEXT, owner INTEGER, summary BLOB)'
+        )
+        self._migrate()
+        self._db.commit()
+    
+    def _migrate(self):
+        """Добавляет новые столбцы в хранилище, созданное прежней версией."""
+        columns = {row[1] for row in self._db.execute('PRAGMA table_info(jobs)')}
+        for name, column_type in _EXTRA_COLUMNS:
+            if name not in columns:
+                self._db.execute(f'ALTER TABLE jobs ADD COLUMN {name} {column_type}')
+        if 'status' in columns:
+            return
+        self._db.executemany(
+            'UPDATE jobs SET status=? WHERE job_id=?',
+            [(json_loads(data).get('status'), job_id)
+             for job_id, data in self._db.execute('SELECT job_id, data FROM jobs').fetchall()]
+        )
+    
+    def put(self, job, summary=None):
+        """
+        Сохраняет задачу (новую или измененную).
+        
+        Задача принадлежит сохранившему ее процессу (см. fail_orphaned).
+        
+        Args:
+            job: Словарь с полями задачи (должен содержать поле key)
+            summary: Краткое описание задачи для list_summaries (опционально)
+        """
+        summary = json_dumps_bytes(summary) if summary is not None else None
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO jobs(job_id, created, data, status, owner, summary) VALUES (?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(job_id) DO UPDATE SET data=excluded.data, status=excluded.status, '
+                'owner=excluded.owner, summary=excluded.summary',
+                (job[self.key], time.time(), json_dumps_bytes(job), job.get('status'), os.getpid(), summary)
+            )
+            self._db.commit()
+    
+    def get(self, job_id):
+        """
+        Загружает задачу.
+        
+        Args:
+            job_id: Идентификатор задачи
+        
+        Returns:
+            dict: Поля задачи или None, если задача не найдена
+        """
+        with self._lock:
+            row = self._db.execute('SELECT data FROM jobs WHERE job_id=?', (job_id,)).fetchone()
+        return json_loads(row[0]) if row else None
+    
+    def delete(self, *job_ids):
+        """
+        Удаляет задачи.
+        
+        Args:
+            *job_ids: Идентификаторы задач
+        """
+        with self._lock:
+            self._db.executemany('DELETE FROM jobs WHERE job_id=?', [(job_id,) for job_id in job_ids])
+            self._db.commit()
+    
+    def purge(self, max_age):
+        """
+        Удаляет завершенные задачи, созданные раньше max_age секунд назад.
+        
+        Выполняющиеся и ожидающие задачи не удаляются: иначе следующее
+        сохранение задачи вернуло бы ее в хранилище без файлов результатов.
+        
+        Args:
+            max_age: Время хранения задачи в секундах
+            
+        Returns:
+            list: Словари с полями удаленных задач
+        """
+        before = time.time() - max_age
+        where = f"created < ? AND status IN ({', '.join('?' * len(FINISHED_STATUSES))})"
+        params = (before, *FINISHED_STATUSES)
+        with self._lock:
+            rows = self._db.execute(f'SELECT data FROM jobs WHERE {where}', params).fetchall()
+            if rows:
+                self._db.execute(f'DELETE FROM jobs WHERE {where}', params)
+                self._db.commit()
+        return [json_loads(data) for data, in rows]
+    
+    def evict(self, max_count):
+        """
+        Удаляет самые старые завершенные задачи сверх max_count задач в хранилище.
+        
+        Args:
+            max_count: Сколько задач может храниться
+            
+        Returns:
+            list: Словари с полями удаленных задач
+        """
+        statuses = ', '.join('?' * len(FINISHED_STATUSES))
+        with self._lock:
+            excess = self._db.execute('SELECT COUNT(*) FROM jobs').fetchone()[0] - max_count
+            if excess <= 0:
+                return []
+            rows = self._db.execute(
+                f'SELECT job_id, data FROM jobs WHERE status IN ({statuses}) ORDER BY created LIMIT ?',
+                (*FINISHED_STATUSES, excess)
+            ).fetchall()
+            self._db.executemany('DELETE FROM jobs WHERE job_id=?', [(job_id,) for job_id, _ in rows])
+            self._db.commit()
+        return [json_loads(data) for _, data in rows]
+    
+    def fail_orphaned(self, error):
+        """
+        Помечает ошибкой незавершенные задачи, процесс которых уже не работает
+        (например, сервер был остановлен или упал во время обхода).
+        
+        Вызывается при запуске процесса: задачи с его же идентификатором
+        остались от прежнего процесса с тем же pid.
+        
+        Args:
+            error: Текст ошибки для таких задач
+            
+        Returns:
+            list: Идентификаторы помеченных задач
+        """
+        statuses = ', '.join('?' * len(FINISHED_STATUSES))
+        pid = os.getpid()
+        with self._lock:
+            rows = self._db.execute(
+                f'SELECT job_id, owner, data, summary FROM jobs WHERE status IS NULL OR status NOT IN ({statuses})',
+                FINISHED_STATUSES
+            ).fetchall()
+            orphaned = []
+            for job_id, owner, data, summary in rows:
+                # Без владельца - запись прежней версии хранилища
+                if owner is not None and owner != pid and _process_alive(owner):
+                    continue
+                job = json_loads(data)
+                job.update(status='error', error=error)
+                if summary is not None:
+                    summary = json_loads(summary)
+                    summary['status'] = 'error'
+                    summary = json_dumps_bytes(summary)
+                orphaned.append((json_dumps_bytes(job), summary, job_id))
+            if orphaned:
+                self._db.executemany(
+                    "UPDATE jobs SET data=?, summary=?, status='error' WHERE job_id=?", orphaned
+                )
+                self._db.commit()
+        return [job_id for *_, job_id in orphaned]
+    
+    def list(self):
+        """
+        Возвращает все задачи в порядке создания.
+        
+        Returns:
+            list: Список словарей с полями задач
+        """
+        with self._lock:
+            rows = self._db.execute('SELECT data FROM jobs ORDER BY created').fetchall()
+        return [json_loads(data) for data, in rows]
+    
+    def list_summaries(self):
+        """
+        Возвращает краткие описания задач в порядке создания, не читая
+        полные состояния (для задач без описания - полное состояние).
+        
+        Returns:
+            list: Список словарей
+        """
+        with self._lock:
+            rows = self._db.execute('SELECT COALESCE(summary, data) FROM jobs ORDER BY created').fetchall()
+        return [json_loads(data) for data, in rows]
+    
+    def data_version(self):
+        """
+        Номер версии данных; меняется после фиксации изменений другим процессом.
+        
+        Returns:
+            int: Значение PRAGMA data_version
+        """
+        with self._lock:
+            return self._db.execute('PRAGMA data_version').fetchone()[0]
+    
+    def close(self):
+        """Закрывает файл хранилища."""
+        with self._lock:
+            self._db.close()
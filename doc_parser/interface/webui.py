@@ -9,26 +9,134 @@ import os
 import sys
 import json
 import time
+import shutil
+import logging
+import mimetypes
 import uuid
+import queue
 import threading
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from urllib.parse import quote, unquote
+from flask import Flask, render_template, request, jsonify, send_file, send_from_directory
 from flask_cors import CORS
+from werkzeug.security import safe_join
+
+try:
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:  # Flask < 2.2: ответы сериализует стандартный json
+    DefaultJSONProvider = None
+
+try:
+    from waitress import serve
+except ImportError:  # waitress необязателен: без него используется сервер Flask
+    serve = None
 
 from doc_parser.config import DEFAULT_CONFIG, VERSION
 from doc_parser.core.parser import DocumentationParser
-from doc_parser.exporters.text_formats import MarkdownExporter, JsonExporter, CsvExporter
-from doc_parser.exporters.ai_formats import ClaudeExporter
-from doc_parser.exporters.web_formats import HtmlExporter, ZipExporter
+from doc_parser.exporters.dispatch import EXPORT_FORMATS, export_results
+from doc_parser.interface.job_store import JobStore, private_state_dir
+from doc_parser.utils.helpers import json_dumps_bytes, json_loads
+
+
+if DefaultJSONProvider is not None:
+    class FastJSONProvider(DefaultJSONProvider):
+        """JSON для ответов и запросов Flask через orjson (если он установлен)."""
+        
+        def dumps(self, obj, **kwargs):
+            """Сериализует объект в строку JSON."""
+            return json_dumps_bytes(obj).decode('utf-8')
+        
+        def loads(self, s, **kwargs):
+            """Разбирает JSON из строки или bytes."""
+            return json_loads(s)
+        
+        def response(self, *args, **kwargs):
+            """Формирует ответ jsonify, не декодируя готовые байты в строку."""
+            obj = self._prepare_response_obj(args, kwargs)
+            return self._app.response_class(json_dumps_bytes(obj), mimetype=self.mimetype)
 
 
 # Создаем Flask приложение
 app = Flask(__name__, 
             static_folder='webui/static',
             template_folder='webui/templates')
-CORS(app)
-
-# Хранилище для задач парсинга
-parsing_tasks = {}
+if DefaultJSONProvider is not None:
+    app.json = FastJSONProvider(app)
+# За Apache (mod_xsendfile) и другими прокси с X-Sendfile send_file
+# только указывает путь к файлу, а передает его прокси
+app.config['USE_X_SENDFILE'] = bool(os.environ.get("DOC_PARSER_X_SENDFILE"))
+# CORS-заголовки нужны только API; страницы и файлы отдаются без них
+CORS(app, resources={r"/api/*": {"origins": "*"}})
+
+# Задачи, запущенные этим процессом (с потоком и результатами в памяти), в порядке
+# создания. Сверх MAX_TASKS самые старые завершенные задачи вытесняются вместе
+# с файлами результатов
+MAX_TASKS = int(os.environ.get("DOC_PARSER_MAX_TASKS", "256"))
+parsing_tasks = OrderedDict()
+tasks_lock = threading.Lock()
+
+# Задачи выполняются в общем пуле из PARSE_WORKERS потоков; еще не более
+# MAX_QUEUED_TASKS ждут в очереди, сверх этого новые задачи отклоняются (429)
+PARSE_WORKERS = int(os.environ.get("DOC_PARSER_WORKERS", "4"))
+MAX_QUEUED_TASKS = int(os.environ.get("DOC_PARSER_MAX_QUEUED", "64"))
+parse_executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix="parse")
+task_slots = threading.BoundedSemaphore(PARSE_WORKERS + MAX_QUEUED_TASKS)
+
+# Состояние задач (статус, время, лог прогресса) в SQLite: его видят все
+# процессы веб-сервера (например, воркеры gunicorn), и оно переживает перезапуск.
+# Там же лежат снимки результатов, поэтому директория доступна только владельцу
+TASKS_DIR = private_state_dir("doc_parser_webui")
+task_store = JobStore(os.path.join(TASKS_DIR, "tasks.sqlite"), key="id")
+# Задачи, не завершенные остановленными процессами сервера, иначе остались бы
+# выполняющимися навсегда (и не удалялись бы по TASK_TTL)
+task_store.fail_orphaned("Сервер был остановлен во время выполнения задачи")
+
+# Буфер записи снимка результатов задачи
+SNAPSHOT_BUFFER_SIZE = 1 << 20
+
+# Время хранения задачи (секунды)
+TASK_TTL = 24 * 60 * 60
+# Как часто новые сообщения переносятся в лог прогресса (секунды)
+PROGRESS_FLUSH_INTERVAL = 0.25
+# Как часто лог прогресса выполняющейся задачи записывается в хранилище (секунды)
+PROGRESS_SAVE_INTERVAL = 1.0
+# Сколько последних сообщений хранит лог прогресса
+PROGRESS_LIMIT = 5000
+
+# Отдача файлов из output прокси-сервером: префикс внутреннего location nginx
+# для X-Accel-Redirect (например, /_protected_output/); без него файлы отдает Flask
+OUTPUT_ACCEL_REDIRECT = os.environ.get("DOC_PARSER_ACCEL_REDIRECT")
+
+# Настройки задачи, которые входят в краткое описание для списка задач
+SUMMARY_CONFIG_KEYS = ('max_depth', 'output_format', 'output_dir')
+
+# Формат вывода -> файл, который отдается при скачивании результатов
+DOWNLOAD_FILES = {
+    'zip': 'documentation.zip',
+    'json': 'results.json',
+    'csv': 'results.csv',
+    'claude': 'claude.md',
+}
+
+
+class TaskProgressHandler(logging.Handler):
+    """Передает сообщения лога парсера в лог прогресса задачи."""
+    
+    def __init__(self, task):
+        """
+        Инициализация обработчика.
+        
+        Args:
+            task: Задача, в лог прогресса которой пишутся сообщения
+        """
+        super().__init__(logging.INFO)
+        self.task = task
+    
+    def emit(self, record):
+        """Добавляет сообщение в лог прогресса задачи."""
+        self.task.add_progress(record.getMessage())
 
 
 class ParsingTask:
@@ -42,16 +150,33 @@ class ParsingTask:
             url: URL для парсинга
             config: Конфигурация парсера
         """
-        self.id = str(uuid.uuid4())
+        self.id = uuid.uuid4().hex
         self.url = url
         self.config = config
         self.status = "pending"
-        self.progress = []
+        self.progress = deque(maxlen=PROGRESS_LIMIT)
+        # Новые сообщения; в progress их переносит поток _flush_loop
+        self._pending = queue.SimpleQueue()
+        self._done = threading.Event()
+        self._flusher = None
         self.results = None
+        self.results_count = 0
         self.error = None
         self.start_time = time.time()
         self.end_time = None
-        self.thread = None
+        self.execution_time = None
+        self._future = None
+        self._saved_at = 0.0
+    
+    def save(self):
+        """Записывает текущее состояние задачи в общее хранилище."""
+        self._saved_at = time.monotonic()
+        task_store.put(self.to_dict(), summary=self.to_summary())
+    
+    def finish(self):
+        """Фиксирует время завершения и длительность задачи."""
+        self.end_time = time.time()
+        self.execution_time = self.end_time - self.start_time
     
     def to_dict(self):
         """Преобразует задачу в словарь."""
@@ -60,39 +185,88 @@ class ParsingTask:
             "url": self.url,
             "config": self.config,
             "status": self.status,
-            "progress": self.progress,
+            "progress": list(self.progress),
             "error": self.error,
             "start_time": self.start_time,
             "end_time": self.end_time,
-            "execution_time": self.end_time - self.start_time if self.end_time else None,
-            "results_count": len(self.results) if self.results else 0
+            "execution_time": self.execution_time,
+            "results_count": self.results_count
+        }
+    
+    def to_summary(self):
+        """Краткое описание задачи для списка задач (без лога прогресса)."""
+        return {
+            "id": self.id,
+            "url": self.url,
+            "config": {key: self.config.get(key) for key in SUMMARY_CONFIG_KEYS},
+            "status": self.status,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "execution_time": self.execution_time,
+            "results_count": self.results_count
         }
     
     def run(self):
-        """Запускает задачу в отдельном потоке."""
-        self.thread = threading.Thread(target=self._run_task)
-        self.thread.daemon = True
-        self.thread.start()
+        """
+        Ставит задачу в очередь пула потоков.
+        
+        Место в очереди (task_slots) должно быть занято заранее; оно
+        освобождается, когда задача завершится или будет отменена.
+        """
+        # Задача в очереди видна другим процессам со статусом pending
+        self.save()
+        self._future = parse_executor.submit(self._run_task)
+        self._future.add_done_callback(lambda future: task_slots.release())
+    
+    def cancel(self):
+        """
+        Отменяет задачу.
+        
+        Задача из очереди не будет запущена. Выполняющийся поток Python не
+        позволяет безопасно остановить, поэтому такая задача только
+        помечается как отмененная.
+        """
+        if self._future is None or self._future.done():
+            return
+        
+        queued = self._future.cancel()
+        if not queued and self.status != "processing":
+            return
+        
+        self.status = "cancelled"
+        self.add_progress("Задача отменена пользователем")
+        self.finish()
+        if queued:
+            # Поток переноса сообщений для задачи из очереди не запускался
+            self._flush_progress()
+        self.save()
     
     def _run_task(self):
         """Выполняет задачу парсинга."""
+        parser = None
+        handler = TaskProgressHandler(self)
+        
+        # Поток переноса сообщений живет, только пока задача выполняется
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
         try:
             self.status = "processing"
             self.add_progress("Инициализация парсера...")
+            self.save()
             
             # Создаем парсер
             parser = DocumentationParser(self.config)
             
-            # Подменяем логгер
-            original_info = parser.logger.info
-            def custom_info(message):
-                original_info(message)
-                self.add_progress(message)
-            parser.logger.info = custom_info
+            # У каждой задачи свой дочерний логгер: обработчик получает только
+            # ее сообщения, а в консоль они по-прежнему попадают через 'doc_parser'
+            parser.logger = parser.logger.getChild(f"task.{self.id}")
+            parser.logger.addHandler(handler)
             
             # Запускаем парсинг
             self.add_progress(f"Начало обхода URL: {self.url}")
             self.results = parser.crawl(self.url)
+            self.results_count = len(self.results)
+            self.save_results_snapshot()
             
             # Завершаем задачу
             self.status = "completed"
@@ -101,19 +275,73 @@ class ParsingTask:
             # Экспортируем результаты
             self.export_results()
             
-            self.end_time = time.time()
+            self.finish()
             
         except Exception as e:
             import traceback
             self.status = "error"
             self.error = f"{str(e)}\n{traceback.format_exc()}"
             self.add_progress(f"Ошибка: {str(e)}")
-            self.end_time = time.time()
+            self.finish()
+        finally:
+            if parser is not None:
+                parser.logger.removeHandler(handler)
+            
+            # Переносим оставшиеся сообщения и сохраняем итоговое состояние
+            self._done.set()
+            self._flusher.join()
+            self.save()
+    
+    def save_results_snapshot(self):
+        """
+        Сохраняет результаты парсинга в снимок на диске.
+        
+        По снимку результаты отдает любой процесс сервера, в том числе после
+        перезапуска. Ошибка записи не прерывает задачу: результаты остаются
+        доступны в этом процессе.
+        """
+        path = results_snapshot_path(self.id)
+        try:
+            # Запись во временный файл: читатель не увидит недописанный снимок
+            with open(f"{path}.tmp", "wb", buffering=SNAPSHOT_BUFFER_SIZE) as f:
+                f.write(json_dumps_bytes(self.results))
+            os.replace(f"{path}.tmp", path)
+        except (OSError, TypeError, ValueError) as e:
+            self.add_progress(f"Не удалось сохранить снимок результатов: {str(e)}")
     
     def add_progress(self, message):
-        """Добавляет сообщение в лог прогресса."""
+        """Добавляет сообщение в лог прогресса (без блокировок и форматирования)."""
+        self._pending.put_nowait(message)
+    
+    def _flush_progress(self):
+        """
+        Переносит накопленные сообщения в лог прогресса.
+        
+        Returns:
+            bool: Были ли новые сообщения
+        """
+        messages = []
+        try:
+            while True:
+                messages.append(self._pending.get_nowait())
+        except queue.Empty:
+            pass
+        
+        if not messages:
+            return False
+        
+        # Метка времени форматируется один раз на пачку сообщений
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        self.progress.append(f"[{timestamp}] {message}")
+        self.progress.extend(f"[{timestamp}] {message}" for message in messages)
+        return True
+    
+    def _flush_loop(self):
+        """Периодически переносит сообщения в лог прогресса, пока задача выполняется."""
+        while not self._done.wait(PROGRESS_FLUSH_INTERVAL):
+            # Лог прогресса попадает в хранилище не чаще раза в PROGRESS_SAVE_INTERVAL
+            if self._flush_progress() and time.monotonic() - self._saved_at >= PROGRESS_SAVE_INTERVAL:
+                self.save()
+        self._flush_progress()
     
     def export_results(self):
         """Экспортирует результаты парсинга."""
@@ -130,59 +358,216 @@ class ParsingTask:
             
             self.add_progress(f"Экспорт результатов в формате {output_format}...")
             
-            # Выбираем экспортер в зависимости от формата
-            if output_format == "markdown":
-                exporter = MarkdownExporter(self.config)
-                saved_files = exporter.save_results(self.results, task_output_dir)
-                self.add_progress(f"Результаты сохранены в формате Markdown. Файлов: {len(saved_files)}")
-                
-            elif output_format == "json":
-                exporter = JsonExporter(self.config)
-                output_path = os.path.join(task_output_dir, "results.json")
-                saved_file = exporter.save_results(self.results, output_path)
-                self.add_progress(f"Результаты сохранены в JSON: {saved_file}")
-                
-            elif output_format == "csv":
-                exporter = CsvExporter(self.config)
-                output_path = os.path.join(task_output_dir, "results.csv")
-                saved_file = exporter.export_results(self.results, output_path)
-                self.add_progress(f"Результаты сохранены в CSV: {saved_file}")
-                
-                # Также сохраняем ссылки
-                links_path = os.path.join(task_output_dir, "links.csv")
-                links_file = exporter.export_links(self.results, links_path)
-                self.add_progress(f"Ссылки сохранены в: {links_file}")
-                
-            elif output_format == "claude":
-                exporter = ClaudeExporter(self.config)
-                output_path = os.path.join(task_output_dir, "claude.md")
-                saved_file = exporter.export_for_claude(self.results, output_path)
-                self.add_progress(f"Результаты сохранены для Claude: {saved_file}")
-                
-                # Также сохраняем чанки
-                chunked_dir = os.path.join(task_output_dir, "claude_chunks")
-                chunk_files = exporter.export_chunked(self.results, chunked_dir)
-                self.add_progress(f"Чанки сохранены в: {chunked_dir}")
-                
-            elif output_format == "html":
-                exporter = HtmlExporter(self.config)
-                saved_files = exporter.save_results(self.results, task_output_dir)
-                self.add_progress(f"Результаты сохранены в HTML. Файлов: {len(saved_files)}")
-                
-            elif output_format == "zip":
-                exporter = ZipExporter(self.config)
-                output_path = os.path.join(task_output_dir, "documentation.zip")
-                saved_file = exporter.export_to_zip(self.results, output_path)
-                self.add_progress(f"Результаты сохранены в ZIP-архив: {saved_file}")
-                
-            else:
+            if output_format not in EXPORT_FORMATS:
                 self.add_progress(f"Неизвестный формат: {output_format}")
-                
+                return
+            export_results(self.results, task_output_dir, output_format, self.config, report=self.add_progress)
+            
         except Exception as e:
             import traceback
             self.add_progress(f"Ошибка при экспорте: {str(e)}")
 
 
+@lru_cache(maxsize=128)
+def list_output_files(task_output_dir, end_time):
+    """
+    Составляет список файлов результатов задачи.
+    
+    Файлы завершенной задачи не меняются, поэтому список строится один раз
+    для пары (директория, время завершения), а не при каждом запросе.
+    
+    Args:
+        task_output_dir: Директория с результатами задачи
+        end_time: Время завершения задачи (часть ключа кэша)
+        
+    Returns:
+        list: Описания файлов (name, path, size)
+    """
+    files = []
+    for root, _, filenames in os.walk(task_output_dir):
+        for filename in filenames:
+            file_path = os.path.join(root, filename)
+            rel_path = os.path.relpath(file_path, task_output_dir)
+            files.append({
+                "name": rel_path,
+                "path": file_path,
+                "size": os.path.getsize(file_path)
+            })
+    return files
+
+
+def results_snapshot_path(task_id):
+    """
+    Путь к снимку результатов задачи.
+    
+    Args:
+        task_id: Идентификатор задачи
+        
+    Returns:
+        str: Путь к файлу снимка
+    """
+    return os.path.join(TASKS_DIR, f"{task_id}.json")
+
+
+@lru_cache(maxsize=4)
+def load_results_snapshot(task_id):
+    """
+    Загружает результаты задачи другого процесса из снимка.
+    
+    Результаты завершенной задачи не меняются, поэтому несколько последних
+    снимков держатся в памяти.
+    
+    Args:
+        task_id: Идентификатор задачи
+        
+    Returns:
+        dict: Результаты парсинга или None, если снимка нет
+    """
+    try:
+        with open(results_snapshot_path(task_id), "rb") as f:
+            return json_loads(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def remove_task_files(*tasks):
+    """
+    Удаляет директории с результатами задач и снимки результатов.
+    
+    Args:
+        *tasks: Состояния задач (словари из to_dict)
+    """
+    for task in tasks:
+        output_dir = task["config"].get('output_dir', 'output')
+        shutil.rmtree(os.path.join(output_dir, task["id"]), ignore_errors=True)
+        remove_results_snapshot(task["id"])
+
+
+def remove_results_snapshot(task_id):
+    """
+    Удаляет снимок результатов задачи.
+    
+    Args:
+        task_id: Идентификатор задачи
+    """
+    try:
+        os.remove(results_snapshot_path(task_id))
+    except FileNotFoundError:
+        pass
+    load_results_snapshot.cache_clear()
+
+
+def add_task(task):
+    """
+    Добавляет задачу, вытесняя старые задачи сверх MAX_TASKS и задачи старше
+    TASK_TTL (выполняющиеся задачи не вытесняются).
+    
+    Args:
+        task: Новая задача
+        
+    Returns:
+        list: Состояния вытесненных задач (их файлы удаляет вызывающий код)
+    """
+    evicted = task_store.purge(TASK_TTL)
+    
+    with tasks_lock:
+        for data in evicted:
+            parsing_tasks.pop(data["id"], None)
+        
+        parsing_tasks[task.id] = task
+        if len(parsing_tasks) > MAX_TASKS:
+            for task_id, old_task in list(parsing_tasks.items()):
+                if len(parsing_tasks) <= MAX_TASKS:
+                    break
+                if old_task.status in ("completed", "error", "cancelled"):
+                    evicted.append(parsing_tasks.pop(task_id).to_dict())
+    
+    task.save()
+    if evicted:
+        task_store.delete(*(data["id"] for data in evicted))
+    return evicted
+
+
+def summarize_task(task):
+    """
+    Краткое описание задачи из ее полного состояния (см. ParsingTask.to_summary).
+    
+    Args:
+        task: Состояние задачи (словарь из to_dict)
+        
+    Returns:
+        dict: Краткое описание задачи
+    """
+    summary = {key: task[key] for key in (
+        "id", "url", "status", "start_time", "end_time", "execution_time", "results_count"
+    )}
+    summary["config"] = {key: task["config"].get(key) for key in SUMMARY_CONFIG_KEYS}
+    return summary
+
+
+def find_task(task_id):
+    """
+    Находит состояние задачи: сначала среди задач этого процесса, затем в хранилище.
+    
+    Args:
+        task_id: Идентификатор задачи
+        
+    Returns:
+        dict: Состояние задачи или None, если задача не найдена
+    """
+    task = parsing_tasks.get(task_id)
+    if task is not None:
+        return task.to_dict()
+    return task_store.get(task_id)
+
+
+def find_local_task(task_id):
+    """
+    Находит задачу этого процесса (отменить задачу может только он).
+    
+    Args:
+        task_id: Идентификатор задачи
+        
+    Returns:
+        tuple: (задача, None) или (None, ответ с ошибкой)
+    """
+    task = parsing_tasks.get(task_id)
+    if task is not None:
+        return task, None
+    if task_store.get(task_id) is not None:
+        return None, (jsonify({"error": "Задача выполняется другим процессом сервера"}), 409)
+    return None, (jsonify({"error": "Задача не найдена"}), 404)
+
+
+def find_task_results(task_id):
+    """
+    Находит результаты завершенной задачи: в памяти этого процесса или в снимке.
+    
+    Args:
+        task_id: Идентификатор задачи
+        
+    Returns:
+        tuple: (результаты, None) или (None, ответ с ошибкой)
+    """
+    task = parsing_tasks.get(task_id)
+    if task is not None:
+        status, results = task.status, task.results
+    else:
+        data = task_store.get(task_id)
+        if data is None:
+            return None, (jsonify({"error": "Задача не найдена"}), 404)
+        status = data["status"]
+        results = load_results_snapshot(task_id) if status == "completed" else None
+    
+    if status != "completed":
+        return None, (jsonify({"error": f"Задача не завершена. Текущий статус: {status}"}), 400)
+    
+    if not results:
+        return None, (jsonify({"error": "Результаты не найдены"}), 404)
+    
+    return results, None
+
+
 # Маршруты Flask
 @app.route('/')
 def index():
@@ -192,9 +577,24 @@ def index():
 
 @app.route('/api/tasks', methods=['GET'])
 def get_tasks():
-    """Получение списка задач."""
-    tasks = [task.to_dict() for task in parsing_tasks.values()]
-    return jsonify(tasks)
+    """
+    Получение списка задач (параметр since - только начатые позже этого времени).
+    
+    Возвращаются краткие описания без лога прогресса: лог задачи
+    запрашивается отдельно (/api/tasks/<id>/progress).
+    """
+    # Задачи всех процессов (краткие описания, без полных состояний); для своих
+    # задач берется самое свежее состояние
+    tasks = {data["id"]: summarize_task(data) for data in task_store.list_summaries()}
+    with tasks_lock:
+        local_tasks = list(parsing_tasks.items())
+    for task_id, task in local_tasks:
+        tasks[task_id] = task.to_summary()
+    
+    since = request.args.get('since', type=float)
+    if since is not None:
+        return jsonify([task for task in tasks.values() if task["start_time"] > since])
+    return jsonify(list(tasks.values()))
 
 
 @app.route('/api/tasks', methods=['POST'])
@@ -207,61 +607,61 @@ def create_task():
     if not url:
         return jsonify({"error": "URL не указан"}), 400
     
-    # Получаем конфигурацию
-    config = DEFAULT_CONFIG.copy()
-    user_config = data.get('config', {})
-    config.update(user_config)
+    # Получаем конфигурацию: настройки пользователя поверх значений по умолчанию
+    config = {**DEFAULT_CONFIG, **(data.get('config') or {})}
     
     # Создаем директорию для результатов
     output_dir = config.get('output_dir', 'output')
     os.makedirs(output_dir, exist_ok=True)
     
-    # Создаем и запускаем задачу
+    # Пул и очередь заняты: задача не создается
+    if not task_slots.acquire(blocking=False):
+        return jsonify({"error": "Слишком много задач в очереди, повторите позже"}), 429
+    
+    # Создаем и запускаем задачу; файлы вытесненных задач удаляются в фоне
     task = ParsingTask(url, config)
-    parsing_tasks[task.id] = task
+    evicted = add_task(task)
     task.run()
     
+    if evicted:
+        threading.Thread(target=remove_task_files, args=evicted, daemon=True).start()
+    
     return jsonify(task.to_dict())
 
 
 @app.route('/api/tasks/<task_id>', methods=['GET'])
 def get_task(task_id):
     """Получение информации о задаче."""
-    task = parsing_tasks.get(task_id)
+    task = find_task(task_id)
     if not task:
         return jsonify({"error": "Задача не найдена"}), 404
     
-    return jsonify(task.to_dict())
+    return jsonify(task)
 
 
 @app.route('/api/tasks/<task_id>/progress', methods=['GET'])
 def get_task_progress(task_id):
     """Получение прогресса задачи."""
-    task = parsing_tasks.get(task_id)
+    task = find_task(task_id)
     if not task:
         return jsonify({"error": "Задача не найдена"}), 404
     
     return jsonify({
-        "id": task.id,
-        "status": task.status,
-        "progress": task.progress,
-        "error": task.error
+        "id": task["id"],
+        "status": task["status"],
+        "progress": task["progress"],
+        "error": task["error"]
     })
 
 
 @app.route('/api/tasks/<task_id>/cancel', methods=['POST'])
 def cancel_task(task_id):
     """Отмена задачи."""
-    task = parsing_tasks.get(task_id)
-    if not task:
-        return jsonify({"error": "Задача не найдена"}), 404
+    task, error = find_local_task(task_id)
+    if error:
+        return error
     
-    if task.status == "processing" and task.thread and task.thread.is_alive():
-        # К сожалению, Python не позволяет безопасно останавливать потоки
-        # Можно только пометить задачу как отмененную
-        task.status = "cancelled"
-        task.add_progress("Задача отменена пользователем")
-        task.end_time = time.time()
+    task.cancel()
     
     return jsonify({"status": "ok"})
 
@@ -269,12 +669,14 @@ def cancel_task(task_id):
 @app.route('/api/tasks/<task_id>/delete', methods=['DELETE'])
 def delete_task(task_id):
     """Удаление задачи."""
-    task = parsing_tasks.get(task_id)
-    if not task:
+    if not find_task(task_id):
         return jsonify({"error": "Задача не найдена"}), 404
     
     # Удаляем задачу из хранилища
-    del parsing_tasks[task_id]
+    with tasks_lock:
+        parsing_tasks.pop(task_id, None)
+    task_store.delete(task_id)
+    remove_results_snapshot(task_id)
     
     return jsonify({"status": "ok"})
 
@@ -282,18 +684,12 @@ def delete_task(task_id):
 @app.route('/api/tasks/<task_id>/results', methods=['GET'])
 def get_task_results(task_id):
     """Получение результатов задачи."""
-    task = parsing_tasks.get(task_id)
-    if not task:
-        return jsonify({"error": "Задача не найдена"}), 404
-    
-    if task.status != "completed":
-        return jsonify({"error": f"Задача не завершена. Текущий статус: {task.status}"}), 400
-    
-    if not task.results:
-        return jsonify({"error": "Результаты не найдены"}), 404
+    results, error = find_task_results(task_id)
+    if error:
+        return error
     
     # Возвращаем список URL
-    urls = list(task.results.keys())
+    urls = list(results.keys())
     return jsonify({
         "count": len(urls),
         "urls": urls
@@ -303,113 +699,77 @@ def get_task_results(task_id):
 @app.route('/api/tasks/<task_id>/results/<path:url>', methods=['GET'])
 def get_task_result(task_id, url):
     """Получение результата для конкретного URL."""
-    task = parsing_tasks.get(task_id)
-    if not task:
-        return jsonify({"error": "Задача не найдена"}), 404
-    
-    if task.status != "completed":
-        return jsonify({"error": f"Задача не завершена. Текущий статус: {task.status}"}), 400
-    
-    if not task.results:
-        return jsonify({"error": "Результаты не найдены"}), 404
+    results, error = find_task_results(task_id)
+    if error:
+        return error
     
-    # Ищем URL в результатах
-    for result_url, result_data in task.results.items():
-        if result_url == url:
-            return jsonify(result_data)
+    # Результаты - словарь по URL; закодированный URL декодируется один раз
+    result_data = results.get(url)
+    if result_data is None:
+        result_data = results.get(unquote(url))
+    if result_data is None:
+        return jsonify({"error": "URL не найден в результатах"}), 404
     
-    return jsonify({"error": "URL не найден в результатах"}), 404
+    return jsonify(result_data)
 
 
 @app.route('/api/tasks/<task_id>/download', methods=['GET'])
 def download_task_results(task_id):
     """Скачивание результатов задачи."""
-    task = parsing_tasks.get(task_id)
+    # Файлы результатов лежат на диске, поэтому их отдает любой процесс
+    task = find_task(task_id)
     if not task:
         return jsonify({"error": "Задача не найдена"}), 404
     
-    if task.status != "completed":
-        return jsonify({"error": f"Задача не завершена. Текущий статус: {task.status}"}), 400
+    if task["status"] != "completed":
+        return jsonify({"error": f"Задача не завершена. Текущий статус: {task['status']}"}), 400
     
     # Директория с результатами
-    output_dir = task.config.get('output_dir', 'output')
-    task_output_dir = os.path.join(output_dir, task.id)
+    output_dir = task["config"].get('output_dir', 'output')
+    task_output_dir = os.path.join(output_dir, task_id)
     
     if not os.path.exists(task_output_dir):
         return jsonify({"error": "Директория с результатами не найдена"}), 404
     
     # Проверяем формат вывода
-    output_format = task.config.get('output_format', 'markdown')
-    
-    if output_format == 'zip':
-        # Для zip возвращаем zip-архив
-        zip_path = os.path.join(task_output_dir, "documentation.zip")
-        if os.path.exists(zip_path):
-            return send_from_directory(
-                os.path.dirname(zip_path),
-                os.path.basename(zip_path),
-                as_attachment=True
-            )
-    elif output_format == 'json':
-        # Для json возвращаем json-файл
-        json_path = os.path.join(task_output_dir, "results.json")
-        if os.path.exists(json_path):
-            return send_from_directory(
-                os.path.dirname(json_path),
-                os.path.basename(json_path),
-                as_attachment=True
-            )
-    elif output_format == 'csv':
-        # Для csv возвращаем csv-файл
-        csv_path = os.path.join(task_output_dir, "results.csv")
-        if os.path.exists(csv_path):
-            return send_from_directory(
-                os.path.dirname(csv_path),
-                os.path.basename(csv_path),
-                as_attachment=True
-            )
-    elif output_format == 'claude':
-        # Для claude возвращаем markdown-файл
-        claude_path = os.path.join(task_output_dir, "claude.md")
-        if os.path.exists(claude_path):
-            return send_from_directory(
-                os.path.dirname(claude_path),
-                os.path.basename(claude_path),
-                as_attachment=True
-            )
+    output_format = task["config"].get('output_format', 'markdown')
+    
+    # Файл отдается с ETag/Last-Modified и поддержкой Range: повторный или
+    # прерванный запрос не скачивает архив заново, а сервер с wsgi.file_wrapper
+    # передает файл без копирования через Python
+    filename = DOWNLOAD_FILES.get(output_format)
+    if filename:
+        file_path = os.path.join(task_output_dir, filename)
+        if os.path.exists(file_path):
+            return send_file(file_path, as_attachment=True, conditional=True, etag=True, max_age=0)
     
     # Для html и markdown возвращаем ссылку на index.html или список файлов
     if output_format == 'html':
         html_path = os.path.join(task_output_dir, "index.html")
         if os.path.exists(html_path):
-            return send_from_directory(
-                os.path.dirname(html_path),
-                os.path.basename(html_path)
-            )
+            return send_file(html_path, conditional=True, etag=True, max_age=0)
     
     # Возвращаем список файлов
-    files = []
-    for root, _, filenames in os.walk(task_output_dir):
-        for filename in filenames:
-            file_path = os.path.join(root, filename)
-            rel_path = os.path.relpath(file_path, task_output_dir)
-            files.append({
-                "name": rel_path,
-                "path": file_path,
-                "size": os.path.getsize(file_path)
-            })
-    
     return jsonify({
         "task_id": task_id,
         "output_format": output_format,
         "output_dir": task_output_dir,
-        "files": files
+        "files": list_output_files(task_output_dir, task["end_time"])
     })
 
 
 @app.route('/output/<path:filename>')
 def serve_output(filename):
     """Отдача файлов из директории output."""
+    if OUTPUT_ACCEL_REDIRECT and not app.debug:
+        # Файл передает nginx (sendfile), поток Flask сразу освобождается
+        if safe_join('output', filename) is None:
+            return jsonify({"error": "Файл не найден"}), 404
+        response = app.response_class(
+            mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        )
+        response.headers['X-Accel-Redirect'] = OUTPUT_ACCEL_REDIRECT.rstrip('/') + '/' + quote(filename)
+        return response
     return send_from_directory('output', filename)
 
 
@@ -425,8 +785,16 @@ def run_webui(host='0.0.0.0', port=5000):
     os.makedirs(os.path.join(os.path.dirname(__file__), 'webui/templates'), exist_ok=True)
     os.makedirs(os.path.join(os.path.dirname(__file__), 'webui/static'), exist_ok=True)
     
-    # Запускаем Flask
-    app.run(host=host, port=port, debug=True)
+    # Режим отладки Flask (перезагрузчик запускает второй процесс со своими
+    # задачами) включается только явно
+    if os.environ.get("DOC_PARSER_DEBUG"):
+        app.run(host=host, port=port, debug=True)
+    # waitress (если установлен) обслуживает опросы статуса пулом потоков
+    # и отдает файлы через wsgi.file_wrapper
+    elif serve is not None:
+        serve(app, host=host, port=port, threads=16, channel_timeout=300)
+    else:
+        app.run(host=host, port=port, threaded=True)
 
 
 if __name__ == '__main__':
@@ -9,19 +9,35 @@ import os
 import sys
 import argparse
 import time
-from rich.console import Console
-from rich.progress import Progress
+from functools import lru_cache
 
-from doc_parser.config import DEFAULT_CONFIG
-from doc_parser.core.parser import DocumentationParser
-from doc_parser.exporters.text_formats import MarkdownExporter, JsonExporter, CsvExporter
-from doc_parser.exporters.ai_formats import ClaudeExporter
-from doc_parser.exporters.web_formats import HtmlExporter, ZipExporter
-from doc_parser.utils.helpers import setup_logger
 
+# Аргумент подкоманды parse -> ключ конфигурации парсера
+_ARG_CONFIG_KEYS = {
+    'max_depth': 'max_depth',
+    'delay': 'delay',
+    'timeout': 'timeout',
+    'concurrency': 'concurrency',
+    'user_agent': 'user_agent',
+    'include': 'include_patterns',
+    'exclude': 'exclude_patterns',
+    'save_assets': 'save_assets',
+    'format': 'output_format',
+    'output_dir': 'output_dir',
+    'log_level': 'log_level',
+    'resume': 'resume',
+    'parse_processes': 'parse_processes',
+}
 
-def parse_args():
-    """Разбор аргументов командной строки."""
+
+@lru_cache(maxsize=1)
+def build_arg_parser():
+    """
+    Создает парсер аргументов командной строки (один раз на процесс).
+    
+    Returns:
+        argparse.ArgumentParser: Парсер аргументов
+    """
     parser = argparse.ArgumentParser(
         description='Парсер документации для AI-обработки'
     )
@@ -66,6 +82,13 @@ def parse_args():
         default=30
     )
     
+    parse_parser.add_argument(
+        '--concurrency',
+        help='Количество одновременно обрабатываемых URL (по умолчанию: 16)',
+        type=int,
+        default=16
+    )
+    
     parse_parser.add_argument(
         '--user-agent',
         help='User-Agent для запросов (по умолчанию: DocParser/1.0)',
@@ -98,6 +121,19 @@ def parse_args():
         action='store_true'
     )
     
+    parse_parser.add_argument(
+        '--parse-processes',
+        help='Количество процессов для разбора HTML (по умолчанию: 0 - пул потоков)',
+        type=int,
+        default=0
+    )
+    
+    parse_parser.add_argument(
+        '--resume',
+        help='Продолжить прерванный обход, пропуская уже обработанные страницы',
+        action='store_true'
+    )
+    
     parse_parser.add_argument(
         '--log-level',
         help='Уровень логирования (DEBUG, INFO, WARNING, ERROR)',
@@ -135,7 +171,35 @@ def parse_args():
         default=5000
     )
     
-    return parser.parse_args()
+    return parser
+
+
+def parse_args(argv=None):
+    """
+    Разбор аргументов командной строки.
+    
+    Args:
+        argv: Список аргументов (по умолчанию - sys.argv[1:])
+        
+    Returns:
+        argparse.Namespace: Разобранные аргументы
+    """
+    return build_arg_parser().parse_args(argv)
+
+
+def config_from_args(args):
+    """
+    Составляет конфигурацию парсера из аргументов подкоманды parse.
+    
+    Args:
+        args: Разобранные аргументы
+        
+    Returns:
+        dict: Конфигурация парсера
+    """
+    config = {key: getattr(args, arg) for arg, key in _ARG_CONFIG_KEYS.items()}
+    config['follow_links'] = not args.no_follow
+    return config
 
 
 def main():
@@ -160,7 +224,13 @@ def main():
         run_webui(args.host, args.port)
         return
     
-    # Режим командной строки (parse)
+    # Режим командной строки (parse). Парсер и rich импортируются только здесь:
+    # запуск gui, api и webui их не загружает; модуль экспортера загружается
+    # при экспорте в выбранный формат
+    from rich.console import Console
+    from doc_parser.core.parser import DocumentationParser
+    from doc_parser.exporters.dispatch import EXPORT_FORMATS, export_results
+    
     # Настройка консоли
     console = Console()
     
@@ -172,19 +242,7 @@ def main():
     console.print()
     
     # Настройка конфигурации
-    config = {
-        'max_depth': args.max_depth,
-        'delay': args.delay,
-        'timeout': args.timeout,
-        'user_agent': args.user_agent,
-        'include_patterns': args.include,
-        'exclude_patterns': args.exclude,
-        'follow_links': not args.no_follow,
-        'save_assets': args.save_assets,
-        'output_format': args.format,
-        'output_dir': args.output_dir,
-        'log_level': args.log_level,
-    }
+    config = config_from_args(args)
     
     # Создаем директорию для результатов
     os.makedirs(args.output_dir, exist_ok=True)
@@ -205,58 +263,10 @@ def main():
         # Экспорт результатов
         console.print("[bold]Экспорт результатов...[/bold]")
         
-        if args.format == 'markdown':
-            exporter = MarkdownExporter(config)
-            saved_files = exporter.save_results(results, args.output_dir)
-            console.print(f"[bold green]Результаты сохранены в формате Markdown![/bold green]")
-            
-        elif args.format == 'json':
-            exporter = JsonExporter(config)
-            output_path = os.path.join(args.output_dir, 'results.json')
-            saved_file = exporter.save_results(results, output_path)
-            console.print(f"[bold green]Результаты сохранены в JSON![/bold green]")
-            console.print(f"Файл: {saved_file}")
-            
-        elif args.format == 'csv':
-            exporter = CsvExporter(config)
-            output_path = os.path.join(args.output_dir, 'results.csv')
-            saved_file = exporter.export_results(results, output_path)
-            console.print(f"[bold green]Результаты сохранены в CSV![/bold green]")
-            console.print(f"Файл: {saved_file}")
-            
-            # Также сохраняем ссылки
-            links_path = os.path.join(args.output_dir, 'links.csv')
-            links_file = exporter.export_links(results, links_path)
-            console.print(f"Ссылки сохранены в: {links_file}")
-            
-        elif args.format == 'claude':
-            exporter = ClaudeExporter(config)
-            output_path = os.path.join(args.output_dir, 'claude.md')
-            saved_file = exporter.export_for_claude(results, output_path)
-            console.print(f"[bold green]Результаты сохранены в формате для Claude![/bold green]")
-            console.print(f"Файл: {saved_file}")
-            
-            # Также сохраняем чанки
-            chunked_dir = os.path.join(args.output_dir, 'claude_chunks')
-            chunk_files = exporter.export_chunked(results, chunked_dir)
-            console.print(f"Чанки сохранены в: {chunked_dir}")
-            
-        elif args.format == 'html':
-            exporter = HtmlExporter(config)
-            saved_files = exporter.save_results(results, args.output_dir)
-            console.print(f"[bold green]Результаты сохранены в HTML![/bold green]")
-            console.print(f"Индексный файл: {os.path.join(args.output_dir, 'index.html')}")
-            
-        elif args.format == 'zip':
-            exporter = ZipExporter(config)
-            output_path = os.path.join(args.output_dir, 'documentation.zip')
-            saved_file = exporter.export_to_zip(results, output_path)
-            console.print(f"[bold green]Результаты сохранены в ZIP-архив![/bold green]")
-            console.print(f"Файл: {saved_file}")
-            
-        else:
+        if args.format not in EXPORT_FORMATS:
             console.print(f"[bold red]Неизвестный формат: {args.format}[/bold red]")
             sys.exit(1)
+        export_results(results, args.output_dir, args.format, config, report=console.print)
         
         console.print("[bold green]Готово![/bold green]")
         
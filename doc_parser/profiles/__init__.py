@@ -3,20 +3,20 @@
 
 """
 Профили для различных систем документации.
+
+Профиль регистрируется в реестре при импорте своего модуля, поэтому модули
+профилей импортируются вместе с пакетом (порядок задает порядок проверки
+при определении профиля); лениво загружаются только экспортируемые имена.
 """
 
+import importlib
+
 # Импорты для регистрации профилей
 from doc_parser.profiles import common
 from doc_parser.profiles import technical
 from doc_parser.profiles import js_based
 from doc_parser.profiles import ai_docs
 
-# Импорт отдельных профилей для удобства использования
-from doc_parser.profiles.common import GitBookProfile, DocusaurusProfile, MkDocsProfile
-from doc_parser.profiles.technical import ReadTheDocsProfile, VuePressProfile, HugoProfile
-from doc_parser.profiles.js_based import DocsifyProfile, NextJSProfile
-from doc_parser.profiles.ai_docs import AiDocsProfile, GenericProfile
-
 __all__ = [
     'GitBookProfile',
     'DocusaurusProfile',
@@ -29,3 +29,32 @@ __all__ = [
     'AiDocsProfile',
     'GenericProfile'
 ]
+
+# Имя -> модуль, из которого имя берется при первом обращении
+_LAZY_EXPORTS = {
+    'GitBookProfile': 'doc_parser.profiles.common',
+    'DocusaurusProfile': 'doc_parser.profiles.common',
+    'MkDocsProfile': 'doc_parser.profiles.common',
+    'ReadTheDocsProfile': 'doc_parser.profiles.technical',
+    'VuePressProfile': 'doc_parser.profiles.technical',
+    'HugoProfile': 'doc_parser.profiles.technical',
+    'DocsifyProfile': 'doc_parser.profiles.js_based',
+    'NextJSProfile': 'doc_parser.profiles.js_based',
+    'AiDocsProfile': 'doc_parser.profiles.ai_docs',
+    'GenericProfile': 'doc_parser.profiles.ai_docs',
+}
+
+
+def __getattr__(name):
+    """Импортирует экспортируемое имя при первом обращении."""
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Список экспортируемых имен (для автодополнения и dir())."""
+    return list(__all__)
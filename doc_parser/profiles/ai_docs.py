@@ -5,9 +5,87 @@
 Профиль для AI-документации и Generic fallback.
 """
 
-from bs4 import BeautifulSoup
+import re
+from bs4 import BeautifulSoup, NavigableString, Tag
 from doc_parser.core.profiles import SiteProfile, registry
-from doc_parser.utils.helpers import find_element, extract_text
+from doc_parser.utils.helpers import TEXT_STRIP_TAGS, find_element, fast_text, text_length
+
+# Блоки - кандидаты на основной контент и признаки служебных блоков в id/class/role
+_CONTENT_BLOCK_TAGS = frozenset(['div', 'section', 'article'])
+_HEADING_TAGS = frozenset(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+_SERVICE_BLOCK_RE = re.compile(r'nav|menu|footer|header|sidebar', re.IGNORECASE)
+
+
+def _is_service_block(tag):
+    """Проверяет, помечен ли блок в id, class или role как служебный."""
+    attrs = tag.attrs
+    if not attrs:
+        return False
+    
+    # Один поиск по всем трем атрибутам; регистр учитывает флаг выражения
+    classes = attrs.get('class', '')
+    if isinstance(classes, list):
+        classes = ' '.join(classes)
+    return _SERVICE_BLOCK_RE.search(f"{attrs.get('id', '')} {classes} {attrs.get('role', '')}") is not None
+
+
+def _subtree_stats(soup):
+    """
+    Считает для всех элементов дерева за один обход текст, заголовки и параграфы.
+    
+    Результаты совпадают с text_length(tag), len(tag.find_all(h1..h6)) и
+    len(tag.find_all('p')) для каждого элемента, но дерево обходится один раз,
+    а не заново для каждого вложенного блока.
+    
+    Args:
+        soup: BeautifulSoup объект
+        
+    Returns:
+        tuple: (элементы в порядке документа, длины текста, числа заголовков,
+            числа параграфов) - списки с общим индексом
+    """
+    nodes = []
+    parents = []
+    chars = []
+    words = []
+    
+    # Прямой обход (родитель всегда раньше потомков) с текстом собственных строк
+    stack = [(soup, -1)]
+    while stack:
+        tag, parent = stack.pop()
+        index = len(nodes)
+        nodes.append(tag)
+        parents.append(parent)
+        
+        tag_chars = tag_words = 0
+        children = []
+        for child in tag.children:
+            if type(child) is NavigableString:
+                for word in child.split():
+                    tag_chars += len(word)
+                    tag_words += 1
+            elif isinstance(child, Tag):
+                children.append((child, index))
+        chars.append(tag_chars)
+        words.append(tag_words)
+        stack.extend(reversed(children))
+    
+    # Накопление снизу вверх: текст поддеревьев TEXT_STRIP_TAGS в родителя
+    # не попадает (как в extract_text), а заголовки и параграфы - попадают
+    headers = [0] * len(nodes)
+    paragraphs = [0] * len(nodes)
+    for index in range(len(nodes) - 1, 0, -1):
+        tag = nodes[index]
+        parent = parents[index]
+        headers[parent] += headers[index] + (tag.name in _HEADING_TAGS)
+        paragraphs[parent] += paragraphs[index] + (tag.name == 'p')
+        if tag.name not in TEXT_STRIP_TAGS:
+            chars[parent] += chars[index]
+            words[parent] += words[index]
+    
+    # Слова соединяются одним пробелом
+    text_lengths = [c + w - 1 if w else 0 for c, w in zip(chars, words)]
+    return nodes, text_lengths, headers, paragraphs
 
 
 class AiDocsProfile(SiteProfile):
@@ -30,14 +108,12 @@ class AiDocsProfile(SiteProfile):
     
     def extract_content(self, soup):
         """Извлекает основной контент из AI-документации."""
-        content = find_element(soup, self.content_selectors)
+        content = find_element(soup, self._content_finders)
         if not content:
             return None
         
         # Очистка специфичных элементов
-        for selector in self.ignore_selectors:
-            for element in content.select(selector):
-                element.decompose()
+        self.clean_content(content)
         
         # Особая обработка для ссылки примеров кода
         for pre in content.find_all('pre'):
@@ -60,7 +136,7 @@ class AiDocsProfile(SiteProfile):
     
     def extract_navigation(self, soup):
         """Извлекает навигацию из AI-документации."""
-        nav = find_element(soup, self.navigation_selectors)
+        nav = find_element(soup, self._navigation_finders)
         return nav
 
 
@@ -102,7 +178,7 @@ class GenericProfile(SiteProfile):
         Извлекает основной контент из страницы с использованием эвристик.
         """
         # Пробуем найти по селекторам
-        content = find_element(soup, self.content_selectors)
+        content = find_element(soup, self._content_finders)
         if content:
             return self.clean_content(content)
         
@@ -112,7 +188,7 @@ class GenericProfile(SiteProfile):
     def extract_navigation(self, soup):
         """Извлекает навигацию из страницы с использованием эвристик."""
         # Пробуем найти по селекторам
-        nav = find_element(soup, self.navigation_selectors)
+        nav = find_element(soup, self._navigation_finders)
         if nav:
             return nav
         
@@ -130,41 +206,34 @@ class GenericProfile(SiteProfile):
             BeautifulSoup элемент с найденным контентом или None
         """
         # Исключаем заведомо не содержательные элементы
-        for selector in self.ignore_selectors:
-            for element in soup.select(selector):
-                element.decompose()
+        self.clean_content(soup)
         
-        # Оцениваем все div-ы
-        candidates = []
-        for div in soup.find_all(['div', 'section', 'article']):
-            # Пропускаем явно служебные блоки
-            skip = False
-            for attr in ['id', 'class', 'role']:
-                if attr in div.attrs:
-                    value = div[attr]
-                    if isinstance(value, list):
-                        value = ' '.join(value)
-                    
-                    if any(term in value.lower() for term in ['nav', 'menu', 'footer', 'header', 'sidebar']):
-                        skip = True
-                        break
+        # Текст, заголовки и параграфы всех блоков считаются за один обход
+        nodes, text_lengths, headers, paragraphs = _subtree_stats(soup)
+        
+        # Оцениваем все div-ы; при равных оценках выигрывает первый в документе
+        best_div = None
+        best_score = None
+        for index, div in enumerate(nodes):
+            if div.name not in _CONTENT_BLOCK_TAGS or index == 0:
+                continue
             
-            if skip:
+            # Нужны заголовки или несколько параграфов и достаточно текста
+            if headers[index] == 0 and paragraphs[index] <= 1:
+                continue
+            if text_lengths[index] <= 100:
                 continue
             
-            # Подсчитываем текст, заголовки и параграфы
-            text_len = len(extract_text(str(div)))
-            headers = len(div.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']))
-            paragraphs = len(div.find_all('p'))
+            # Пропускаем явно служебные блоки
+            if _is_service_block(div):
+                continue
             
-            # Если есть достаточно контента
-            if text_len > 100 and (headers > 0 or paragraphs > 1):
-                score = text_len + headers * 50 + paragraphs * 10
-                candidates.append((div, score))
-        
-        # Если есть кандидаты, возвращаем лучший
-        if candidates:
-            best_div = max(candidates, key=lambda x: x[1])[0]
+            score = text_lengths[index] + headers[index] * 50 + paragraphs[index] * 10
+            if best_score is None or score > best_score:
+                best_div = div
+                best_score = score
+        
+        if best_div is not None:
             return best_div
         
         # Возвращаем копию body, если ничего не нашли
@@ -185,21 +254,21 @@ class GenericProfile(SiteProfile):
         # Ищем блоки с высокой плотностью ссылок
         for element in soup.find_all(['div', 'nav', 'aside', 'ul']):
             links = element.find_all('a')
-            if not links:
+            link_count = len(links)
+            if link_count <= 3:
                 continue
             
-            # Длина текста и количество ссылок
-            text_len = len(extract_text(str(element)))
-            link_count = len(links)
+            # Длина текста (только у блоков с достаточным числом ссылок)
+            text_len = text_length(element)
             
             # Оцениваем плотность ссылок
-            if text_len > 0 and link_count > 3:
+            if text_len > 0:
                 link_density = link_count / text_len
                 
                 # Проверяем, являются ли ссылки навигационными (короткий текст)
                 nav_links = 0
                 for link in links:
-                    link_text = link.get_text().strip()
+                    link_text = fast_text(link)
                     if len(link_text) < 30:
                         nav_links += 1
                 
@@ -30,20 +30,18 @@ class GitBookProfile(SiteProfile):
     
     def extract_content(self, soup):
         """Извлекает основной контент из GitBook страницы."""
-        content = find_element(soup, self.content_selectors)
+        content = find_element(soup, self._content_finders)
         if not content:
             return None
         
         # Очистка специфичных для GitBook элементов
-        for selector in self.ignore_selectors:
-            for element in content.select(selector):
-                element.decompose()
+        self.clean_content(content)
         
         return content
     
     def extract_navigation(self, soup):
         """Извлекает навигацию из GitBook страницы."""
-        nav = find_element(soup, self.navigation_selectors)
+        nav = find_element(soup, self._navigation_finders)
         return nav
 
 
@@ -67,20 +65,18 @@ class DocusaurusProfile(SiteProfile):
     
     def extract_content(self, soup):
         """Извлекает основной контент из Docusaurus страницы."""
-        content = find_element(soup, self.content_selectors)
+        content = find_element(soup, self._content_finders)
         if not content:
             return None
         
         # Очистка специфичных для Docusaurus элементов
-        for selector in self.ignore_selectors:
-            for element in content.select(selector):
-                element.decompose()
+        self.clean_content(content)
         
         return content
     
     def extract_navigation(self, soup):
         """Извлекает навигацию из Docusaurus страницы."""
-        nav = find_element(soup, self.navigation_selectors)
+        nav = find_element(soup, self._navigation_finders)
         return nav
 
 
@@ -104,20 +100,18 @@ class MkDocsProfile(SiteProfile):
     
     def extract_content(self, soup):
         """Извлекает основной контент из MkDocs страницы."""
-        content = find_element(soup, self.content_selectors)
+        content = find_element(soup, self._content_finders)
         if not content:
             return None
         
         # Очистка специфичных для MkDocs элементов
-        for selector in self.ignore_selectors:
-            for element in content.select(selector):
-                element.decompose()
+        self.clean_content(content)
         
         return content
     
     def extract_navigation(self, soup):
         """Извлекает навигацию из MkDocs страницы."""
-        nav = find_element(soup, self.navigation_selectors)
+        nav = find_element(soup, self._navigation_finders)
         return nav
 
 
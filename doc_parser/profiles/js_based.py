@@ -5,10 +5,14 @@
 Профили для JavaScript-систем документации (Docsify, NextJS).
 """
 
+import soupsieve
 from bs4 import BeautifulSoup
 from doc_parser.core.profiles import SiteProfile, registry
 from doc_parser.utils.helpers import find_element
 
+# Распространенные в NextJS компоненты виджетов (один обход дерева на оба атрибута)
+_NEXTJS_WIDGET_SELECTOR = soupsieve.compile('[data-component], [data-reactid]')
+
 
 class DocsifyProfile(SiteProfile):
     """
@@ -30,20 +34,18 @@ class DocsifyProfile(SiteProfile):
     
     def extract_content(self, soup):
         """Извлекает основной контент из Docsify страницы."""
-        content = find_element(soup, self.content_selectors)
+        content = find_element(soup, self._content_finders)
         if not content:
             return None
         
         # Очистка специфичных элементов
-        for selector in self.ignore_selectors:
-            for element in content.select(selector):
-                element.decompose()
+        self.clean_content(content)
         
         return content
     
     def extract_navigation(self, soup):
         """Извлекает навигацию из Docsify страницы."""
-        nav = find_element(soup, self.navigation_selectors)
+        nav = find_element(soup, self._navigation_finders)
         return nav
 
 
@@ -67,25 +69,23 @@ class NextJSProfile(SiteProfile):
     
     def extract_content(self, soup):
         """Извлекает основной контент из NextJS страницы."""
-        content = find_element(soup, self.content_selectors)
+        content = find_element(soup, self._content_finders)
         if not content:
             return None
         
         # Очистка специфичных элементов
-        for selector in self.ignore_selectors:
-            for element in content.select(selector):
-                element.decompose()
+        self.clean_content(content)
         
         # Удаляем распространенные в NextJS компоненты виджетов
-        for attr in ['data-component', 'data-reactid']:
-            for element in content.find_all(attrs={attr: True}):
+        for element in _NEXTJS_WIDGET_SELECTOR.select(content):
+            if not element.decomposed:
                 element.decompose()
         
         return content
     
     def extract_navigation(self, soup):
         """Извлекает навигацию из NextJS страницы."""
-        nav = find_element(soup, self.navigation_selectors)
+        nav = find_element(soup, self._navigation_finders)
         return nav
 
 
@@ -5,10 +5,14 @@
 Профили для технических систем документации (ReadTheDocs, VuePress, Hugo).
 """
 
+import soupsieve
 from bs4 import BeautifulSoup
 from doc_parser.core.profiles import SiteProfile, registry
 from doc_parser.utils.helpers import find_element
 
+# Блоки кода, у которых ReadTheDocs убирает атрибуты стиля
+_CODE_SELECTOR = soupsieve.compile('pre, code')
+
 
 class ReadTheDocsProfile(SiteProfile):
     """
@@ -30,17 +34,15 @@ class ReadTheDocsProfile(SiteProfile):
     
     def extract_content(self, soup):
         """Извлекает основной контент из ReadTheDocs страницы."""
-        content = find_element(soup, self.content_selectors)
+        content = find_element(soup, self._content_finders)
         if not content:
             return None
         
         # Очистка специфичных элементов
-        for selector in self.ignore_selectors:
-            for element in content.select(selector):
-                element.decompose()
+        self.clean_content(content)
         
         # Удаляем атрибуты стиля из <pre> и <code>
-        for elem in content.select('pre, code'):
+        for elem in _CODE_SELECTOR.select(content):
             if 'style' in elem.attrs:
                 del elem['style']
         
@@ -48,7 +50,7 @@ class ReadTheDocsProfile(SiteProfile):
     
     def extract_navigation(self, soup):
         """Извлекает навигацию из ReadTheDocs страницы."""
-        nav = find_element(soup, self.navigation_selectors)
+        nav = find_element(soup, self._navigation_finders)
         
         # Очистка ссылок от лишних атрибутов
         if nav:
@@ -79,20 +81,18 @@ class VuePressProfile(SiteProfile):
     
     def extract_content(self, soup):
         """Извлекает основной контент из VuePress страницы."""
-        content = find_element(soup, self.content_selectors)
+        content = find_element(soup, self._content_finders)
         if not content:
             return None
         
         # Очистка специфичных для VuePress элементов
-        for selector in self.ignore_selectors:
-            for element in content.select(selector):
-                element.decompose()
+        self.clean_content(content)
         
         return content
     
     def extract_navigation(self, soup):
         """Извлекает навигацию из VuePress страницы."""
-        nav = find_element(soup, self.navigation_selectors)
+        nav = find_element(soup, self._navigation_finders)
         return nav
 
 
@@ -116,20 +116,18 @@ class HugoProfile(SiteProfile):
     
     def extract_content(self, soup):
         """Извлекает основной контент из Hugo страницы."""
-        content = find_element(soup, self.content_selectors)
+        content = find_element(soup, self._content_finders)
         if not content:
             return None
         
         # Очистка специфичных элементов
-        for selector in self.ignore_selectors:
-            for element in content.select(selector):
-                element.decompose()
+        self.clean_content(content)
         
         return content
     
     def extract_navigation(self, soup):
         """Извлекает навигацию из Hugo страницы."""
-        nav = find_element(soup, self.navigation_selectors)
+        nav = find_element(soup, self._navigation_finders)
         return nav
 
 
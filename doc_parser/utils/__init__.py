@@ -6,8 +6,14 @@
 """
 
 from doc_parser.utils.helpers import (
-    setup_logger, normalize_url, is_same_domain, is_valid_url, matches_pattern,
-    clean_html, extract_text, find_element, get_meta_tag, get_title
+    setup_logger,
+    normalize_url, is_same_domain, is_valid_url, url_to_slug,
+    is_html_content_type, read_limited, decode_body,
+    resolve_links, matches_pattern, compile_patterns, PatternMatcher,
+    clean_html, lxml_document, html_to_text,
+    extract_text, extract_node_text, text_length, fast_text,
+    compile_selector, prepare_selectors, find_element, get_meta_tag, get_title,
+    json_dumps_bytes, json_loads, open_text_writer
 )
 
 __all__ = [
@@ -15,10 +21,27 @@ __all__ = [
     'normalize_url',
     'is_same_domain',
     'is_valid_url',
+    'url_to_slug',
+    'is_html_content_type',
+    'read_limited',
+    'decode_body',
+    'resolve_links',
     'matches_pattern',
+    'compile_patterns',
+    'PatternMatcher',
     'clean_html',
+    'lxml_document',
+    'html_to_text',
     'extract_text',
+    'extract_node_text',
+    'text_length',
+    'fast_text',
+    'compile_selector',
+    'prepare_selectors',
     'find_element',
     'get_meta_tag',
-    'get_title'
+    'get_title',
+    'json_dumps_bytes',
+    'json_loads',
+    'open_text_writer'
 ]
@@ -5,12 +5,27 @@
 Вспомогательные функции для парсера документации.
 """
 
+import json
 import logging
 import os
 import re
 import urllib.parse
+from functools import lru_cache, partial
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+import soupsieve
+from bs4 import NavigableString, Tag
+from selectolax.lexbor import LexborHTMLParser
+from lxml import html as lxml_html
+
+try:
+    import orjson
+except ImportError:  # orjson необязателен: без него используется стандартный json
+    orjson = None
+
+try:
+    import hyperscan
+except ImportError:  # hyperscan необязателен: без него шаблоны объединяются в одно re-выражение
+    hyperscan = None
 
 # Настройка логгера
 def setup_logger(name, level=logging.INFO):
@@ -26,7 +41,11 @@ def setup_logger(name, level=logging.INFO):
     
     return logger
 
-# Утилиты для URL
+# Утилиты для URL. Одни и те же URL разбираются многократно (домен страницы
+# проверяется каждым профилем, базовый URL - каждой ссылкой), поэтому результаты
+# кэшируются; кэшируемые функции принимают только строки
+URL_CACHE_SIZE = 8192
+
 def normalize_url(url, base_url=None):
     """
     Нормализует URL, добавляя базовый URL если необходимо и удаляя фрагменты.
@@ -34,14 +53,19 @@ def normalize_url(url, base_url=None):
     if base_url:
         url = urljoin(base_url, url)
     
-    parsed = urlparse(url)
-    normalized = parsed._replace(fragment='').geturl()
-    return normalized
+    return _strip_fragment(url)
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _strip_fragment(url):
+    """Удаляет фрагмент (#...) из URL."""
+    return urlparse(url)._replace(fragment='').geturl()
 
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def is_same_domain(url1, url2):
     """Проверяет, принадлежат ли два URL одному домену."""
-    return urlparse(url1).netloc == urlparse(url2).netloc
+    return get_domain(url1) == get_domain(url2)
 
+@lru_cache(maxsize=URL_CACHE_SIZE)
 def get_domain(url):
     """Возвращает домен URL."""
     return urlparse(url).netloc
@@ -51,62 +75,475 @@ def is_valid_url(url):
     parsed = urlparse(url)
     return bool(parsed.netloc and parsed.scheme in ['http', 'https'])
 
+_URL_SLUG_RE = re.compile(r'[^\w\-]')
+
+def url_to_slug(url):
+    """Имя файла для страницы: все символы URL, кроме букв, цифр, '_' и '-', заменяются на '_'."""
+    return _URL_SLUG_RE.sub('_', url)
+
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml')
+
+def is_html_content_type(content_type):
+    """
+    Проверяет, что Content-Type ответа соответствует HTML-странице.
+    
+    Пустой Content-Type считается HTML: некоторые серверы документации
+    его не отдают.
+    """
+    return not content_type or content_type.lower().startswith(HTML_CONTENT_TYPES)
+
+async def read_limited(response, max_bytes, chunk_size=64 * 1024):
+    """
+    Читает тело ответа aiohttp по частям, прерывая загрузку сверх лимита.
+    
+    Нужна для ответов без Content-Length (chunked), размер которых
+    заранее неизвестен.
+    
+    Args:
+        response: aiohttp.ClientResponse
+        max_bytes: Максимальный размер тела в байтах
+        chunk_size: Размер читаемой части
+        
+    Returns:
+        bytes: Тело ответа или None, если оно больше max_bytes
+    """
+    chunks = []
+    total = 0
+    async for chunk in response.content.iter_chunked(chunk_size):
+        total += len(chunk)
+        if total > max_bytes:
+            return None
+        chunks.append(chunk)
+    return b''.join(chunks)
+
+def decode_body(body, encoding):
+    """
+    Декодирует тело ответа; неизвестная кодировка из заголовка заменяется UTF-8.
+    
+    Args:
+        body: Тело ответа
+        encoding: Кодировка из Content-Type или None
+        
+    Returns:
+        str: Текст (некорректные байты заменяются)
+    """
+    try:
+        return body.decode(encoding or 'utf-8', 'replace')
+    except LookupError:
+        return body.decode('utf-8', 'replace')
+
+_SKIP_HREF_PREFIXES = ('#', 'javascript:', 'mailto:')
+
+def resolve_links(hrefs, base_url):
+    """
+    Превращает href-атрибуты страницы в список ссылок для обхода.
+    
+    Относительные ссылки разрешаются от base_url, фрагменты удаляются;
+    остаются только уникальные http(s)-ссылки того же домена. Каждая ссылка
+    разбирается urlparse ровно один раз.
+    
+    Args:
+        hrefs: Итерируемый набор значений href
+        base_url: URL страницы
+        
+    Returns:
+        list: Нормализованные URL в порядке появления на странице
+    """
+    base_host = get_domain(base_url)
+    seen = set()
+    links = []
+    
+    for href in hrefs:
+        if not href or href.startswith(_SKIP_HREF_PREFIXES):
+            continue
+        
+        parsed = urlparse(urljoin(base_url, href))
+        if parsed.scheme not in ('http', 'https') or parsed.netloc != base_host:
+            continue
+        
+        full_url = parsed._replace(fragment='').geturl()
+        if full_url in seen:
+            continue
+        seen.add(full_url)
+        links.append(full_url)
+    
+    return links
+
 def matches_pattern(url, patterns):
-    """Проверяет, соответствует ли URL какому-либо из регулярных выражений."""
+    """
+    Проверяет, соответствует ли URL какому-либо из регулярных выражений.
+    
+    Скомпилированные шаблоны (см. compile_patterns) проверяются напрямую,
+    строки - через общий кэш модуля re.
+    """
     if not patterns:
         return False
-    return any(re.search(pattern, url) for pattern in patterns)
+    return any(
+        pattern.search(url) if isinstance(pattern, re.Pattern) else re.search(pattern, url)
+        for pattern in patterns
+    )
+
+def compile_patterns(patterns):
+    """Компилирует список регулярных выражений (строк или уже скомпилированных)."""
+    return [re.compile(pattern) for pattern in patterns or []]
+
+class PatternMatcher:
+    """
+    Проверяет, соответствует ли строка хотя бы одному из набора регулярных выражений.
+    
+    Все шаблоны компилируются один раз: в базу Hyperscan (один DFA-проход по
+    строке), если он установлен и поддерживает синтаксис шаблонов, иначе в одно
+    объединенное регулярное выражение re. Шаблоны с глобальными флагами,
+    группами или обратными ссылками в объединение не входят (там они изменили
+    бы смысл или не скомпилировались бы) и проверяются по отдельности.
+    """
+    
+    def __init__(self, patterns):
+        """
+        Инициализация набора шаблонов.
+        
+        Args:
+            patterns: Список регулярных выражений (строк или скомпилированных)
+        """
+        self.patterns = list(patterns or [])
+        self._database = None
+        self._regexes = []
+        
+        if not self.patterns:
+            return
+        
+        sources = [p for p in self.patterns if isinstance(p, str)]
+        if hyperscan is not None and len(sources) == len(self.patterns):
+            self._database = self._compile_hyperscan(sources)
+        
+        if self._database is None:
+            self._regexes = self._compile_re(self.patterns)
+    
+    @staticmethod
+    def _compile_re(patterns):
+        """
+        Компиляция шаблонов для re: простые объединяются в одно выражение.
+        
+        Args:
+            patterns: Список регулярных выражений (строк или скомпилированных)
+            
+        Returns:
+            list: Скомпилированные выражения для проверки
+        """
+        regexes = compile_patterns(patterns)
+        # Без групп и с флагами по умолчанию шаблон можно вставить в (?:...)
+        # как есть; скомпилированные шаблоны могут нести свои флаги
+        simple = [
+            p for p, regex in zip(patterns, regexes)
+            if isinstance(p, str) and regex.groups == 0 and regex.flags == re.UNICODE
+        ]
+        if len(simple) < 2:
+            return regexes
+        
+        try:
+            union = re.compile('|'.join(f'(?:{p})' for p in simple))
+        except re.error:
+            return regexes
+        simple = set(simple)
+        return [union] + [
+            regex for p, regex in zip(patterns, regexes)
+            if not (isinstance(p, str) and p in simple)
+        ]
+    
+    @staticmethod
+    def _compile_hyperscan(sources):
+        """Компиляция шаблонов в базу Hyperscan; None, если синтаксис не поддерживается."""
+        try:
+            database = hyperscan.Database()
+            database.compile(
+                expressions=[p.encode('utf-8') for p in sources],
+                ids=list(range(len(sources))),
+                elements=len(sources),
+                # UCP: \w, \b и классы символов в Unicode-смысле, как в re
+                flags=[
+                    hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+                ] * len(sources)
+            )
+            return database
+        except hyperscan.error:
+            return None
+    
+    def __bool__(self):
+        return bool(self.patterns)
+    
+    def search(self, text):
+        """
+        Проверяет строку на совпадение.
+        
+        Args:
+            text: Проверяемая строка
+            
+        Returns:
+            bool: True если совпал хотя бы один шаблон
+        """
+        if self._database is not None:
+            found = []
+            
+            def on_match(pattern_id, start, end, flags, context):
+                found.append(pattern_id)
+                return True  # Остановить сканирование после первого совпадения
+            
+            try:
+                self._database.scan(text.encode('utf-8'), match_event_handler=on_match)
+            except hyperscan.ScanTerminated:
+                pass
+            return bool(found)
+        
+        return any(regex.search(text) for regex in self._regexes)
 
 # Утилиты для HTML
+# Парсер для строк с XML-объявлением кодировки (они уже раскодированы)
+_UTF8_HTML_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+def lxml_document(html_content):
+    """
+    Разбирает HTML-документ в дерево lxml.
+    
+    lxml не принимает Unicode-строки с объявлением кодировки
+    (<?xml ... encoding=...?>): такие строки разбираются как байты UTF-8.
+    
+    Args:
+        html_content: HTML-контент в виде строки
+        
+    Returns:
+        lxml.html.HtmlElement: Корневой элемент документа
+        
+    Raises:
+        lxml.etree.ParserError: Документ пуст (только пробелы или комментарии)
+    """
+    try:
+        return lxml_html.document_fromstring(html_content)
+    except ValueError:
+        return lxml_html.document_fromstring(html_content.encode('utf-8'), parser=_UTF8_HTML_PARSER)
+
 def clean_html(html_content):
-    """Очищает HTML от ненужных элементов."""
-    soup = BeautifulSoup(html_content, 'lxml')
+    """
+    Очищает HTML от ненужных элементов.
+    
+    Скрипты и стили удаляются в дереве Lexbor, без построения дерева
+    BeautifulSoup только ради сериализации обратно в строку.
+    """
+    tree = LexborHTMLParser(html_content)
+    tree.strip_tags(['script', 'style'])
+    return tree.html or ''
+
+def html_to_text(html_content, separator=' ', drop_tags=('script', 'style')):
+    """
+    Извлекает текст из HTML без построения дерева BeautifulSoup.
     
-    # Удаление скриптов и стилей
-    for tag in soup(['script', 'style']):
-        tag.decompose()
+    Результат совпадает с soup.get_text(separator, strip=True): текстовые
+    узлы обрезаются, пустые пропускаются, остальные соединяются separator.
     
-    return str(soup)
+    Args:
+        html_content: HTML-код
+        separator: Разделитель между текстовыми узлами
+        drop_tags: Теги, удаляемые вместе с содержимым
+        
+    Returns:
+        str: Текст
+    """
+    tree = LexborHTMLParser(html_content)
+    if drop_tags:
+        tree.strip_tags(list(drop_tags))
+    if tree.root is None:
+        return ''
+    
+    parts = []
+    for node in tree.root.traverse(include_text=True):
+        if node.tag == '-text':
+            text = node.text_content.strip()
+            if text:
+                parts.append(text)
+    return separator.join(parts)
+
+TEXT_STRIP_TAGS = ['script', 'style', 'iframe', 'noscript']
 
 def extract_text(html_content):
-    """Извлекает чистый текст из HTML."""
-    soup = BeautifulSoup(html_content, 'lxml')
+    """
+    Извлекает чистый текст из HTML.
     
-    # Удаление всех скриптов и стилей
-    for tag in soup(['script', 'style']):
-        tag.decompose()
+    Пробелы все равно схлопываются, поэтому текст собирается целиком на
+    стороне Lexbor (node.text), без обхода текстовых узлов в Python.
+    """
+    tree = LexborHTMLParser(html_content)
+    tree.strip_tags(TEXT_STRIP_TAGS)
+    if tree.root is None:
+        return ''
     
-    # Получение текста
-    text = soup.get_text(separator=' ', strip=True)
+    text = tree.root.text(separator=' ', strip=True)
     
-    # Очистка пробелов
-    text = re.sub(r'\s+', ' ', text).strip()
+    # Очистка пробелов: str.split() делит по тем же символам, что и \s
+    return ' '.join(text.split())
+
+def extract_node_text(tag):
+    """
+    Извлекает чистый текст элемента BeautifulSoup, как extract_text(str(tag)).
     
-    return text
+    Текст берется из уже построенного дерева, без сериализации элемента и
+    повторного разбора HTML; дерево не изменяется.
+    """
+    # Поддеревья TEXT_STRIP_TAGS пропускаются целиком, как в extract_text;
+    # комментарии и содержимое script/style - подклассы NavigableString
+    parts = []
+    stack = [iter(tag.children)]
+    while stack:
+        for child in stack[-1]:
+            if type(child) is NavigableString:
+                parts.append(child)
+            elif isinstance(child, Tag) and child.name not in TEXT_STRIP_TAGS:
+                stack.append(iter(child.children))
+                break
+        else:
+            stack.pop()
+    return ' '.join(' '.join(parts).split())
 
-def find_element(soup, selectors):
+def text_length(tag):
     """
-    Находит первый элемент, соответствующий одному из селекторов.
+    Длина текста элемента BeautifulSoup, как у extract_text(str(tag)).
+    
+    Эвристики профилей оценивают так каждый блок страницы: без повторного
+    разбора HTML вложенные блоки не разбираются многократно.
+    """
+    return len(extract_node_text(tag))
+
+def fast_text(tag):
+    """
+    Возвращает текст элемента без пробелов по краям.
+    
+    Для узла с единственной текстовой строкой (li, th, заголовки) текст берется
+    напрямую, без рекурсивного обхода get_text().
+    """
+    text = tag.string
+    if type(text) is NavigableString:
+        return text.strip()
+    return tag.get_text().strip()
+
+# Скомпилированные CSS-селекторы: профили проверяют один и тот же небольшой
+# набор селекторов на каждой странице
+_SELECTOR_CACHE = {}
+
+
+def compile_selector(selector):
+    """
+    Компилирует CSS-селектор (один раз на строку селектора).
+    
+    Args:
+        selector: CSS селектор
+        
+    Returns:
+        soupsieve.SoupSieve: Скомпилированный селектор
+    """
+    compiled = _SELECTOR_CACHE.get(selector)
+    if compiled is None:
+        compiled = _SELECTOR_CACHE[selector] = soupsieve.compile(selector)
+    return compiled
+
+def _find_tag_with_class(name, class_name, soup):
+    """Первый элемент с тегом name и классом class_name."""
+    return soup.find(name, class_=class_name)
+
+_TAG_NAME_RE = re.compile(r'[a-zA-Z][a-zA-Z0-9-]*\Z')
+_CLASS_NAME_RE = re.compile(r'-?[_a-zA-Z][\w-]*\Z')
+
+def _find_first_by_priority(union, compiled, soup):
+    """
+    Первый элемент по приоритету селекторов за один обход дерева.
+    
+    Результат совпадает с последовательными select_one по каждому селектору:
+    среди совпадений объединенного селектора (в порядке документа) берется
+    первое для самого приоритетного селектора.
+    """
+    best = None
+    best_rank = len(compiled)
+    for element in union.iselect(soup):
+        for rank in range(best_rank):
+            if compiled[rank].match(element):
+                best = element
+                best_rank = rank
+                break
+        if best_rank == 0:
+            break
+    return best
+
+def _css_finder(selectors):
+    """Функция поиска для группы CSS-селекторов (по приоритету, один обход)."""
+    if len(selectors) == 1:
+        return compile_selector(selectors[0]).select_one
+    compiled = tuple(compile_selector(selector) for selector in selectors)
+    return partial(_find_first_by_priority, compile_selector(', '.join(selectors)), compiled)
+
+def prepare_selectors(selectors):
+    """
+    Готовит селекторы для find_element: вид каждого селектора определяется
+    один раз, а не при каждом поиске.
+    
+    Подряд идущие селекторы, выразимые в CSS, объединяются: дерево обходится
+    один раз на группу, а не по разу на селектор.
     
     Args:
-        soup: BeautifulSoup объект
         selectors: Список CSS селекторов
         
     Returns:
-        BeautifulSoup элемент или None
+        tuple: Функции поиска (soup -> элемент или None) в порядке приоритета
     """
+    finders = []
+    group = []
     for selector in selectors:
         if '.' in selector and not selector.startswith('.'):
             # Это не CSS селектор, а тег с классом
             tag, class_name = selector.split('.', 1)
-            element = soup.find(tag, class_=class_name)
+            if _TAG_NAME_RE.match(tag) and _CLASS_NAME_RE.match(class_name):
+                group.append(selector)
+                continue
+            finder = partial(_find_tag_with_class, tag, class_name)
         elif selector.startswith('.'):
             # CSS селектор класса
-            element = soup.select_one(selector)
-        else:
+            group.append(selector)
+            continue
+        elif _TAG_NAME_RE.match(selector):
             # Просто тег
-            element = soup.find(selector)
+            group.append(selector)
+            continue
+        else:
+            # Не имя тега ('#main', 'div[role="main"]'): soup.find ищет его
+            # как имя тега и не находит - селектор пропускается
+            continue
         
+        if group:
+            finders.append(_css_finder(group))
+            group = []
+        finders.append(finder)
+    
+    if group:
+        finders.append(_css_finder(group))
+    return tuple(finders)
+
+@lru_cache(maxsize=256)
+def _prepared_selectors(selectors):
+    """prepare_selectors для кортежа строк с кэшированием результата."""
+    return prepare_selectors(selectors)
+
+def find_element(soup, selectors):
+    """
+    Находит первый элемент, соответствующий одному из селекторов.
+    
+    Args:
+        soup: BeautifulSoup объект
+        selectors: Список CSS селекторов или результат prepare_selectors
+        
+    Returns:
+        BeautifulSoup элемент или None
+    """
+    if selectors and isinstance(selectors[0], str):
+        selectors = _prepared_selectors(tuple(selectors))
+    
+    for find in selectors:
+        element = find(soup)
         if element:
             return element
     
@@ -119,6 +556,64 @@ def get_meta_tag(soup, name):
         return meta.get('content', '')
     return ''
 
+# Утилиты для JSON
+WRITE_BUFFER_SIZE = 1 << 20
+# Буфер для файлов отдельных страниц: страница обычно умещается в него
+# целиком, а выделять 1 МиБ на каждый из тысяч мелких файлов незачем
+PAGE_WRITE_BUFFER_SIZE = 1 << 16
+
+def open_text_writer(path, newline=None, buffering=WRITE_BUFFER_SIZE):
+    """
+    Открывает текстовый файл UTF-8 для записи с буфером 1 МиБ.
+    
+    Экспортеры пишут много мелких фрагментов (строки CSV, части страниц):
+    с большим буфером они уходят на диск редкими крупными записями.
+    
+    Args:
+        path: Путь к файлу
+        newline: Параметр newline для open() ('' для csv)
+        buffering: Размер буфера (PAGE_WRITE_BUFFER_SIZE для файлов страниц)
+        
+    Returns:
+        Файловый объект в текстовом режиме
+    """
+    return open(path, 'w', encoding='utf-8', newline=newline, buffering=buffering)
+
+def _json_default(obj):
+    """Сериализация массивов numpy для стандартного json."""
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def json_dumps_bytes(obj, indent=False):
+    """
+    Сериализует объект в JSON в кодировке UTF-8.
+    
+    Если установлен orjson, используется он (в разы быстрее стандартного json).
+    Массивы numpy сериализуются напрямую, без промежуточных списков Python.
+    
+    Args:
+        obj: Сериализуемый объект
+        indent: Форматировать с отступом в 2 пробела
+        
+    Returns:
+        bytes: JSON без экранирования не-ASCII символов
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    return json.dumps(
+        obj, ensure_ascii=False, indent=2 if indent else None, default=_json_default
+    ).encode('utf-8')
+
+def json_loads(data):
+    """Разбирает JSON из строки или bytes (через orjson, если он установлен)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
 def get_title(soup):
     """Получает заголовок страницы."""
     title_tag = soup.find('title')